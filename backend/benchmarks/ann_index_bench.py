@@ -0,0 +1,133 @@
+"""
+Benchmark: flat vs. IVF vs. HNSW vector indexes, each with float32, fp16,
+int8 or PQ storage (see services/vector_index.py).
+
+Builds each index over synthetic clustered embeddings (unit vectors
+around random topic centres, like sentence embeddings of a document
+corpus), then queries with perturbed corpus vectors. It reports:
+
+- build time;
+- index size, and the projected size per million chunks;
+- recall@k against exact flat search;
+- p50/p99 single-query latency.
+
+For compressed storage it also reports recall and p99 after the
+float32 re-ranking pass (RAG_RERANK_FACTOR). Use it to choose
+RAG_INDEX_TYPE, RAG_INDEX_COMPRESSION and their parameters for a
+deployment's corpus size.
+
+Usage (from backend/):
+    python benchmarks/ann_index_bench.py --sizes 10000,100000
+    python benchmarks/ann_index_bench.py --sizes 100000 --types flat,hnsw --compression none,fp16,int8,pq
+    python benchmarks/ann_index_bench.py --sizes 1000000 --types ivf,hnsw --nprobe 32
+"""
+import argparse
+import os
+import sys
+import time
+
+import faiss
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from services import vector_index
+
+
+def _corpus(rows, dim, topics, rng):
+    centres = rng.standard_normal((topics, dim)).astype(np.float32)
+    vectors = centres[rng.integers(0, topics, rows)] + 0.6 * rng.standard_normal((rows, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _queries(corpus, count, rng):
+    picks = corpus[rng.integers(0, len(corpus), count)]
+    queries = picks + 0.03 * rng.standard_normal(picks.shape).astype(np.float32)
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def _measure(index, queries, k, ef_search, corpus=None, rerank_factor=1):
+    """Search each query; with ``corpus``, re-rank k * rerank_factor candidates on its float32 rows."""
+    latencies = []
+    hits = []
+    fetch = k * rerank_factor if corpus is not None else k
+    for query in queries:
+        started = time.perf_counter()
+        _, positions = vector_index.search(index, query[None, :], fetch, ef_search=ef_search)
+        candidates = positions[0][positions[0] >= 0]
+        if corpus is not None:
+            order, _ = vector_index.rerank(query, corpus[candidates], k)
+            candidates = candidates[order]
+        latencies.append((time.perf_counter() - started) * 1000)
+        hits.append(candidates[:k])
+    return hits, np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+
+def _recall(hits, truth, k):
+    return np.mean([len(set(h) & set(t)) / k for h, t in zip(hits, truth)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000", help="comma-separated corpus sizes (chunks)")
+    parser.add_argument("--types", default="flat,ivf,hnsw")
+    parser.add_argument("--compression", default="none", help="comma-separated: none,fp16,int8,pq")
+    parser.add_argument("--pq-m", type=int, default=vector_index.RAG_PQ_M, help="PQ bytes per vector")
+    parser.add_argument("--rerank-factor", type=int, default=vector_index.RAG_RERANK_FACTOR)
+    parser.add_argument("--dim", type=int, default=384, help="embedding size (all-MiniLM-L6-v2 is 384)")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nlist", type=int, default=vector_index.RAG_IVF_NLIST, help="0 picks ~4*sqrt(rows)")
+    parser.add_argument("--nprobe", type=int, default=vector_index.RAG_IVF_NPROBE)
+    parser.add_argument("--hnsw-m", type=int, default=vector_index.RAG_HNSW_M)
+    parser.add_argument("--ef-construction", type=int, default=vector_index.RAG_HNSW_EF_CONSTRUCTION)
+    parser.add_argument("--ef-search", type=int, default=vector_index.RAG_HNSW_EF_SEARCH)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    types = args.types.split(",")
+    compressions = args.compression.split(",")
+    print(f"dim={args.dim}, {args.queries} queries, recall@{args.k} vs. exact search, "
+          f"re-rank x{args.rerank_factor}, {faiss.omp_get_max_threads()} threads")
+    print(f"{'rows':>9}  {'index':<5}  {'storage':<7}  {'build_s':>8}  {'size_mb':>8}  {'mb_per_1m':>9}  "
+          f"{'recall':>6}  {'p50_ms':>7}  {'p99_ms':>7}  {'rr_recall':>9}  {'rr_p99':>7}  params")
+    for rows in (int(size) for size in args.sizes.split(",")):
+        rng = np.random.default_rng(args.seed)
+        corpus = _corpus(rows, args.dim, topics=max(16, rows // 500), rng=rng)
+        queries = _queries(corpus, args.queries, rng)
+        exact = vector_index.build_index(corpus, "flat")
+        _, truth = exact.search(queries, args.k)
+
+        for index_type in types:
+            for compression in compressions:
+                started = time.perf_counter()
+                index = exact if (index_type, compression) == ("flat", "none") else vector_index.build_index(
+                    corpus,
+                    index_type,
+                    compression,
+                    nlist=args.nlist,
+                    nprobe=args.nprobe,
+                    min_rows=0,
+                    hnsw_m=args.hnsw_m,
+                    ef_construction=args.ef_construction,
+                    pq_m=args.pq_m,
+                    compression_min_rows=0,
+                )
+                build_seconds = time.perf_counter() - started
+                hits, p50, p99 = _measure(index, queries, args.k, args.ef_search)
+                size_mb = faiss.serialize_index(index).nbytes / 1e6
+                info = vector_index.describe(index)
+                rr_recall = rr_p99 = ""
+                if info["compression"] != "none" and args.rerank_factor > 1:
+                    rr_hits, _, rr_latency = _measure(index, queries, args.k, args.ef_search, corpus, args.rerank_factor)
+                    rr_recall, rr_p99 = f"{_recall(rr_hits, truth, args.k):.3f}", f"{rr_latency:.3f}"
+                params = {key: value for key, value in info.items() if key not in ("type", "compression", "vectors")}
+                print(
+                    f"{rows:>9}  {index_type:<5}  {info['compression']:<7}  {build_seconds:>8.2f}  {size_mb:>8.1f}  "
+                    f"{size_mb / rows * 1e6:>9.0f}  {_recall(hits, truth, args.k):>6.3f}  {p50:>7.3f}  {p99:>7.3f}  "
+                    f"{rr_recall:>9}  {rr_p99:>7}  {params or ''}"
+                )
+
+
+if __name__ == "__main__":
+    main()
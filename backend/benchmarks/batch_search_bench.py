@@ -0,0 +1,128 @@
+"""
+Benchmark: sequential RAGService.search calls vs. search_batch.
+
+Builds a throwaway index in a temporary directory from generated
+documents, then runs the same queries one call at a time and in batches,
+and reports queries per second. The batch path embeds all of a batch's
+queries in one model call and runs one FAISS search over the query matrix.
+
+By default the real embedding model is used (sentence-transformers must be
+installed). ``--embedder synthetic`` swaps in a hashed bag-of-words
+embedder that sleeps ``--call-overhead-ms`` per call, standing in for the
+fixed cost of a model forward pass.
+
+Usage (from backend/):
+    python benchmarks/batch_search_bench.py --docs 200 --queries 512
+    python benchmarks/batch_search_bench.py --embedder synthetic --batch-sizes 16,64,256
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import zlib
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, BACKEND_DIR)
+os.environ["DOCUMENT_CATALOG"] = "memory"
+# Every mode embeds the same queries; the query cache would hide the embedding cost
+os.environ["EMBED_QUERY_CACHE_SIZE"] = "0"
+
+VOCABULARY = (
+    "password vpn okta laptop access policy incident backup retention expense travel leave onboarding "
+    "firewall certificate rotation database replica latency alert grafana deployment pipeline license "
+    "account locked mfa token printer email phone network wifi storage quota audit compliance encryption"
+).split()
+
+
+class SyntheticEmbeddings:
+    """Hashed bag-of-words vectors plus a fixed per-call delay."""
+
+    def __init__(self, dim, call_overhead):
+        import numpy as np
+
+        self.np = np
+        self.dim = dim
+        self.call_overhead = call_overhead
+
+    def _vector(self, text):
+        buckets = [zlib.crc32(word.encode()) % self.dim for word in text.lower().split()]
+        vector = self.np.bincount(buckets, minlength=self.dim).astype(self.np.float32)
+        norm = self.np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts):
+        time.sleep(self.call_overhead)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+    def __call__(self, text):
+        return self.embed_query(text)
+
+
+def _vocabulary(size):
+    """Domain words plus generated terms, with Zipf-like weights as in real text."""
+    words = VOCABULARY + [f"term{i}" for i in range(size - len(VOCABULARY))]
+    return words, [1.0 / (rank + 1) for rank in range(len(words))]
+
+
+def _text(rng, vocabulary, words):
+    return " ".join(rng.choices(vocabulary[0], weights=vocabulary[1], k=words))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=512)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--vocabulary", type=int, default=20000, help="distinct words in the generated documents")
+    parser.add_argument("--batch-sizes", default="16,64,256")
+    parser.add_argument("--embedder", choices=("hf", "synthetic"), default="hf")
+    parser.add_argument("--call-overhead-ms", type=float, default=5.0, help="synthetic embedder: delay per model call")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    # The service keeps its index and uploads under ./data
+    workdir = tempfile.mkdtemp(prefix="batch-search-bench-")
+    os.chdir(workdir)
+    from services import rag_service as rag_module
+
+    if args.embedder == "synthetic":
+        rag_module.RAGService._load_embedding_model = lambda self: SyntheticEmbeddings(384, args.call_overhead_ms / 1000)
+    service = rag_module.RAGService()
+    service.warm_up()
+    if service.embeddings is None:
+        sys.exit("Embedding model unavailable; install sentence-transformers or use --embedder synthetic")
+
+    rng = random.Random(args.seed)
+    vocabulary = _vocabulary(args.vocabulary)
+    doc_ids = [
+        service.save_document(
+            "\n\n".join(_text(rng, vocabulary, 120) for _ in range(8)).encode(), f"doc_{i}.txt", uploaded_by="benchmark"
+        )["id"]
+        for i in range(args.docs)
+    ]
+    service.ingest_documents(doc_ids)
+    queries = [_text(rng, vocabulary, 6) for _ in range(args.queries)]
+    print(f"{service.index_stats()['vectors']} chunks, {len(queries)} queries, k={args.k}, embedder={args.embedder}")
+
+    started = time.perf_counter()
+    for query in queries:
+        service.search(query, args.k)
+    sequential = len(queries) / (time.perf_counter() - started)
+    print(f"{'mode':<12}  {'batch':>5}  {'queries/s':>10}  {'speedup':>7}")
+    print(f"{'sequential':<12}  {1:>5}  {sequential:>10.1f}  {1.0:>6.1f}x")
+
+    for batch_size in (int(size) for size in args.batch_sizes.split(",")):
+        started = time.perf_counter()
+        for offset in range(0, len(queries), batch_size):
+            service.search_batch(queries[offset:offset + batch_size], args.k)
+        batched = len(queries) / (time.perf_counter() - started)
+        print(f"{'batch':<12}  {batch_size:>5}  {batched:>10.1f}  {batched / sequential:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
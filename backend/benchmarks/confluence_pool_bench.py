@@ -0,0 +1,124 @@
+"""
+Benchmark: pooled keep-alive Confluence MCP client vs. one connection per call.
+
+Starts a local stub standing in for the MCP server, then fires the same
+search load through plain ``requests.post`` (the old behaviour) and through
+``ConfluenceMCPClient``. Reports throughput, latency percentiles and the
+number of TCP connections the stub had to accept.
+
+Usage (from backend/):
+    python benchmarks/confluence_pool_bench.py --threads 16 --requests 50
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True  # like the Node MCP server; avoids delayed-ACK stalls
+    latency = 0.005
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        query = json.loads(self.rfile.read(length) or b"{}").get("query", "")
+        time.sleep(self.latency)
+        body = json.dumps({"results": [{
+            "title": "Password Policy",
+            "content": f"Stub content for {query}",
+            "url": "http://stub/page/1",
+            "space": {"key": "IT"},
+        }]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _CountingServer(ThreadingHTTPServer):
+    daemon_threads = True
+    connections = 0
+
+    def get_request(self):
+        conn = super().get_request()
+        self.connections += 1
+        return conn
+
+
+def _run(label, call, threads, per_thread, server):
+    server.connections = 0
+    latencies = []
+    lock = threading.Lock()
+
+    def worker():
+        local = []
+        for _ in range(per_thread):
+            t0 = time.perf_counter()
+            call()
+            local.append(time.perf_counter() - t0)
+        with lock:
+            latencies.extend(local)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        for _ in range(threads):
+            pool.submit(worker)
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1000
+    p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000
+    print(f"{label:<10} {len(latencies) / elapsed:>9.1f} req/s  p50={p50:6.2f}ms  "
+          f"p95={p95:6.2f}ms  tcp_connections={server.connections}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=50, help="requests per thread")
+    parser.add_argument("--pool-size", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="stub server think time")
+    args = parser.parse_args()
+
+    _StubHandler.latency = args.latency_ms / 1000
+    server = _CountingServer(("127.0.0.1", 0), _StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    os.environ["CONFLUENCE_MCP_URL"] = base_url
+    os.environ["CONFLUENCE_ENABLED"] = "true"
+    from services.confluence_mcp import ConfluenceMCPClient
+
+    client = ConfluenceMCPClient(pool_size=args.pool_size)
+
+    def unpooled():
+        requests.post(f"{base_url}/search", json={"query": "password policy", "max_results": 3}, timeout=10).json()
+
+    def pooled():
+        client.search("password policy", max_results=3)
+
+    print(f"{args.threads} threads x {args.requests} requests, stub latency {args.latency_ms}ms")
+    _run("unpooled", unpooled, args.threads, args.requests, server)
+    _run("pooled", pooled, args.threads, args.requests, server)
+    print("pool stats:", client.pool_stats())
+
+    client.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
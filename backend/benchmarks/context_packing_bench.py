@@ -0,0 +1,91 @@
+"""
+Benchmark: prompt context tokens before and after packing (see
+graph/context_builder.py).
+
+Splits the uploaded documents into overlapping chunks the way the RAG
+service does (1000 characters, 200 overlap), so each query retrieves
+neighbouring chunks that repeat each other. Each whole document also
+stands in for a Confluence page. For each query it reports the context
+tokens of the RAG prompt and of the parallel-retrieval prompt, before
+and after ``pack_context``.
+
+Usage (from backend/):
+    python benchmarks/context_packing_bench.py
+    python benchmarks/context_packing_bench.py --budget 800 --top-k 8
+"""
+import argparse
+import glob
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from graph import context_builder
+from services.lexical_index import LexicalIndex
+
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+
+QUERIES = [
+    "What is the password policy?",
+    "How do I connect to the VPN when working remotely?",
+    "What is the rate limit for Okta authentication requests?",
+    "What are the steps of the incident response process?",
+    "How should confidential data be classified and handled?",
+]
+
+
+def _chunks(text):
+    step = CHUNK_SIZE - CHUNK_OVERLAP
+    return [text[start:start + CHUNK_SIZE] for start in range(0, max(len(text) - CHUNK_OVERLAP, 1), step)]
+
+
+def _load(pattern):
+    documents = {}
+    for path in sorted(glob.glob(pattern)):
+        with open(path, "rb") as f:
+            raw = f.read()
+        # Uploads may be UTF-16 (saved from Windows editors)
+        text = raw.decode("utf-16") if raw[:2] in (b"\xff\xfe", b"\xfe\xff") else raw.decode("utf-8", "replace")
+        documents[os.path.basename(path)] = text.replace("\r\n", "\n")
+    return documents
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", default="data/uploads/*.md", help="glob of documents to chunk")
+    parser.add_argument("--budget", type=int, default=context_builder.CONTEXT_TOKEN_BUDGET)
+    parser.add_argument("--top-k", type=int, default=5, help="chunks retrieved per query")
+    args = parser.parse_args()
+
+    documents = _load(args.docs)
+    if not documents:
+        sys.exit(f"No documents match {args.docs}")
+    chunks = {}
+    for name, text in documents.items():
+        for position, chunk in enumerate(_chunks(text)):
+            chunks[f"{name}:{position}"] = (name, chunk)
+    index = LexicalIndex()
+    index.add_many((chunk_id, chunk) for chunk_id, (_, chunk) in chunks.items())
+    print(f"{len(documents)} documents, {len(chunks)} chunks, budget {args.budget} tokens, top {args.top_k}")
+
+    print(f"{'query':<58}  {'rag_before':>10}  {'rag_after':>9}  {'mixed_before':>12}  {'mixed_after':>11}")
+    totals = [0, 0, 0, 0]
+    for query in QUERIES:
+        # Chunks in document order, as neighbouring hits come back from the vector search
+        hits = sorted(chunk_id for chunk_id, _, _ in index.search(query, args.top_k))
+        rag = [{"content": chunks[chunk_id][1], "key": chunks[chunk_id][0]} for chunk_id in hits]
+        pages = [{"content": documents[source["key"]], "key": f"page:{source['key']}"}
+                 for source in {s["key"]: s for s in rag}.values()]
+        row = []
+        for sources in (rag, pages + rag):
+            packed = context_builder.pack_context(query, sources, budget=args.budget)
+            row += [sum(context_builder.estimate_tokens(s["content"]) for s in sources),
+                    sum(context_builder.estimate_tokens(s["content"]) for s in packed)]
+        totals = [total + value for total, value in zip(totals, row)]
+        print(f"{query[:58]:<58}  {row[0]:>10}  {row[1]:>9}  {row[2]:>12}  {row[3]:>11}")
+    print(f"{'total':<58}  {totals[0]:>10}  {totals[1]:>9}  {totals[2]:>12}  {totals[3]:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark: embedding backends (see services/embedding_backends.py).
+
+Embeds the chunks of the uploaded documents (split the way the RAG service
+does) with each backend: ``hf`` (eager PyTorch), ``onnx`` (fp32) and
+``onnx-int8`` (dynamic int8 weights). For each backend it reports:
+
+- ingestion throughput: chunks per second, embedded in batches of
+  ``--batch-size``;
+- query latency: p50 and p99 of single-query calls, and queries per
+  second;
+- parity with ``hf``: min and mean cosine similarity of the chunk
+  vectors, and the overlap of each query's top-k chunks.
+
+``--threads`` sets the intra-op threads of every backend, so several
+settings can be compared with the uvicorn workers' share of cores in mind.
+The ONNX exports are cached under ``EMBEDDING_ONNX_DIR``; the first run
+creates them.
+
+Usage (from backend/):
+    python benchmarks/embedding_backend_bench.py
+    python benchmarks/embedding_backend_bench.py --threads 2 --backends hf,onnx-int8
+    python benchmarks/embedding_backend_bench.py --model ./models/all-MiniLM-L6-v2 --top-k 10
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from context_packing_bench import QUERIES, _chunks, _load
+from services import embedding_backends
+
+
+def _model(name, model_name, threads):
+    if name == "hf":
+        return embedding_backends.load_embedding_model("hf", model_name=model_name, threads=threads)
+    # No fallback here: a missing onnxruntime should fail the run, not time hf twice
+    return embedding_backends.OnnxEmbeddings(model_name, quantize=name == "onnx-int8", threads=threads)
+
+
+def _ingest(model, texts, batch_size):
+    model.embed_documents(texts[:batch_size])  # warm-up (ONNX Runtime sizes its buffers on the first run)
+    started = time.perf_counter()
+    vectors = []
+    for start in range(0, len(texts), batch_size):
+        vectors += model.embed_documents(texts[start:start + batch_size])
+    return vectors, len(texts) / (time.perf_counter() - started)
+
+
+def _queries(model, queries, rounds):
+    model.embed_query(queries[0])  # warm-up
+    latencies = []
+    for _ in range(rounds):
+        for query in queries:
+            started = time.perf_counter()
+            model.embed_query(query)
+            latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    return (statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1],
+            1000 * len(latencies) / sum(latencies))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", default="data/uploads/*.md", help="glob of documents to chunk")
+    parser.add_argument("--backends", default="hf,onnx,onnx-int8")
+    parser.add_argument("--model", default=embedding_backends.EMBEDDING_MODEL, help="model name or local directory")
+    parser.add_argument("--threads", type=int, default=embedding_backends.EMBEDDING_THREADS,
+                        help="intra-op threads, 0 = runtime default")
+    parser.add_argument("--batch-size", type=int, default=64, help="chunks per ingestion call")
+    parser.add_argument("--rounds", type=int, default=20, help="passes over the queries")
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    import numpy as np
+
+    documents = _load(args.docs)
+    if not documents:
+        sys.exit(f"No documents match {args.docs}")
+    texts = [chunk for text in documents.values() for chunk in _chunks(text)]
+    backends = args.backends.split(",")
+    if backends[0] != "hf":
+        backends = ["hf"] + [name for name in backends if name != "hf"]
+    print(f"{len(documents)} documents, {len(texts)} chunks, {len(QUERIES)} queries, "
+          f"threads={args.threads or 'default'}, model={args.model}")
+
+    print(f"{'backend':<10}  {'chunks/s':>9}  {'p50_ms':>7}  {'p99_ms':>7}  {'queries/s':>9}  "
+          f"{'cos_min':>7}  {'cos_mean':>8}  {'top_k':>5}")
+    reference = None
+    for name in backends:
+        model = _model(name, args.model, args.threads)
+        vectors, ingest = _ingest(model, texts, args.batch_size)
+        p50, p99, qps = _queries(model, QUERIES, args.rounds)
+        chunks = np.asarray(vectors, dtype=np.float32)
+        queries = np.asarray(model.embed_documents(QUERIES), dtype=np.float32)
+        top = np.argsort(-queries @ chunks.T, axis=1)[:, :args.top_k]
+        if reference is None:
+            reference = chunks, top
+        # Both sides are L2-normalized, so the row-wise dot product is the cosine
+        cosine = (chunks * reference[0]).sum(axis=1)
+        overlap = np.mean([len(set(a) & set(b)) / args.top_k for a, b in zip(top, reference[1])])
+        print(f"{name:<10}  {ingest:>9.1f}  {p50:>7.2f}  {p99:>7.2f}  {qps:>9.1f}  "
+              f"{cosine.min():>7.4f}  {cosine.mean():>8.4f}  {overlap:>5.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Benchmark: RAG search throughput with and without embedding micro-batching
+(see services/embedding_service.py).
+
+Builds a throwaway index like batch_search_bench.py, then runs searches
+from 1, 8 and 64 concurrent threads. In ``direct`` mode each search calls
+the model itself, as before the embedding service existed. In ``batched``
+mode the searches share the BatchingEmbeddings worker. It reports
+queries per second and p50/p99 latency.
+
+By default the real embedding model is used. ``--embedder synthetic``
+swaps in a stand-in whose calls take ``--call-overhead-ms`` plus
+``--per-text-ms`` per text. Only one call runs at a time, like forward
+passes competing for the same CPU cores.
+
+Usage (from backend/):
+    python benchmarks/embedding_batching_bench.py
+    python benchmarks/embedding_batching_bench.py --embedder synthetic --concurrency 1,8,64
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ["DOCUMENT_CATALOG"] = "memory"
+# Every run embeds the same queries; the query cache would hide the embedding cost
+os.environ["EMBED_QUERY_CACHE_SIZE"] = "0"
+
+from batch_search_bench import SyntheticEmbeddings, _text, _vocabulary
+
+
+class SerializedSyntheticEmbeddings(SyntheticEmbeddings):
+    """Synthetic model whose calls hold the (simulated) CPU one at a time."""
+
+    _cpu = threading.Lock()
+
+    def __init__(self, dim, call_overhead, per_text):
+        super().__init__(dim, call_overhead)
+        self.per_text = per_text
+
+    def embed_documents(self, texts):
+        with self._cpu:
+            time.sleep(self.call_overhead + self.per_text * len(texts))
+        return [self._vector(text) for text in texts]
+
+
+class DirectEmbeddings:
+    """Each caller runs the model on its own thread (no batching, no cache)."""
+
+    def __init__(self, model):
+        self.model = model
+        # Embedding still overlaps the keyword search, as the search path expects
+        self._pool = ThreadPoolExecutor(max_workers=128, thread_name_prefix="direct-embed")
+
+    def embed_documents(self, texts):
+        return self.model.embed_documents(texts)
+
+    def embed_queries(self, texts):
+        return self.model.embed_documents(texts)
+
+    def submit_queries(self, texts):
+        return self._pool.submit(self.model.embed_documents, texts)
+
+
+def _run(service, queries, concurrency, k):
+    latencies = []
+
+    def search(query):
+        started = time.perf_counter()
+        service.search(query, k)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(search, queries))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return len(queries) / elapsed, statistics.median(latencies), latencies[int(len(latencies) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=512)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--concurrency", default="1,8,64")
+    parser.add_argument("--embedder", choices=("hf", "synthetic"), default="hf")
+    parser.add_argument("--call-overhead-ms", type=float, default=5.0, help="synthetic embedder: fixed cost per call")
+    parser.add_argument("--per-text-ms", type=float, default=0.3, help="synthetic embedder: cost per text")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    # The service keeps its index and uploads under ./data
+    os.chdir(tempfile.mkdtemp(prefix="embedding-batching-bench-"))
+    from services import rag_service as rag_module
+
+    if args.embedder == "synthetic":
+        rag_module.RAGService._load_embedding_model = lambda self: SerializedSyntheticEmbeddings(
+            384, args.call_overhead_ms / 1000, args.per_text_ms / 1000
+        )
+    service = rag_module.RAGService()
+    service.warm_up()
+    if service.embeddings is None:
+        sys.exit("Embedding model unavailable; install sentence-transformers or use --embedder synthetic")
+
+    rng = random.Random(args.seed)
+    vocabulary = _vocabulary(20000)
+    doc_ids = [
+        service.save_document(
+            "\n\n".join(_text(rng, vocabulary, 120) for _ in range(8)).encode(), f"doc_{i}.txt", uploaded_by="benchmark"
+        )["id"]
+        for i in range(args.docs)
+    ]
+    service.ingest_documents(doc_ids)
+    queries = [_text(rng, vocabulary, 6) for _ in range(args.queries)]
+    batched = service.embeddings
+    direct = DirectEmbeddings(batched.model)
+    print(f"{service.index_stats()['vectors']} chunks, {len(queries)} queries, embedder={args.embedder}, "
+          f"max batch {batched.max_batch_size}, max wait {batched.max_wait * 1000:g} ms")
+
+    print(f"{'concurrency':>11}  {'mode':<8}  {'queries/s':>10}  {'p50_ms':>8}  {'p99_ms':>8}  {'avg_batch':>9}")
+    for concurrency in (int(value) for value in args.concurrency.split(",")):
+        for mode, embeddings in (("direct", direct), ("batched", batched)):
+            service.embeddings = embeddings
+            before = batched.stats()
+            qps, p50, p99 = _run(service, queries, concurrency, args.k)
+            after = batched.stats()
+            avg_batch = ""
+            if mode == "batched" and after["batches"] > before["batches"]:
+                avg_batch = f"{(after['texts'] - before['texts']) / (after['batches'] - before['batches']):.1f}"
+            print(f"{concurrency:>11}  {mode:<8}  {qps:>10.1f}  {p50:>8.2f}  {p99:>8.2f}  {avg_batch:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark: local fast-path intent classifier vs. the LLM classifier.
+
+Runs the embedding classifier from services.intent_classifier over a
+labelled fixture set and reports, per confidence threshold, the share of
+calls answered locally (LLM calls saved) and the accuracy of those local
+decisions. With --llm, the remaining calls also go to the Groq classifier
+so end-to-end accuracy and latency can be compared.
+
+Usage (from backend/):
+    python benchmarks/intent_fastpath_bench.py
+    python benchmarks/intent_fastpath_bench.py --thresholds 0.6,0.8,0.9 --llm
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "intent_labelled.jsonl")
+
+
+def _load_fixture(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _llm_label(text):
+    from graph.nodes import get_client, _CLASSIFY_SYSTEM, _heuristic_intent
+
+    content = get_client().invoke([_CLASSIFY_SYSTEM, {"role": "user", "content": text}]).content.strip().lower()
+    for label in ("rfi", "ritm", "incident"):
+        if label in content:
+            return label
+    return _heuristic_intent(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixture", default=FIXTURE)
+    parser.add_argument("--thresholds", default="0.5,0.6,0.7,0.8,0.9")
+    parser.add_argument("--llm", action="store_true", help="send low-confidence calls to the Groq classifier")
+    args = parser.parse_args()
+
+    from services.intent_classifier import intent_classifier
+
+    rows = _load_fixture(args.fixture)
+    if intent_classifier.classify(rows[0]["text"])[0] is None:
+        sys.exit("Local classifier unavailable (embedding model not loaded)")
+
+    latencies, predictions = [], []
+    for row in rows:
+        t0 = time.perf_counter()
+        predictions.append(intent_classifier.classify(row["text"]))
+        latencies.append(time.perf_counter() - t0)
+
+    print(f"{len(rows)} labelled examples, local classify p50={statistics.median(latencies) * 1000:.1f}ms")
+    overall = sum(label == row["label"] for (label, _), row in zip(predictions, rows)) / len(rows)
+    print(f"local accuracy with no threshold: {overall:.1%}\n")
+    print(f"{'threshold':>9}  {'LLM saved':>9}  {'local acc':>9}" + (f"  {'end-to-end acc':>14}" if args.llm else ""))
+
+    llm_labels = {}
+    for threshold in [float(t) for t in args.thresholds.split(",")]:
+        local = [(label, row) for (label, conf), row in zip(predictions, rows) if conf >= threshold]
+        saved = len(local) / len(rows)
+        local_acc = sum(label == row["label"] for label, row in local) / len(local) if local else 0.0
+        line = f"{threshold:>9.2f}  {saved:>9.1%}  {local_acc:>9.1%}"
+        if args.llm:
+            correct = sum(label == row["label"] for label, row in local)
+            for (label, conf), row in zip(predictions, rows):
+                if conf < threshold:
+                    if row["text"] not in llm_labels:
+                        llm_labels[row["text"]] = _llm_label(row["text"])
+                    correct += llm_labels[row["text"]] == row["label"]
+            line += f"  {correct / len(rows):>14.1%}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark: sequential info -> rag -> L1 chain vs. parallel retrieval.
+
+Replaces the Confluence client, vector search and LLMs with stand-ins that
+sleep for realistic, jittered latencies, then runs RFI tickets through both
+graph variants and reports P50/P95 end-to-end latency. A Confluence "miss"
+means the MCP search returns only irrelevant pages, so the sequential chain
+pays for the info validation call before it reaches RAG.
+
+Usage (from backend/):
+    python benchmarks/retrieval_latency_bench.py --tickets 200 --confluence-hit-rate 0.3
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+os.environ.setdefault("TAVILY_API_KEY", "benchmark")
+os.environ["ANSWER_CACHE_ENABLED"] = "false"
+os.environ["LLM_CACHE_BACKEND"] = "none"
+
+# Median latencies in seconds, before --scale
+CONFLUENCE_LATENCY = 0.30
+VECTOR_SEARCH_LATENCY = 0.04
+LLM_LATENCY = 1.20
+
+
+class _Response:
+    def __init__(self, content):
+        self.content = content
+
+
+class _FakeLLM:
+    def __init__(self, scale):
+        self.scale = scale
+
+    async def ainvoke(self, prompt):
+        await asyncio.sleep(random.lognormvariate(0, 0.3) * LLM_LATENCY * self.scale)
+        if "RELEVANT" not in prompt:
+            return _Response("INSUFFICIENT_INFO")
+        return _Response("Passwords must be rotated every 90 days.")
+
+
+def _install_fakes(scale, hit_rate):
+    from services.confluence_mcp import confluence_client
+    from services.rag_service import rag_service
+    import graph.info_node
+    import graph.rag_node
+    import graph.retrieval_node
+
+    async def confluence_search(query, max_results=5):
+        await asyncio.sleep(random.lognormvariate(0, 0.4) * CONFLUENCE_LATENCY * scale)
+        marker = "RELEVANT" if random.random() < hit_rate else "unrelated"
+        return [{"title": "Security", "content": f"{marker} page", "url": "http://wiki/1",
+                 "space": "IT", "relevance_score": 0.7}]
+
+    async def vector_search(query, k=3):
+        await asyncio.sleep(random.lognormvariate(0, 0.2) * VECTOR_SEARCH_LATENCY * scale)
+        return [{"content": "RELEVANT policy chunk", "score": 0.6,
+                 "metadata": {"filename": "policy.md", "doc_id": "doc_1"}}]
+
+    confluence_client.asearch = confluence_search
+    rag_service.asearch = vector_search
+    llm = _FakeLLM(scale)
+    graph.info_node.info_llm = llm
+    graph.rag_node.rag_llm = llm
+
+
+async def _measure(app, tickets, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i):
+        async with semaphore:
+            t0 = time.perf_counter()
+            await app.ainvoke({"ticket_id": f"BENCH-{i}", "description": "what is the password policy",
+                               "ticket_type": "rfi"})
+            latencies.append(time.perf_counter() - t0)
+
+    await asyncio.gather(*(one(i) for i in range(tickets)))
+    latencies.sort()
+    return statistics.median(latencies), latencies[int(len(latencies) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickets", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--confluence-hit-rate", type=float, default=0.3)
+    parser.add_argument("--scale", type=float, default=0.1, help="multiply all simulated latencies")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    from graph.workflow import build_graph
+
+    _install_fakes(args.scale, args.confluence_hit_rate)
+    print(f"{args.tickets} RFI tickets, concurrency {args.concurrency}, "
+          f"Confluence hit rate {args.confluence_hit_rate:.0%}, latency scale {args.scale}")
+    for mode in ("sequential", "parallel"):
+        random.seed(args.seed)
+        app = build_graph(async_mode=True, retrieval_mode=mode)
+        p50, p95 = asyncio.run(_measure(app, args.tickets, args.concurrency))
+        print(f"{mode:<10}  p50={p50 / args.scale * 1000:7.0f}ms  p95={p95 / args.scale * 1000:7.0f}ms  (unscaled)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""
+Answer Cache Node - Replays a cached Info/RAG answer for semantically matching questions
+"""
+import logging
+from typing import Dict, Any
+from services.answer_cache import answer_cache
+from .state import OpsState
+
+logger = logging.getLogger("backend.graph.answer_cache")
+
+
+def _cache_result(state: OpsState, cached) -> Dict[str, Any]:
+    if not cached:
+        return {**state.dict(), "cache_hit": False}
+    logger.info(f"Ticket {state.ticket_id} answered from semantic answer cache")
+    return {**state.dict(), **cached, "cache_hit": True}
+
+
+def cached_answer(state: OpsState) -> Dict[str, Any]:
+    """
+    Look up a previous Info/RAG answer for this question before searching
+    Confluence or the knowledge base.
+    """
+    return _cache_result(state, answer_cache.lookup(state.description or ""))
+
+
+async def acached_answer(state: OpsState) -> Dict[str, Any]:
+    """Async variant of cached_answer for use with ``graph.ainvoke``."""
+    return _cache_result(state, await answer_cache.alookup(state.description or ""))
@@ -1,8 +1,9 @@
 import os
 import logging
 from datetime import datetime, timedelta
-from langchain_groq import ChatGroq
 from langchain_core.messages import HumanMessage, SystemMessage
+from services.llm_cache import memoize_llm
+from services.intent_classifier import intent_classifier
 from .chatbot_state import ChatbotState, ChatMessage
 
 logger = logging.getLogger("backend.graph.chatbot")
@@ -14,10 +15,11 @@ def get_client():
     """Get or create the ChatGroq client."""
     global _client
     if _client is None:
-        _client = ChatGroq(
+        from langchain_groq import ChatGroq
+        _client = memoize_llm(ChatGroq(
             api_key=os.getenv("GROQ_API_KEY"),
             model="llama-3.1-8b-instant"
-        )
+        ))
     return _client
 
 
@@ -99,91 +101,139 @@ Examples:
         return {}
 
 
+_EXTRACT_SYSTEM = {
+    "role": "system",
+    "content": (
+        "You are an intent classifier for a ServiceNow ticketing system. "
+        "Classify the user's message into EXACTLY one of these intents.\n\n"
+        "Output ONLY ONE WORD: 'rfi', 'ritm', or 'incident'\n\n"
+        "CRITICAL CLASSIFICATION RULES:\n\n"
+        "Choose 'rfi' when user is:\n"
+        "- Asking WHAT IS something (policies, procedures, guidelines, definitions)\n"
+        "- Asking HOW TO do something (steps, instructions, process)\n"
+        "- Requesting INFORMATION or RESEARCH (looking up details, finding documentation)\n"
+        "- Asking EXPLAIN or TELL ME ABOUT a topic\n"
+        "- Questions starting with: what, how, why, where, when, explain, tell me\n"
+        "Examples: 'what is the password policy', 'how to onboard employee', 'tell me about leave policy'\n\n"
+        "Choose 'ritm' when user wants to:\n"
+        "- REQUEST or SUPPRESS or SILENCE alerts (alert management)\n"
+        "- REQUEST access to systems, applications, or resources\n"
+        "- REQUEST software installation or hardware\n"
+        "- REQUEST new accounts, permissions, or privileges\n"
+        "- REQUEST services or items to be provisioned\n"
+        "Examples: 'suppress alert', 'silence monitoring', 'need access to Jira', 'request laptop', 'create new user account'\n\n"
+        "Choose 'incident' when user:\n"
+        "- Reports a BROKEN or NOT WORKING system/service\n"
+        "- Has an ERROR or PROBLEM that needs fixing\n"
+        "- Reports service disruptions or outages\n"
+        "Examples: 'my laptop is not working', 'application is down', 'getting error message'\n\n"
+        "User message: {message}"
+    )
+}
+
+
+def _user_conversation(state: ChatbotState) -> list:
+    return [m.content for m in state.messages if m.role == "user"]
+
+
+def _apply_extracted_intent(state: ChatbotState, content: str, conversation: str) -> ChatbotState:
+    intent = content.strip().lower()
+    
+    logger.info("LLM classified intent as: '%s' for conversation: '%s'", intent, conversation)
+    
+    if "silence_alert" in intent:
+        state.intent = "silence_alert"
+        state.target_agent = "suppress_agent"
+    elif "rfi" in intent:
+        state.intent = "rfi"
+        state.target_agent = "rfi_agent"
+    elif "ritm" in intent:
+        state.intent = "ritm"
+        state.target_agent = "l1_agent"
+    elif "incident" in intent:
+        state.intent = "incident"
+        state.target_agent = "l1_agent"
+    else:
+        # Default to incident for unclear cases
+        state.intent = "incident"
+        state.target_agent = "l1_agent"
+    return state
+
+
+def _apply_description(state: ChatbotState, user_messages: list) -> ChatbotState:
+    # Only store description if the message is more than just the intent
+    # Don't store generic phrases like "Information Request", "Alert Suppression", etc.
+    last_msg = user_messages[-1].lower().strip()
+    generic_phrases = ["information request", "rfi", "ritm", "incident", "requested item", "request for information"]
+    
+    is_generic = any(phrase in last_msg for phrase in generic_phrases)
+    logger.info("Checking description - last_msg: '%s', is_generic: %s, current description: '%s'", last_msg, is_generic, state.description)
+    
+    if not state.description and not is_generic:
+        # Message has actual content, use it as description
+        state.description = user_messages[-1]
+        logger.info("Set description to: '%s'", state.description)
+    
+    logger.info("Extracted intent: %s, target_agent: %s, description: %s", state.intent, state.target_agent, state.description)
+    
+    return state
+
+
 def extract_info(state: ChatbotState) -> ChatbotState:
     """Extract ticket information from the conversation."""
     # Get the latest user message
-    user_messages = [m.content for m in state.messages if m.role == "user"]
+    user_messages = _user_conversation(state)
     if not user_messages:
         return state
     
     conversation = "\n".join(user_messages)
     
-    # Use LLM to extract intent
-    system = {
-        "role": "system",
-        "content": (
-            "You are an intent classifier for a ServiceNow ticketing system. "
-            "Classify the user's message into EXACTLY one of these intents.\n\n"
-            "Output ONLY ONE WORD: 'rfi', 'ritm', or 'incident'\n\n"
-            "CRITICAL CLASSIFICATION RULES:\n\n"
-            "Choose 'rfi' when user is:\n"
-            "- Asking WHAT IS something (policies, procedures, guidelines, definitions)\n"
-            "- Asking HOW TO do something (steps, instructions, process)\n"
-            "- Requesting INFORMATION or RESEARCH (looking up details, finding documentation)\n"
-            "- Asking EXPLAIN or TELL ME ABOUT a topic\n"
-            "- Questions starting with: what, how, why, where, when, explain, tell me\n"
-            "Examples: 'what is the password policy', 'how to onboard employee', 'tell me about leave policy'\n\n"
-            "Choose 'ritm' when user wants to:\n"
-            "- REQUEST or SUPPRESS or SILENCE alerts (alert management)\n"
-            "- REQUEST access to systems, applications, or resources\n"
-            "- REQUEST software installation or hardware\n"
-            "- REQUEST new accounts, permissions, or privileges\n"
-            "- REQUEST services or items to be provisioned\n"
-            "Examples: 'suppress alert', 'silence monitoring', 'need access to Jira', 'request laptop', 'create new user account'\n\n"
-            "Choose 'incident' when user:\n"
-            "- Reports a BROKEN or NOT WORKING system/service\n"
-            "- Has an ERROR or PROBLEM that needs fixing\n"
-            "- Reports service disruptions or outages\n"
-            "Examples: 'my laptop is not working', 'application is down', 'getting error message'\n\n"
-            "User message: {message}"
-        )
-    }
+    # Fast path: local embedding classifier, LLM only below the confidence threshold
+    label, confidence = intent_classifier.predict(conversation)
+    if label:
+        logger.info("Local classifier intent '%s' (confidence %.2f), skipping LLM", label, confidence)
+        _apply_extracted_intent(state, label, conversation)
+        return _apply_description(state, user_messages)
     
+    # Use LLM to extract intent
     try:
         client = get_client()
-        prompt = system["content"].replace("{message}", conversation)
+        prompt = _EXTRACT_SYSTEM["content"].replace("{message}", conversation)
         resp = client.invoke([{"role": "system", "content": prompt}])
-        intent = resp.content.strip().lower()
-        
-        logger.info("LLM classified intent as: '%s' for conversation: '%s'", intent, conversation)
-        
-        if "silence_alert" in intent:
-            state.intent = "silence_alert"
-            state.target_agent = "suppress_agent"
-        elif "rfi" in intent:
-            state.intent = "rfi"
-            state.target_agent = "rfi_agent"
-        elif "ritm" in intent:
-            state.intent = "ritm"
-            state.target_agent = "l1_agent"
-        elif "incident" in intent:
-            state.intent = "incident"
-            state.target_agent = "l1_agent"
-        else:
-            # Default to incident for unclear cases
-            state.intent = "incident"
-            state.target_agent = "l1_agent"
+        _apply_extracted_intent(state, resp.content, conversation)
     except Exception as e:
         logger.error("Failed to extract intent", exc_info=True)
         state.intent = "incident"
         state.target_agent = "l1_agent"
     
-    # Only store description if the message is more than just the intent
-    # Don't store generic phrases like "Information Request", "Alert Suppression", etc.
-    last_msg = user_messages[-1].lower().strip()
-    generic_phrases = ["information request", "rfi", "ritm", "incident", "requested item", "request for information"]
+    return _apply_description(state, user_messages)
+
+
+async def aextract_info(state: ChatbotState) -> ChatbotState:
+    """Async variant of extract_info for use on the event loop."""
+    user_messages = _user_conversation(state)
+    if not user_messages:
+        return state
     
-    is_generic = any(phrase in last_msg for phrase in generic_phrases)
-    logger.info("Checking description - last_msg: '%s', is_generic: %s, current description: '%s'", last_msg, is_generic, state.description)
+    conversation = "\n".join(user_messages)
     
-    if not state.description and not is_generic:
-        # Message has actual content, use it as description
-        state.description = user_messages[-1]
-        logger.info("Set description to: '%s'", state.description)
+    label, confidence = await intent_classifier.apredict(conversation)
+    if label:
+        logger.info("Local classifier intent '%s' (confidence %.2f), skipping LLM", label, confidence)
+        _apply_extracted_intent(state, label, conversation)
+        return _apply_description(state, user_messages)
     
-    logger.info("Extracted intent: %s, target_agent: %s, description: %s", state.intent, state.target_agent, state.description)
+    try:
+        client = get_client()
+        prompt = _EXTRACT_SYSTEM["content"].replace("{message}", conversation)
+        resp = await client.ainvoke([{"role": "system", "content": prompt}])
+        _apply_extracted_intent(state, resp.content, conversation)
+    except Exception as e:
+        logger.error("Failed to extract intent", exc_info=True)
+        state.intent = "incident"
+        state.target_agent = "l1_agent"
     
-    return state
+    return _apply_description(state, user_messages)
 
 
 def check_required_fields(state: ChatbotState) -> ChatbotState:
@@ -2,6 +2,7 @@ from langgraph.graph import StateGraph, END
 from .chatbot_state import ChatbotState
 from .chatbot_nodes import (
     extract_info,
+    aextract_info,
     check_required_fields,
     ask_for_missing_fields,
     parse_user_response,
@@ -10,13 +11,17 @@ from .chatbot_nodes import (
 )
 
 
-def build_chatbot_graph():
-    """Build the chatbot conversation workflow using LangGraph."""
+def build_chatbot_graph(async_mode: bool = False):
+    """Build the chatbot conversation workflow using LangGraph.
+    
+    With ``async_mode=True`` the LLM-backed extraction node is a coroutine and
+    the graph must be run with ``await graph.ainvoke(...)``.
+    """
     graph = StateGraph(ChatbotState)
     
     # Add nodes
     graph.add_node("greeting", generate_greeting)
-    graph.add_node("extract", extract_info)
+    graph.add_node("extract", aextract_info if async_mode else extract_info)
     graph.add_node("parse_response", parse_user_response)
     graph.add_node("check_fields", check_required_fields)
     graph.add_node("ask_missing", ask_for_missing_fields)
@@ -53,8 +58,9 @@ def build_chatbot_graph():
     return graph.compile()
 
 
-# Singleton instance
+# Singleton instances
 chatbot_graph = None
+async_chatbot_graph = None
 
 
 def get_chatbot_graph():
@@ -63,3 +69,11 @@ def get_chatbot_graph():
     if chatbot_graph is None:
         chatbot_graph = build_chatbot_graph()
     return chatbot_graph
+
+
+def get_async_chatbot_graph():
+    """Get or create the async chatbot graph instance (use with ``ainvoke``)."""
+    global async_chatbot_graph
+    if async_chatbot_graph is None:
+        async_chatbot_graph = build_chatbot_graph(async_mode=True)
+    return async_chatbot_graph
@@ -0,0 +1,187 @@
+"""
+Token-budgeted context for the info, RAG and parallel-retrieval prompts.
+
+Retrieved sources are pasted into a 70B prompt, so their size drives
+Groq latency and rate-limit use. ``pack_context`` makes the context
+bounded:
+
+1. It drops duplicate sources and cuts the text adjacent chunks share
+   (the splitter overlaps chunks by 200 characters).
+2. It trims long sources (e.g. a whole Confluence page) to the passages
+   that share the most terms with the question, kept in document order.
+3. It packs the result into ``CONTEXT_TOKEN_BUDGET`` tokens. Each source
+   first gets a fair share, then leftover budget goes to the best-ranked
+   sources.
+
+Token counts are estimated at ~4 characters per token, which is close
+for Llama 3 on English prose and needs no tokenizer download.
+"""
+import logging
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.lexical_index import tokenize
+
+logger = logging.getLogger("backend.graph.context")
+
+# Context packing configuration
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1500"))  # tokens of retrieved text per prompt, 0 = unlimited
+CONTEXT_PASSAGE_CHARS = int(os.getenv("CONTEXT_PASSAGE_CHARS", "400"))  # long paragraphs are split to about this size
+
+CHARS_PER_TOKEN = 4
+# Shortest shared edge treated as chunk overlap rather than coincidence
+MIN_OVERLAP_CHARS = 40
+MAX_OVERLAP_CHARS = 400
+ELLIPSIS = "\n[...]\n"
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _overlap(head: str, tail: str) -> int:
+    """Length of the longest suffix of ``head`` that is a prefix of ``tail``."""
+    for size in range(min(len(head), len(tail), MAX_OVERLAP_CHARS), MIN_OVERLAP_CHARS - 1, -1):
+        if head.endswith(tail[:size]):
+            return size
+    return 0
+
+
+def _dedupe(sources: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Drop sources contained in an earlier one and strip text shared with an
+    earlier chunk of the same document. Returns (kept sources, chars removed).
+    """
+    kept: List[Dict[str, Any]] = []
+    removed = 0
+    for source in sources:
+        content = source["content"].strip()
+        original = len(content)
+        duplicate = False
+        for other in kept:
+            if content in other["content"]:
+                duplicate = True
+                break
+            if source.get("key") is None or source.get("key") != other.get("key"):
+                continue
+            content = content[_overlap(other["content"], content):]
+            cut = _overlap(content, other["content"])
+            if cut:
+                content = content[:-cut]
+        if duplicate or not content.strip():
+            removed += original
+            continue
+        removed += original - len(content)
+        kept.append({**source, "content": content.strip()})
+    return kept, removed
+
+
+def _passages(text: str) -> List[str]:
+    """Paragraphs, with long ones split at sentence ends near CONTEXT_PASSAGE_CHARS."""
+    passages = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        while len(paragraph) > CONTEXT_PASSAGE_CHARS * 1.5:
+            cut = paragraph.rfind(". ", 0, CONTEXT_PASSAGE_CHARS) + 1 or CONTEXT_PASSAGE_CHARS
+            passages.append(paragraph[:cut].strip())
+            paragraph = paragraph[cut:].strip()
+        if paragraph:
+            passages.append(paragraph)
+    return passages
+
+
+def _trim(passages: List[str], scores: List[float], limit: int) -> str:
+    """The highest-scoring passages that fit in ``limit`` tokens, in document order."""
+    chosen, used = set(), 0
+    for i in sorted(range(len(passages)), key=lambda i: (-scores[i], i)):
+        cost = estimate_tokens(passages[i])
+        if used + cost <= limit:
+            chosen.add(i)
+            used += cost
+    if not chosen and passages and limit > 0:
+        # Nothing fits whole: keep the start of the best passage
+        best = max(range(len(passages)), key=lambda i: (scores[i], -i))
+        return passages[best][: limit * CHARS_PER_TOKEN].rstrip() + " ..."
+    parts, previous = [], None
+    for i in sorted(chosen):
+        if previous is not None and i != previous + 1:
+            parts.append(ELLIPSIS.strip())
+        parts.append(passages[i])
+        previous = i
+    return "\n\n".join(parts)
+
+
+class ContextStats:
+    """Running totals of context tokens before and after packing, for /health."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.prompts = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+
+    def record(self, before: int, after: int) -> None:
+        with self._lock:
+            self.prompts += 1
+            self.tokens_before += before
+            self.tokens_after += after
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "budget_tokens": CONTEXT_TOKEN_BUDGET,
+                "prompts": self.prompts,
+                "avg_tokens_before": round(self.tokens_before / self.prompts) if self.prompts else 0,
+                "avg_tokens_after": round(self.tokens_after / self.prompts) if self.prompts else 0,
+            }
+
+
+context_stats = ContextStats()
+
+
+def pack_context(
+    query: str,
+    sources: List[Dict[str, Any]],
+    budget: Optional[int] = None,
+    ticket_id: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Dedupe, trim and pack ranked sources into ``budget`` tokens.
+
+    Each source needs ``content``; sources with the same ``key`` (document
+    id, page URL) are treated as chunks of one document when stripping
+    overlap. Returns copies of the sources that made it in, best first,
+    with ``content`` trimmed.
+    """
+    budget = CONTEXT_TOKEN_BUDGET if budget is None else budget
+    before = sum(estimate_tokens(s["content"]) for s in sources)
+    packed, _ = _dedupe(sources)
+
+    if budget > 0 and packed:
+        terms = set(tokenize(query))
+        split = [_passages(s["content"]) for s in packed]
+        scores = [[len(terms.intersection(tokenize(p))) for p in passages] for passages in split]
+        sizes = [estimate_tokens(s["content"]) for s in packed]
+        # Fair share first, then hand what small sources left over to the best-ranked ones
+        share = budget // len(packed)
+        limits = [min(size, share) for size in sizes]
+        spare = budget - sum(limits)
+        for i, size in enumerate(sizes):
+            extra = min(size - limits[i], spare)
+            limits[i] += extra
+            spare -= extra
+        packed = [
+            {**source, "content": _trim(split[i], scores[i], limits[i]) if sizes[i] > limits[i] else source["content"]}
+            for i, source in enumerate(packed)
+        ]
+        packed = [source for source in packed if source["content"]]
+
+    after = sum(estimate_tokens(s["content"]) for s in packed)
+    context_stats.record(before, after)
+    logger.info(
+        f"Context for ticket {ticket_id or 'unknown'}: {before} -> {after} tokens, "
+        f"{len(sources)} -> {len(packed)} sources (budget {budget or 'unlimited'})"
+    )
+    return packed
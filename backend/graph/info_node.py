@@ -1,26 +1,123 @@
 import logging
-from typing import Dict, Any
-from langchain_groq import ChatGroq
+from typing import Dict, Any, List
 from services.confluence_mcp import confluence_client
+from services.answer_cache import answer_cache
+from services.llm_cache import memoize_llm
 from graph.state import OpsState
+from graph.context_builder import pack_context
+from graph.progress import acomplete, emit_progress
 
 logger = logging.getLogger("backend.graph.info_agent")
 
-# Initialize LLM for info validation
-try:
-    info_llm = ChatGroq(
-        model="llama-3.3-70b-versatile",
-        temperature=0.3,
+# LLM for info validation, created on first use (assign to override it)
+info_llm = None
+
+
+def get_info_llm():
+    """Get or create the Info Agent LLM; None if it cannot be initialized."""
+    global info_llm
+    if info_llm is None:
+        try:
+            from langchain_groq import ChatGroq
+            info_llm = memoize_llm(ChatGroq(
+                model="llama-3.3-70b-versatile",
+                temperature=0.3,
+            ))
+        except Exception as e:
+            logger.error(f"Failed to initialize Info Agent LLM: {e}")
+    return info_llm
+
+
+def _not_found(state: OpsState) -> Dict[str, Any]:
+    return {
+        **state.dict(),
+        "info_found": False,
+        "info_results": None,
+    }
+
+
+def _pack(state: OpsState, search_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Trim the pages to the context token budget; pages that add nothing are dropped."""
+    return pack_context(
+        state.description or "",
+        [{**r, "key": r.get("url")} for r in search_results],
+        ticket_id=state.ticket_id,
     )
-except Exception as e:
-    logger.error(f"Failed to initialize Info Agent LLM: {e}")
-    info_llm = None
+
+
+def _format_context(search_results: List[Dict[str, Any]]) -> str:
+    """Format context from Confluence results."""
+    return "\n\n".join([
+        f"Page: {r['title']} (Space: {r.get('space', 'Unknown')})\n{r['content']}"
+        for r in search_results
+    ])
+
+
+def _build_prompt(description: str, context: str) -> str:
+    return f"""You are a company information assistant. Based on the Confluence documentation below, provide a clear and accurate answer to the question.
+
+IMPORTANT:
+- If the documentation contains relevant information, provide a complete answer
+- If the documentation does NOT contain enough information or is not relevant, respond with exactly: "INSUFFICIENT_INFO"
+- Be thorough and include specific details from the documentation
+
+Question: {description}
+
+Confluence Documentation:
+{context}
+
+Answer:"""
+
+
+def _answer_result(state: OpsState, answer: str, search_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build the state update for an LLM answer, or a miss if the LLM found nothing."""
+    ticket_id = state.ticket_id or "unknown"
+
+    # Check if LLM indicated insufficient information
+    if "INSUFFICIENT_INFO" in answer.upper() or answer.upper().startswith("INSUFFICIENT"):
+        logger.info(f"Info Agent: Insufficient information for ticket {ticket_id}")
+        return _not_found(state)
+
+    # Format sources
+    sources = [
+        f"- [{r['title']}]({r['url']}) (Space: {r.get('space', 'Unknown')})"
+        for r in search_results
+    ]
+
+    work_comments = f"{answer}\n\n**Confluence Sources:**\n" + "\n".join(sources)
+
+    logger.info(f"Info Agent successfully answered ticket {ticket_id} from Confluence")
+
+    return {
+        **state.dict(),
+        "info_found": True,
+        "assigned_to": "Info Agent",
+        "work_comments": work_comments,
+        "result": "Information request answered from Confluence",
+        "closed": True,
+    }
+
+
+def _raw_context_result(state: OpsState, context: str, search_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """No LLM available, return raw context."""
+    logger.warning("Info Agent LLM not available, returning raw Confluence data")
+    sources = [f"- [{r['title']}]({r['url']})" for r in search_results]
+    work_comments = f"Found relevant information:\n\n{context}\n\n**Sources:**\n" + "\n".join(sources)
+
+    return {
+        **state.dict(),
+        "info_found": True,
+        "assigned_to": "Info Agent",
+        "work_comments": work_comments,
+        "result": "Information found in Confluence",
+        "closed": True,
+    }
 
 
 def info_agent(state: OpsState) -> Dict[str, Any]:
     """
     Info Agent: Search Confluence MCP server for company information.
-    
+
     This agent:
     1. Searches Confluence for relevant documentation
     2. Uses LLM to validate and format the information
@@ -29,93 +126,68 @@ def info_agent(state: OpsState) -> Dict[str, Any]:
     """
     ticket_id = state.ticket_id or "unknown"
     description = state.description or ""
-    
+
     logger.info(f"Info Agent processing ticket {ticket_id}: {description}")
-    
+
     try:
         # Search Confluence MCP server
         search_results = confluence_client.search(description, max_results=3)
-        
+
         if not search_results:
             logger.info(f"No Confluence results found for ticket {ticket_id}")
-            return {
-                **state.dict(),
-                "info_found": False,
-                "info_results": None,
-            }
-        
-        # Format context from Confluence results
-        context = "\n\n".join([
-            f"Page: {r['title']} (Space: {r.get('space', 'Unknown')})\n{r['content']}"
-            for r in search_results
-        ])
-        
+            return _not_found(state)
+
+        search_results = _pack(state, search_results)
+        context = _format_context(search_results)
+
         # Use LLM to validate and generate answer
-        if info_llm:
-            prompt = f"""You are a company information assistant. Based on the Confluence documentation below, provide a clear and accurate answer to the question.
+        llm = get_info_llm()
+        if llm:
+            response = llm.invoke(_build_prompt(description, context))
+            result = _answer_result(state, response.content.strip(), search_results)
+            if result["info_found"]:
+                answer_cache.store(description, result)
+            return result
+        else:
+            return _raw_context_result(state, context, search_results)
 
-IMPORTANT: 
-- If the documentation contains relevant information, provide a complete answer
-- If the documentation does NOT contain enough information or is not relevant, respond with exactly: "INSUFFICIENT_INFO"
-- Be thorough and include specific details from the documentation
+    except Exception as e:
+        logger.error(f"Info Agent failed for ticket {ticket_id}: {e}", exc_info=True)
+        # On error, return state unchanged to allow fallback
+        return _not_found(state)
 
-Question: {description}
 
-Confluence Documentation:
-{context}
+async def ainfo_agent(state: OpsState) -> Dict[str, Any]:
+    """Async variant of info_agent for use with ``graph.ainvoke``."""
+    ticket_id = state.ticket_id or "unknown"
+    description = state.description or ""
 
-Answer:"""
-            
-            response = info_llm.invoke(prompt)
-            answer = response.content.strip()
-            
-            # Check if LLM indicated insufficient information
-            if "INSUFFICIENT_INFO" in answer.upper() or answer.upper().startswith("INSUFFICIENT"):
-                logger.info(f"Info Agent: Insufficient information for ticket {ticket_id}")
-                return {
-                    **state.dict(),
-                    "info_found": False,
-                    "info_results": None,
-                }
-            
-            # Format sources
-            sources = [
-                f"- [{r['title']}]({r['url']}) (Space: {r.get('space', 'Unknown')})"
-                for r in search_results
-            ]
-            
-            work_comments = f"{answer}\n\n**Confluence Sources:**\n" + "\n".join(sources)
-            
-            logger.info(f"Info Agent successfully answered ticket {ticket_id} from Confluence")
-            
-            return {
-                **state.dict(),
-                "info_found": True,
-                "assigned_to": "Info Agent",
-                "work_comments": work_comments,
-                "result": "Information request answered from Confluence",
-                "closed": True,
-            }
+    logger.info(f"Info Agent processing ticket {ticket_id}: {description}")
+
+    try:
+        emit_progress("searching_confluence")
+        search_results = await confluence_client.asearch(description, max_results=3)
+
+        if not search_results:
+            logger.info(f"No Confluence results found for ticket {ticket_id}")
+            return _not_found(state)
+
+        search_results = _pack(state, search_results)
+        context = _format_context(search_results)
+
+        llm = get_info_llm()
+        if llm:
+            emit_progress("answering", source="confluence")
+            answer = await acomplete(llm, _build_prompt(description, context))
+            result = _answer_result(state, answer.strip(), search_results)
+            if result["info_found"]:
+                await answer_cache.astore(description, result)
+            else:
+                emit_progress("discard", source="confluence")
+            return result
         else:
-            # No LLM available, return raw context
-            logger.warning("Info Agent LLM not available, returning raw Confluence data")
-            sources = [f"- [{r['title']}]({r['url']})" for r in search_results]
-            work_comments = f"Found relevant information:\n\n{context}\n\n**Sources:**\n" + "\n".join(sources)
-            
-            return {
-                **state.dict(),
-                "info_found": True,
-                "assigned_to": "Info Agent",
-                "work_comments": work_comments,
-                "result": "Information found in Confluence",
-                "closed": True,
-            }
-            
+            return _raw_context_result(state, context, search_results)
+
     except Exception as e:
         logger.error(f"Info Agent failed for ticket {ticket_id}: {e}", exc_info=True)
-        # On error, return state unchanged to allow fallback
-        return {
-            **state.dict(),
-            "info_found": False,
-            "info_results": None,
-        }
+        return _not_found(state)
@@ -4,10 +4,11 @@ import requests
 import logging
 from typing import Optional
 from urllib.parse import urlparse
-from langchain_groq import ChatGroq
 from langchain_core.prompts import PromptTemplate
 from langchain_core.messages import HumanMessage, SystemMessage
-from tavily import TavilyClient
+from services.llm_cache import memoize_llm
+from services.intent_classifier import intent_classifier
+from graph.progress import emit_progress
 
 
 from dotenv import load_dotenv
@@ -17,39 +18,34 @@ load_dotenv()
 logger = logging.getLogger("backend.graph.nodes")
 
 
-client = ChatGroq(
-    api_key=os.getenv("GROQ_API_KEY"),
-    model="llama-3.1-8b-instant"
-)
-
-# Initialize TavilyClient
 TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
-tavily_client = TavilyClient(api_key=TAVILY_API_KEY)
 
-def classify_intent(state):
-    # Check if ticket_type is already set (from chatbot or API)
-    if state.ticket_type:
-        ticket_type_lower = state.ticket_type.lower()
-        
-        # Map ticket_type to intent
-        if ticket_type_lower in ["rfi", "request_for_information"]:
-            state.intent = "rfi"
-            logger.info("Ticket %s classified as RFI based on ticket_type", getattr(state, "ticket_id", "?"))
-            return state
-        elif ticket_type_lower in ["ritm", "requested_item", "request"]:
-            state.intent = "ritm"
-            logger.info("Ticket %s classified as RITM based on ticket_type", getattr(state, "ticket_id", "?"))
-            return state
-        elif ticket_type_lower in ["incident", "inc"]:
-            state.intent = "incident"
-            logger.info("Ticket %s classified as INCIDENT based on ticket_type", getattr(state, "ticket_id", "?"))
-            return state
-        elif "silence" in ticket_type_lower or ticket_type_lower == "silence_alert":
-            state.intent = "silence_alert"
-            logger.info("Ticket %s classified as silence_alert based on ticket_type", getattr(state, "ticket_id", "?"))
-            return state
-    
-    system = {
+# Clients are created on first use so importing the graph stays cheap
+_client = None
+_tavily_client = None
+
+
+def get_client():
+    """Get or create the ChatGroq client used for classification and L1 summaries."""
+    global _client
+    if _client is None:
+        from langchain_groq import ChatGroq
+        _client = memoize_llm(ChatGroq(
+            api_key=os.getenv("GROQ_API_KEY"),
+            model="llama-3.1-8b-instant"
+        ))
+    return _client
+
+
+def get_tavily_client():
+    """Get or create the Tavily web search client."""
+    global _tavily_client
+    if _tavily_client is None:
+        from tavily import TavilyClient
+        _tavily_client = TavilyClient(api_key=TAVILY_API_KEY)
+    return _tavily_client
+
+_CLASSIFY_SYSTEM = {
     "role": "system",
     "content": (
         "You are an intent-classification agent for a ServiceNow automation workflow. "
@@ -64,41 +60,101 @@ def classify_intent(state):
         "3. Do NOT modify or rephrase the labels."
     )
 }
+
+
+def _intent_from_ticket_type(state) -> bool:
+    """Map an explicit ticket_type (from chatbot or API) to an intent. Returns True if mapped."""
+    if not state.ticket_type:
+        return False
+    ticket_type_lower = state.ticket_type.lower()
+    
+    # Map ticket_type to intent
+    if ticket_type_lower in ["rfi", "request_for_information"]:
+        state.intent = "rfi"
+    elif ticket_type_lower in ["ritm", "requested_item", "request"]:
+        state.intent = "ritm"
+    elif ticket_type_lower in ["incident", "inc"]:
+        state.intent = "incident"
+    elif "silence" in ticket_type_lower or ticket_type_lower == "silence_alert":
+        state.intent = "silence_alert"
+    else:
+        return False
+    logger.info("Ticket %s classified as %s based on ticket_type", getattr(state, "ticket_id", "?"), state.intent.upper())
+    return True
+
+
+def _heuristic_intent(description: str) -> str:
+    desc = (description or "").lower()
+    if any(keyword in desc for keyword in ["know more", "how to", "what is", "explain", "search", "find", "information", "help me understand", "tell me about"]):
+        return "rfi"
+    elif any(keyword in desc for keyword in ["need access", "request", "install", "hardware", "software"]):
+        return "ritm"
+    return "incident"
+
+
+def _apply_llm_intent(state, content: str):
+    intent = content.strip().lower()
+    logger.info("ChatGroq classification for ticket %s: intent=%s", getattr(state, "ticket_id", "?"), intent)
+
+    if "rfi" in intent:
+        state.intent = "rfi"
+    elif "ritm" in intent:
+        state.intent = "ritm"
+    elif "incident" in intent:
+        state.intent = "incident"
+    else:
+        # Fallback to heuristic if LLM response is unclear
+        logger.warning("Unclear LLM response, using heuristic for ticket %s", getattr(state, "ticket_id", "?"))
+        state.intent = _heuristic_intent(state.description)
+    return state
+
+
+def _apply_local_intent(state, label, confidence) -> bool:
+    """Use the local classifier's label when it is confident enough to skip the LLM."""
+    if label is None:
+        return False
+    state.intent = label
+    logger.info("Local classifier for ticket %s: intent=%s confidence=%.2f (LLM skipped)",
+                getattr(state, "ticket_id", "?"), label, confidence)
+    return True
+
+
+def classify_intent(state):
+    # Check if ticket_type is already set (from chatbot or API)
+    if _intent_from_ticket_type(state):
+        return state
+    
+    # Fast path: local embedding classifier, LLM only below the confidence threshold
+    if _apply_local_intent(state, *intent_classifier.predict(state.description)):
+        return state
+    
     human = {"role": "user", "content": state.description}
     logger.info("human message for classification: %s", human["content"])
     try:
-        resp = client.invoke([system, human])
-        intent = resp.content.strip().lower()
+        resp = get_client().invoke([_CLASSIFY_SYSTEM, human])
+        _apply_llm_intent(state, resp.content)
+    except Exception as e:
+        logger.error("ChatGroq classification failed; using heuristic", exc_info=True)
+        state.intent = _heuristic_intent(state.description)
 
-        logger.info("ChatGroq classification for ticket %s: intent=%s", getattr(state, "ticket_id", "?"), intent)   
+    return state
 
-        if "rfi" in intent:
-            state.intent = "rfi"
-        elif "ritm" in intent:
-            state.intent = "ritm"
-        elif "incident" in intent:
-            state.intent = "incident"
-        else:
-            # Fallback to heuristic if LLM response is unclear
-            logger.warning("Unclear LLM response, using heuristic for ticket %s", getattr(state, "ticket_id", "?"))
-            desc = state.description.lower()
-            if any(keyword in desc for keyword in ["know more", "how to", "what is", "explain", "search", "find", "information", "help me understand", "tell me about"]):
-                state.intent = "rfi"
-            elif any(keyword in desc for keyword in ["need access", "request", "install", "hardware", "software"]):
-                state.intent = "ritm"
-            else:
-                state.intent = "incident"
 
-    except Exception as e:
-        logger.error("ChatGroq classification failed; using heuristic", exc_info=True)
-        desc = state.description.lower()
-        if any(keyword in desc for keyword in ["know more", "how to", "what is", "explain", "search", "find", "information", "help me understand", "tell me about"]):
-            state.intent = "rfi"
-        elif any(keyword in desc for keyword in ["need access", "request", "install", "hardware", "software"]):
-            state.intent = "ritm"
-        else:
-            state.intent = "incident"
+async def aclassify_intent(state):
+    """Async variant of classify_intent for use with ``graph.ainvoke``."""
+    if not _intent_from_ticket_type(state) and not _apply_local_intent(
+        state, *await intent_classifier.apredict(state.description)
+    ):
+        human = {"role": "user", "content": state.description}
+        logger.info("human message for classification: %s", human["content"])
+        try:
+            resp = await get_client().ainvoke([_CLASSIFY_SYSTEM, human])
+            _apply_llm_intent(state, resp.content)
+        except Exception as e:
+            logger.error("ChatGroq classification failed; using heuristic", exc_info=True)
+            state.intent = _heuristic_intent(state.description)
 
+    emit_progress("classified", intent=state.intent)
     return state
 
 def _heuristic_assign(state):
@@ -139,7 +195,7 @@ def rfi_agent(state):
     state.assigned_to = "RFI Agent"
     try:
         # Perform a web search using TavilyClient
-        response = tavily_client.search(state.description, max_results=3)
+        response = get_tavily_client().search(state.description, max_results=3)
         results = response.get("results", [])
         
         if results:
@@ -166,7 +222,7 @@ def rfi_agent(state):
             }
             
             try:
-                summary_resp = client.invoke([summary_system, summary_human])
+                summary_resp = get_client().invoke([summary_system, summary_human])
                 summary = summary_resp.content.strip()
                 
                 # Add source references
@@ -0,0 +1,65 @@
+"""
+Progress Events - Lets workflow nodes report progress and stream LLM tokens
+to a per-request sink (used by the streaming chat endpoint)
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional
+
+ProgressSink = Callable[[str, Dict[str, Any]], None]
+
+# Set per request; LangGraph runs nodes in tasks/threads that inherit the context
+_sink: ContextVar[Optional[ProgressSink]] = ContextVar("progress_sink", default=None)
+
+# Answers starting with this are refusals and are never streamed to the user
+_REFUSAL_PREFIX = "INSUFFICIENT"
+
+
+@contextmanager
+def progress_sink(sink: ProgressSink):
+    """Route progress events emitted in this context to ``sink(event, data)``."""
+    token = _sink.set(sink)
+    try:
+        yield
+    finally:
+        _sink.reset(token)
+
+
+def emit_progress(event: str, **data: Any) -> None:
+    """Report a workflow step; a no-op unless a sink is active."""
+    sink = _sink.get()
+    if sink is not None:
+        sink(event, data)
+
+
+async def acomplete(llm: Any, prompt: Any) -> str:
+    """
+    Run ``prompt`` through ``llm`` and return the completion text.
+
+    When a sink is active the completion is streamed as ``token`` events.
+    Leading text is held back until it can no longer turn into an
+    "INSUFFICIENT_INFO" refusal, so refusals never reach the user. Callers
+    that reject an answer after it has streamed should emit ``discard``.
+    """
+    if _sink.get() is None or not hasattr(llm, "astream"):
+        response = await llm.ainvoke(prompt)
+        return response.content
+
+    parts = []
+    pending = ""
+    released = False
+    async for chunk in llm.astream(prompt):
+        text = chunk.content if isinstance(chunk.content, str) else ""
+        if not text:
+            continue
+        parts.append(text)
+        if released:
+            emit_progress("token", text=text)
+            continue
+        pending += text
+        head = pending.lstrip().upper()
+        if _REFUSAL_PREFIX.startswith(head) or head.startswith(_REFUSAL_PREFIX):
+            continue
+        released = True
+        emit_progress("token", text=pending)
+    return "".join(parts)
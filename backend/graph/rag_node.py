@@ -1,26 +1,154 @@
 import logging
-from typing import Dict, Any
-from langchain_groq import ChatGroq
+import os
+from typing import Dict, Any, List
 from services.rag_service import rag_service
+from services.answer_cache import answer_cache
+from services.llm_cache import memoize_llm
 from graph.state import OpsState
+from graph.context_builder import pack_context
+from graph.progress import acomplete, emit_progress
 
 logger = logging.getLogger("backend.graph.rag_agent")
 
-# Initialize LLM for RAG responses
-try:
-    rag_llm = ChatGroq(
-        model="llama-3.3-70b-versatile",
-        temperature=0.3,
+# LLM for RAG responses, created on first use (assign to override it)
+rag_llm = None
+
+
+def get_rag_llm():
+    """Get or create the RAG Agent LLM; None if it cannot be initialized."""
+    global rag_llm
+    if rag_llm is None:
+        try:
+            from langchain_groq import ChatGroq
+            rag_llm = memoize_llm(ChatGroq(
+                model="llama-3.3-70b-versatile",
+                temperature=0.3,
+            ))
+        except Exception as e:
+            logger.error(f"Failed to initialize RAG LLM: {e}")
+    return rag_llm
+
+# Lower score is better for FAISS L2 distance
+RELEVANCE_THRESHOLD = 1.5
+# Keyword hits containing this share of the query's term weight count as relevant at any distance
+LEXICAL_RELEVANCE = float(os.getenv("RAG_LEXICAL_RELEVANCE", "0.8"))
+
+
+def is_relevant(result: Dict[str, Any]) -> bool:
+    return result["score"] < RELEVANCE_THRESHOLD or result.get("lexical_coverage", 0.0) >= LEXICAL_RELEVANCE
+
+INSUFFICIENT_INDICATORS = [
+    "don't contain enough",
+    "do not contain enough",
+    "not enough information",
+    "cannot find",
+    "unable to answer",
+    "insufficient",
+    "does not mention",
+    "do not mention",
+]
+
+
+def _not_found(state: OpsState) -> Dict[str, Any]:
+    return {
+        **state.dict(),
+        "rag_found": False,
+        "rag_results": None,
+    }
+
+
+def _relevant_results(state: OpsState, search_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Check if results are relevant enough (score threshold) and pack them for the prompt."""
+    ticket_id = state.ticket_id or "unknown"
+    if not search_results:
+        logger.info(f"No relevant documents found for ticket {ticket_id}")
+        return []
+
+    relevant_results = [r for r in search_results if is_relevant(r)]
+    if not relevant_results:
+        logger.info(f"No highly relevant documents for ticket {ticket_id}")
+        return []
+    # Overlapping chunks of one document are merged, then packed into the token budget
+    return pack_context(
+        state.description or "",
+        [{**r, "key": r["metadata"].get("doc_id")} for r in relevant_results],
+        ticket_id=ticket_id,
     )
-except Exception as e:
-    logger.error(f"Failed to initialize RAG LLM: {e}")
-    rag_llm = None
+
+
+def _format_context(relevant_results: List[Dict[str, Any]]) -> str:
+    """Format context from retrieved documents."""
+    return "\n\n".join([
+        f"Document: {r['metadata'].get('filename', 'unknown')}\n{r['content']}"
+        for r in relevant_results
+    ])
+
+
+def _build_prompt(description: str, context: str) -> str:
+    return f"""Based on the following company documents, provide a clear and concise answer to the question.
+If the documents don't contain enough information to answer, say so.
+
+Question: {description}
+
+Company Documents:
+{context}
+
+Answer:"""
+
+
+def _answer_result(state: OpsState, answer: str, relevant_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build the state update for an LLM answer, or a miss if the LLM found nothing."""
+    ticket_id = state.ticket_id or "unknown"
+
+    # Check if LLM indicated insufficient information
+    if any(indicator in answer.lower() for indicator in INSUFFICIENT_INDICATORS):
+        logger.info(f"RAG answer insufficient for ticket {ticket_id}, will fallback to RFI agent")
+        return _not_found(state)
+
+    # Format sources
+    sources = [
+        f"- {r['metadata'].get('filename', 'unknown')}"
+        for r in relevant_results
+    ]
+
+    work_comments = f"{answer}\n\nSources:\n" + "\n".join(sources)
+
+    logger.info(f"RAG Agent successfully answered ticket {ticket_id}")
+
+    return {
+        **state.dict(),
+        "rag_found": True,
+        "assigned_to": "RAG Agent",
+        "work_comments": work_comments,
+        "result": "RFI answered from company documents",
+        "closed": True,
+    }
+
+
+def _source_doc_ids(relevant_results: List[Dict[str, Any]]) -> List[str]:
+    return [r["metadata"].get("doc_id") for r in relevant_results]
+
+
+def _raw_context_result(state: OpsState, context: str, relevant_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """No LLM available, just return the raw context."""
+    logger.warning("RAG LLM not available, returning raw context")
+    sources = [f"- {r['metadata'].get('filename', 'unknown')}" for r in relevant_results]
+    work_comments = f"Relevant information found:\n\n{context}\n\nSources:\n" + "\n".join(sources)
+
+    return {
+        **state.dict(),
+        "rag_found": True,
+        "assigned_to": "RAG Agent",
+        "work_comments": work_comments,
+        "result": "RFI answered from company documents",
+        "closed": True,
+    }
 
 
 def rag_agent(state: OpsState) -> Dict[str, Any]:
     """
     RAG Agent: Search company documents first before using web search.
-    
+
     This agent:
     1. Searches the vector database for relevant company documents
     2. If found, uses LLM to generate answer from company docs
@@ -28,112 +156,66 @@ def rag_agent(state: OpsState) -> Dict[str, Any]:
     """
     ticket_id = state.ticket_id or "unknown"
     description = state.description or ""
-    
+
     logger.info(f"RAG Agent processing ticket {ticket_id}: {description}")
-    
+
     try:
         # Search vector database
         search_results = rag_service.search(description, k=3)
-        
-        if not search_results:
-            logger.info(f"No relevant documents found for ticket {ticket_id}")
-            return {
-                **state.dict(),
-                "rag_found": False,
-                "rag_results": None,
-            }
-        
-        # Check if results are relevant enough (score threshold)
-        # Lower score is better for FAISS L2 distance
-        relevant_results = [r for r in search_results if r["score"] < 1.5]
-        
+
+        relevant_results = _relevant_results(state, search_results)
         if not relevant_results:
-            logger.info(f"No highly relevant documents for ticket {ticket_id}")
-            return {
-                **state.dict(),
-                "rag_found": False,
-                "rag_results": None,
-            }
-        
-        # Format context from retrieved documents
-        context = "\n\n".join([
-            f"Document: {r['metadata'].get('filename', 'unknown')}\n{r['content']}"
-            for r in relevant_results
-        ])
-        
+            return _not_found(state)
+
+        context = _format_context(relevant_results)
+
         # Generate answer using LLM
-        if rag_llm:
-            prompt = f"""Based on the following company documents, provide a clear and concise answer to the question.
-If the documents don't contain enough information to answer, say so.
+        llm = get_rag_llm()
+        if llm:
+            response = llm.invoke(_build_prompt(description, context))
+            result = _answer_result(state, response.content, relevant_results)
+            if result["rag_found"]:
+                answer_cache.store(description, result, _source_doc_ids(relevant_results))
+            return result
+        else:
+            return _raw_context_result(state, context, relevant_results)
 
-Question: {description}
+    except Exception as e:
+        logger.error(f"RAG Agent failed for ticket {ticket_id}: {e}", exc_info=True)
+        # On error, return state unchanged to allow fallback to RFI agent
+        return _not_found(state)
 
-Company Documents:
-{context}
 
-Answer:"""
-            
-            response = rag_llm.invoke(prompt)
-            answer = response.content
-            
-            # Check if LLM indicated insufficient information
-            insufficient_indicators = [
-                "don't contain enough",
-                "do not contain enough",
-                "not enough information",
-                "cannot find",
-                "unable to answer",
-                "insufficient",
-                "does not mention",
-                "do not mention",
-            ]
-            
-            if any(indicator in answer.lower() for indicator in insufficient_indicators):
-                logger.info(f"RAG answer insufficient for ticket {ticket_id}, will fallback to RFI agent")
-                return {
-                    **state.dict(),
-                    "rag_found": False,
-                    "rag_results": None,
-                }
-            
-            # Format sources
-            sources = [
-                f"- {r['metadata'].get('filename', 'unknown')}"
-                for r in relevant_results
-            ]
-            
-            work_comments = f"{answer}\n\nSources:\n" + "\n".join(sources)
-            
-            logger.info(f"RAG Agent successfully answered ticket {ticket_id}")
-            
-            return {
-                **state.dict(),
-                "rag_found": True,
-                "assigned_to": "RAG Agent",
-                "work_comments": work_comments,
-                "result": "RFI answered from company documents",
-                "closed": True,
-            }
+async def arag_agent(state: OpsState) -> Dict[str, Any]:
+    """Async variant of rag_agent for use with ``graph.ainvoke``."""
+    ticket_id = state.ticket_id or "unknown"
+    description = state.description or ""
+
+    logger.info(f"RAG Agent processing ticket {ticket_id}: {description}")
+
+    try:
+        emit_progress("searching_knowledge_base")
+        search_results = await rag_service.asearch(description, k=3)
+
+        relevant_results = _relevant_results(state, search_results)
+        if not relevant_results:
+            return _not_found(state)
+
+        context = _format_context(relevant_results)
+
+        llm = get_rag_llm()
+        if llm:
+            emit_progress("answering", source="knowledge_base")
+            answer = await acomplete(llm, _build_prompt(description, context))
+            result = _answer_result(state, answer, relevant_results)
+            if result["rag_found"]:
+                await answer_cache.astore(description, result, _source_doc_ids(relevant_results))
+            else:
+                emit_progress("discard", source="knowledge_base")
+            return result
         else:
-            # No LLM available, just return the raw context
-            logger.warning("RAG LLM not available, returning raw context")
-            sources = [f"- {r['metadata'].get('filename', 'unknown')}" for r in relevant_results]
-            work_comments = f"Relevant information found:\n\n{context}\n\nSources:\n" + "\n".join(sources)
-            
-            return {
-                **state.dict(),
-                "rag_found": True,
-                "assigned_to": "RAG Agent",
-                "work_comments": work_comments,
-                "result": "RFI answered from company documents",
-                "closed": True,
-            }
-            
+            return _raw_context_result(state, context, relevant_results)
+
     except Exception as e:
         logger.error(f"RAG Agent failed for ticket {ticket_id}: {e}", exc_info=True)
-        # On error, return state unchanged to allow fallback to RFI agent
-        return {
-            **state.dict(),
-            "rag_found": False,
-            "rag_results": None,
-        }
+        return _not_found(state)
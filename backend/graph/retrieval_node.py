@@ -0,0 +1,214 @@
+"""
+Parallel Retrieval Node - Queries Confluence and the RAG knowledge base at the same time
+and answers from the merged candidates with a single LLM call
+"""
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from services.confluence_mcp import confluence_client
+from services.rag_service import rag_service
+from services.answer_cache import answer_cache
+from .info_node import get_info_llm
+from .progress import acomplete, emit_progress
+from .rag_node import is_relevant
+from .context_builder import pack_context
+from .state import OpsState
+
+logger = logging.getLogger("backend.graph.retrieval")
+
+# "sequential" keeps the info -> rag -> L1 chain, "parallel" uses this node instead
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "sequential").lower()
+# Rank Confluence pages ahead of knowledge-base chunks regardless of score
+RETRIEVAL_CONFLUENCE_FIRST = os.getenv("RETRIEVAL_CONFLUENCE_FIRST", "true").lower() == "true"
+RETRIEVAL_MAX_CANDIDATES = int(os.getenv("RETRIEVAL_MAX_CANDIDATES", "5"))
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="retrieval")
+
+
+def _merge_candidates(
+    confluence_results: List[Dict[str, Any]],
+    rag_results: List[Dict[str, Any]],
+    confluence_first: bool = RETRIEVAL_CONFLUENCE_FIRST,
+) -> List[Dict[str, Any]]:
+    """Normalize both result sets to a 0..1 score and rank them."""
+    confluence = [
+        {
+            "source": "confluence",
+            "label": f"Page: {r['title']} (Space: {r.get('space', 'Unknown')})",
+            "content": r["content"],
+            "score": float(r.get("relevance_score", 0.5)),
+            "reference": f"- [{r['title']}]({r['url']}) (Space: {r.get('space', 'Unknown')})",
+            "doc_id": None,
+        }
+        for r in confluence_results
+    ]
+    # FAISS returns squared L2 over unit vectors: cosine = 1 - d / 2
+    rag = [
+        {
+            "source": "rag",
+            "label": f"Document: {r['metadata'].get('filename', 'unknown')}",
+            "content": r["content"],
+            "score": max(0.0, 1.0 - r["score"] / 2),
+            "reference": f"- {r['metadata'].get('filename', 'unknown')}",
+            "doc_id": r["metadata"].get("doc_id"),
+        }
+        for r in rag_results
+        if is_relevant(r)
+    ]
+
+    by_score = lambda c: c["score"]
+    if confluence_first:
+        ranked = sorted(confluence, key=by_score, reverse=True) + sorted(rag, key=by_score, reverse=True)
+    else:
+        ranked = sorted(confluence + rag, key=by_score, reverse=True)
+    return ranked[:RETRIEVAL_MAX_CANDIDATES]
+
+
+def _pack(state: OpsState, candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Fit the ranked candidates into the context token budget."""
+    return pack_context(
+        state.description or "",
+        [{**c, "key": c["doc_id"] or c["reference"]} for c in candidates],
+        ticket_id=state.ticket_id,
+    )
+
+
+def _build_prompt(description: str, candidates: List[Dict[str, Any]]) -> str:
+    context = "\n\n".join(f"{c['label']}\n{c['content']}" for c in candidates)
+    return f"""You are a company information assistant. Based on the Confluence documentation and company documents below, provide a clear and accurate answer to the question.
+
+IMPORTANT:
+- If the sources contain relevant information, provide a complete answer
+- If the sources do NOT contain enough information or are not relevant, respond with exactly: "INSUFFICIENT_INFO"
+- Prefer sources listed first when they disagree
+
+Question: {description}
+
+Sources:
+{context}
+
+Answer:"""
+
+
+def _not_found(state: OpsState) -> Dict[str, Any]:
+    return {**state.dict(), "info_found": False, "rag_found": False}
+
+
+def _answer_result(state: OpsState, answer: str, candidates: List[Dict[str, Any]]) -> Dict[str, Any]:
+    ticket_id = state.ticket_id or "unknown"
+    if "INSUFFICIENT_INFO" in answer.upper() or answer.upper().startswith("INSUFFICIENT"):
+        logger.info(f"Parallel retrieval: insufficient information for ticket {ticket_id}")
+        return _not_found(state)
+
+    confluence_refs = [c["reference"] for c in candidates if c["source"] == "confluence"]
+    rag_refs = [c["reference"] for c in candidates if c["source"] == "rag"]
+    work_comments = answer
+    if confluence_refs:
+        work_comments += "\n\n**Confluence Sources:**\n" + "\n".join(confluence_refs)
+    if rag_refs:
+        work_comments += "\n\nSources:\n" + "\n".join(dict.fromkeys(rag_refs))
+
+    primary = candidates[0]["source"]
+    logger.info(f"Parallel retrieval answered ticket {ticket_id} (primary source: {primary})")
+    return {
+        **state.dict(),
+        "info_found": bool(confluence_refs),
+        "rag_found": bool(rag_refs),
+        "assigned_to": "Info Agent" if primary == "confluence" else "RAG Agent",
+        "work_comments": work_comments,
+        "result": "Information request answered from Confluence and company documents",
+        "closed": True,
+    }
+
+
+def _raw_context_result(state: OpsState, candidates: List[Dict[str, Any]]) -> Dict[str, Any]:
+    logger.warning("Retrieval LLM not available, returning raw context")
+    context = "\n\n".join(f"{c['label']}\n{c['content']}" for c in candidates)
+    sources = "\n".join(c["reference"] for c in candidates)
+    return {
+        **state.dict(),
+        "info_found": any(c["source"] == "confluence" for c in candidates),
+        "rag_found": any(c["source"] == "rag" for c in candidates),
+        "assigned_to": "Info Agent" if candidates[0]["source"] == "confluence" else "RAG Agent",
+        "work_comments": f"Found relevant information:\n\n{context}\n\n**Sources:**\n{sources}",
+        "result": "Information found in Confluence and company documents",
+        "closed": True,
+    }
+
+
+def _candidate_doc_ids(candidates: List[Dict[str, Any]]) -> List[str]:
+    return [c["doc_id"] for c in candidates if c["doc_id"]]
+
+
+def retrieval_agent(state: OpsState) -> Dict[str, Any]:
+    """
+    Fan-out retrieval: search Confluence and the vector store concurrently,
+    merge and rank the candidates, then answer with one LLM call.
+    """
+    ticket_id = state.ticket_id or "unknown"
+    description = state.description or ""
+    logger.info(f"Parallel retrieval processing ticket {ticket_id}: {description}")
+
+    try:
+        confluence_future = _executor.submit(confluence_client.search, description, 3)
+        rag_future = _executor.submit(rag_service.search, description, 3)
+        candidates = _pack(state, _merge_candidates(confluence_future.result(), rag_future.result()))
+
+        if not candidates:
+            logger.info(f"No Confluence or knowledge base results for ticket {ticket_id}")
+            return _not_found(state)
+
+        # Same 70B model the info agent validates with
+        answer_llm = get_info_llm()
+        if not answer_llm:
+            return _raw_context_result(state, candidates)
+
+        response = answer_llm.invoke(_build_prompt(description, candidates))
+        result = _answer_result(state, response.content.strip(), candidates)
+        if result["info_found"] or result["rag_found"]:
+            answer_cache.store(description, result, _candidate_doc_ids(candidates))
+        return result
+
+    except Exception as e:
+        logger.error(f"Parallel retrieval failed for ticket {ticket_id}: {e}", exc_info=True)
+        return _not_found(state)
+
+
+async def aretrieval_agent(state: OpsState) -> Dict[str, Any]:
+    """Async variant of retrieval_agent for use with ``graph.ainvoke``."""
+    ticket_id = state.ticket_id or "unknown"
+    description = state.description or ""
+    logger.info(f"Parallel retrieval processing ticket {ticket_id}: {description}")
+
+    try:
+        emit_progress("searching_confluence")
+        emit_progress("searching_knowledge_base")
+        confluence_results, rag_results = await asyncio.gather(
+            confluence_client.asearch(description, max_results=3),
+            rag_service.asearch(description, k=3),
+        )
+        candidates = _pack(state, _merge_candidates(confluence_results, rag_results))
+
+        if not candidates:
+            logger.info(f"No Confluence or knowledge base results for ticket {ticket_id}")
+            return _not_found(state)
+
+        answer_llm = get_info_llm()
+        if not answer_llm:
+            return _raw_context_result(state, candidates)
+
+        emit_progress("answering", source="merged")
+        answer = await acomplete(answer_llm, _build_prompt(description, candidates))
+        result = _answer_result(state, answer.strip(), candidates)
+        if result["info_found"] or result["rag_found"]:
+            await answer_cache.astore(description, result, _candidate_doc_ids(candidates))
+        else:
+            emit_progress("discard", source="merged")
+        return result
+
+    except Exception as e:
+        logger.error(f"Parallel retrieval failed for ticket {ticket_id}: {e}", exc_info=True)
+        return _not_found(state)
@@ -18,5 +18,6 @@ class OpsState(BaseModel):
     rag_results: Optional[Any] = None
     info_found: Optional[bool] = None
     info_results: Optional[Any] = None
+    cache_hit: Optional[bool] = None
     service_type: Optional[str] = None
     application: Optional[str] = None
\ No newline at end of file
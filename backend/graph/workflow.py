@@ -1,18 +1,35 @@
 from langgraph.graph import StateGraph, END
 from .state import OpsState
-from .nodes import classify_intent, grafana_agent, l1_agent
-from .rag_node import rag_agent
-from .info_node import info_agent
+from .nodes import classify_intent, aclassify_intent, grafana_agent, l1_agent
+from .rag_node import rag_agent, arag_agent
+from .info_node import info_agent, ainfo_agent
 from .rfi_l1_fallback import rfi_l1_fallback
+from .cache_node import cached_answer, acached_answer
+from .retrieval_node import retrieval_agent, aretrieval_agent, RETRIEVAL_MODE
 
-def build_graph():
+def build_graph(async_mode: bool = False, retrieval_mode: str = RETRIEVAL_MODE):
+    """
+    Build the ticket workflow.
+
+    With ``async_mode=True`` the I/O-bound nodes (classification, Confluence,
+    RAG) are registered as coroutines and the graph must be run with
+    ``await graph.ainvoke(...)``.
+
+    ``retrieval_mode="sequential"`` tries Confluence, then RAG, then L1;
+    ``"parallel"`` queries both sources at once and answers in one LLM call.
+    """
+    parallel = retrieval_mode == "parallel"
     graph = StateGraph(OpsState)
 
-    graph.add_node("classify", classify_intent)
+    graph.add_node("classify", aclassify_intent if async_mode else classify_intent)
     graph.add_node("grafana", grafana_agent)
     graph.add_node("assign_l1", l1_agent)
-    graph.add_node("info", info_agent)
-    graph.add_node("rag", rag_agent)
+    graph.add_node("answer_cache", acached_answer if async_mode else cached_answer)
+    if parallel:
+        graph.add_node("retrieve", aretrieval_agent if async_mode else retrieval_agent)
+    else:
+        graph.add_node("info", ainfo_agent if async_mode else info_agent)
+        graph.add_node("rag", arag_agent if async_mode else rag_agent)
     graph.add_node("rfi_l1_fallback", rfi_l1_fallback)
 
     graph.set_entry_point("classify")
@@ -22,9 +39,9 @@ def build_graph():
         # RITM with suppress_alerts service goes to Grafana
         if state.intent == "ritm" and state.service_type == "suppress_alerts":
             return "grafana"
-        # Other RITM and RFI go to info agent
+        # Other RITM and RFI check the answer cache, then the info agent
         elif state.intent in ["ritm", "rfi"]:
-            return "info"
+            return "answer_cache"
         elif state.intent == "incident":
             return "assign_l1"
         elif state.intent == "silence_alert":
@@ -37,33 +54,55 @@ def build_graph():
         route_after_classify,
         {
             "grafana": "grafana",
-            "info": "info",
+            "answer_cache": "answer_cache",
             "assign_l1": "assign_l1"
         }
     )
 
-    # Info agent decision: if found answer, end; otherwise go to RAG
+    # Answer cache decision: replay a cached answer, otherwise search
+    first_search = "retrieve" if parallel else "info"
     graph.add_conditional_edges(
-        "info",
-        lambda s: "end" if s.info_found else "rag",
+        "answer_cache",
+        lambda s: "end" if s.cache_hit else first_search,
         {
             "end": END,
-            "rag": "rag"
+            first_search: first_search
         }
     )
 
-    # RAG agent decision: if found answer, end; otherwise assign to L1
-    graph.add_conditional_edges(
-        "rag",
-        lambda s: "end" if s.rag_found else "rfi_l1_fallback",
-        {
-            "end": END,
-            "rfi_l1_fallback": "rfi_l1_fallback"
-        }
-    )
+    if parallel:
+        # Parallel retrieval decision: if either source answered, end; otherwise assign to L1
+        graph.add_conditional_edges(
+            "retrieve",
+            lambda s: "end" if (s.info_found or s.rag_found) else "rfi_l1_fallback",
+            {
+                "end": END,
+                "rfi_l1_fallback": "rfi_l1_fallback"
+            }
+        )
+    else:
+        # Info agent decision: if found answer, end; otherwise go to RAG
+        graph.add_conditional_edges(
+            "info",
+            lambda s: "end" if s.info_found else "rag",
+            {
+                "end": END,
+                "rag": "rag"
+            }
+        )
+
+        # RAG agent decision: if found answer, end; otherwise assign to L1
+        graph.add_conditional_edges(
+            "rag",
+            lambda s: "end" if s.rag_found else "rfi_l1_fallback",
+            {
+                "end": END,
+                "rfi_l1_fallback": "rfi_l1_fallback"
+            }
+        )
 
     graph.add_edge("grafana", END)
     graph.add_edge("assign_l1", END)
     graph.add_edge("rfi_l1_fallback", END)
 
-    return graph.compile()
\ No newline at end of file
+    return graph.compile()
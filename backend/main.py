@@ -1,9 +1,15 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Query, Header, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, validator
 from datetime import datetime
+import asyncio
+import json
 import logging
-from typing import Dict, Any, Optional, List
+import threading
+import time
+from typing import Dict, Any, Optional, List, Union
 
 # Configure basic logging for the backend
 logging.basicConfig(
@@ -12,20 +18,36 @@ logging.basicConfig(
 )
 logger = logging.getLogger("backend")
 
+from services.startup import startup
 from graph.workflow import build_graph
-from graph.chatbot_workflow import get_chatbot_graph
+from graph.chatbot_workflow import get_async_chatbot_graph
 from graph.chatbot_state import ChatbotState, ChatMessage
+from graph.progress import progress_sink, emit_progress
 from graph.chatbot_nodes import (
-    extract_info,
+    aextract_info,
     check_required_fields,
     ask_for_missing_fields,
     create_ticket_from_chat,
     parse_user_response
 )
-from services.servicenow_mock import create_ticket, tickets
-from services.grafana_mock import alerts
-from services.rag_service import rag_service
+from services.servicenow_mock import acreate_ticket, get_ticket, aupdate_ticket, list_tickets, query_tickets, tickets
+from services.grafana_mock import alerts, list_alerts
+from services.rag_service import rag_service, document_catalog
+from services.confluence_mcp import confluence_client
+from services.answer_cache import answer_cache
+from services.llm_cache import llm_cache
+from services.event_bus import event_bus, format_sse
+from services.session_store import create_session_store
+from services.training_jobs import training_jobs
 from models.ticket import TicketRequest
+import graph.nodes as graph_nodes
+import graph.chatbot_nodes as chatbot_nodes
+from graph.info_node import get_info_llm
+from graph.rag_node import get_rag_llm
+from services.intent_classifier import intent_classifier
+from graph.context_builder import context_stats
+
+startup.mark("imports")
 
 app = FastAPI(title="Ops AI Agent", version="1.0.0")
 
@@ -38,10 +60,46 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-graph = build_graph()
+# Async graph: LLM, Confluence and FAISS calls await instead of blocking the event loop
+graph = build_graph(async_mode=True)
+
+def _warm_up():
+    """Load models and indexes, then start catalog reconciliation; /ready flips when done."""
+    try:
+        rag_service.warm_up(phase=startup.phase)
+        with startup.phase("intent_centroids"):
+            intent_classifier.warm_up()
+        with startup.phase("llm_clients"):
+            graph_nodes.get_client()
+            graph_nodes.get_tavily_client()
+            chatbot_nodes.get_client()
+            get_info_llm()
+            get_rag_llm()
+        training_jobs.submit("reconcile", "catalog", lambda job: rag_service.reconcile_catalog(progress=job.report))
+        startup.mark_ready()
+    except Exception as e:
+        startup.fail(e)
+
+
+@app.on_event("startup")
+async def start_warm_up():
+    """Serve liveness immediately and warm up in the background (see /ready)."""
+    startup.mark("app_startup")
+    threading.Thread(target=_warm_up, name="warm-up", daemon=True).start()
+
 
-# Store chat sessions (in-memory for now)
-chat_sessions: Dict[str, ChatbotState] = {}
+@app.on_event("shutdown")
+async def close_resources():
+    """Release pooled Confluence connections and flush the ticket, session and document stores."""
+    await confluence_client.aclose()
+    tickets.close()
+    chat_sessions.close()
+    training_jobs.shutdown()
+    document_catalog.close()
+
+
+# Chat sessions with idle expiry, LRU eviction and capped history (SESSION_STORE=sqlite to persist)
+chat_sessions = create_session_store()
 
 
 # Pydantic models for validation
@@ -57,6 +115,31 @@ class ChatRequest(BaseModel):
         return v
 
 
+class IngestRequest(BaseModel):
+    doc_ids: Optional[List[str]] = None  # None: every file in data/uploads
+    retrain: bool = False
+
+
+class SearchFilters(BaseModel):
+    doc_id: Optional[Union[str, List[str]]] = None
+    filename: Optional[Union[str, List[str]]] = None
+
+    class Config:
+        extra = "forbid"
+
+
+class BatchSearchRequest(BaseModel):
+    queries: List[str]
+    k: int = 3
+    filters: Optional[SearchFilters] = None
+
+    @validator('k')
+    def validate_k(cls, v):
+        if not 1 <= v <= 50:
+            raise ValueError('k must be between 1 and 50')
+        return v
+
+
 class ChatResponse(BaseModel):
     session_id: str
     messages: List[Dict[str, str]]
@@ -65,32 +148,37 @@ class ChatResponse(BaseModel):
 
 
 # Helper functions
-def _update_ticket_from_result(ticket_id: str, result: dict) -> None:
+async def _update_ticket_from_result(ticket_id: str, result: dict) -> None:
     """Centralized ticket update logic."""
     if not isinstance(result, dict):
         return
     
+    updates = {}
     if assigned := result.get("assigned_to"):
-        tickets[ticket_id]["assigned_to"] = assigned
+        updates["assigned_to"] = assigned
         logger.info("Ticket %s assigned to %s", ticket_id, assigned)
     
     if work_comments := result.get("work_comments"):
-        tickets[ticket_id]["work_comments"] = work_comments
+        updates["work_comments"] = work_comments
         logger.info("Ticket %s work_comments added", ticket_id)
     
     # Close ticket if flagged by workflow or if RFI complete
     if result.get("closed") or assigned == "RFI Agent":
-        tickets[ticket_id]["status"] = "closed"
+        updates["status"] = "closed"
         logger.info("Ticket %s closed", ticket_id)
+    
+    if updates:
+        await aupdate_ticket(ticket_id, **updates)
 
 
-def _invoke_agent_workflow(state: ChatbotState) -> None:
+async def _invoke_agent_workflow(state: ChatbotState) -> None:
     """Helper to invoke main workflow and update ticket."""
     if not (state.ticket_created and state.ticket_id):
         return
     
     logger.info("Invoking agent workflow for ticket %s (intent=%s)", 
                 state.ticket_id, state.intent)
+    emit_progress("ticket_created", ticket_id=state.ticket_id)
     try:
         # Determine service_type for RITM tickets
         service_type = None
@@ -99,7 +187,7 @@ def _invoke_agent_workflow(state: ChatbotState) -> None:
             if any(keyword in desc_lower for keyword in ["suppress", "silence", "mute", "stop alert", "disable alert"]):
                 service_type = "suppress_alerts"
         
-        graph_result = graph.invoke({
+        graph_result = await graph.ainvoke({
             "ticket_id": state.ticket_id,
             "description": state.description,
             "alert_id": state.alert_id,
@@ -112,7 +200,7 @@ def _invoke_agent_workflow(state: ChatbotState) -> None:
         logger.info("Agent workflow completed for %s: %s", 
                    state.ticket_id, graph_result)
         
-        _update_ticket_from_result(state.ticket_id, graph_result)
+        await _update_ticket_from_result(state.ticket_id, graph_result)
         
         # For RFI and RITM (non-suppress) tickets, show the answer to user and ask for confirmation
         # For RITM suppress_alerts, the Grafana agent handles it directly
@@ -152,30 +240,33 @@ def _invoke_agent_workflow(state: ChatbotState) -> None:
                     state.ticket_id, str(e), exc_info=True)
 
 
-def _handle_missing_fields(state: ChatbotState) -> ChatbotState:
+async def _handle_missing_fields(state: ChatbotState) -> ChatbotState:
     """Process state when fields are missing."""
-    state = parse_user_response(state)
+    # parse_user_response / ask_for_missing_fields may call the LLM synchronously
+    state = await run_in_threadpool(parse_user_response, state)
     state = check_required_fields(state)
     
     if state.missing_fields:
-        state = ask_for_missing_fields(state)
+        state = await run_in_threadpool(ask_for_missing_fields, state)
     else:
-        state = create_ticket_from_chat(state)
-        _invoke_agent_workflow(state)
+        # Ticket creation waits on the group-committed SQLite write
+        state = await run_in_threadpool(create_ticket_from_chat, state)
+        await _invoke_agent_workflow(state)
     
     return state
 
 
-def _handle_new_message(state: ChatbotState) -> ChatbotState:
+async def _handle_new_message(state: ChatbotState) -> ChatbotState:
     """Process new user message."""
-    state = extract_info(state)
+    state = await aextract_info(state)
     state = check_required_fields(state)
     
     if state.missing_fields:
-        state = ask_for_missing_fields(state)
+        state = await run_in_threadpool(ask_for_missing_fields, state)
     else:
-        state = create_ticket_from_chat(state)
-        _invoke_agent_workflow(state)
+        # Ticket creation waits on the group-committed SQLite write
+        state = await run_in_threadpool(create_ticket_from_chat, state)
+        await _invoke_agent_workflow(state)
     
     return state
 
@@ -198,20 +289,133 @@ async def health_check():
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
         "active_sessions": len(chat_sessions),
-        "total_tickets": len(tickets)
+        "sessions": chat_sessions.stats(),
+        "training_jobs": training_jobs.stats(),
+        "vector_index": rag_service.index_stats(),
+        "embeddings": rag_service.embeddings.stats() if rag_service.embeddings else None,
+        "total_tickets": len(tickets),
+        "confluence_pool": confluence_client.pool_stats(),
+        "answer_cache": answer_cache.stats(),
+        "llm_cache": llm_cache.stats() if llm_cache else None,
+        "context": context_stats.stats(),
+        "events": event_bus.stats(),
+        "startup": startup.status(),
     }
 
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 503 until models and the vector index are loaded."""
+    status = startup.status()
+    if not status["ready"]:
+        raise HTTPException(status_code=503, detail=status)
+    return status
+
+
+def _page_response(page: Dict[str, Any]) -> Dict[str, Any]:
+    return {**page, "count": len(page["items"])}
+
+
 @app.get("/alerts")
-async def get_alerts():
-    """Get all Grafana alerts."""
-    return alerts
+async def get_alerts(
+    status: Optional[str] = None,
+    since: Optional[int] = Query(None, ge=0),
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+):
+    """
+    Get Grafana alerts.
+
+    Without parameters returns the full list. Any of ``status``, ``since``,
+    ``cursor`` or ``limit`` switches to a page envelope
+    ``{items, next_cursor, version, count}``; pass the returned ``version``
+    as ``since`` to fetch only alerts changed after it. Those carry
+    ``matches``; ``False`` means the alert no longer has ``status``.
+    """
+    if status is None and since is None and cursor is None and limit is None:
+        return alerts
+    if cursor is not None and not cursor.isdigit():
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return _page_response(list_alerts(status=status, since=since, cursor=cursor, limit=limit or 100))
 
 
 @app.get("/tickets")
-async def get_tickets():
-    """Get all ServiceNow tickets."""
-    return tickets
+async def get_tickets(
+    status: Optional[str] = None,
+    assigned_to: Optional[str] = None,
+    ticket_type: Optional[str] = None,
+    source: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    since: Optional[int] = Query(None, ge=0),
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+):
+    """
+    Get ServiceNow tickets.
+
+    Without parameters returns all tickets keyed by id. Filters (``status``,
+    ``assigned_to``, ``ticket_type``, ``source``, ``created_after``,
+    ``created_before``), ``cursor``/``limit`` pagination or ``since`` delta
+    sync switch to a page envelope ``{items, next_cursor, version, count}``.
+    ``since`` returns only tickets whose change version is greater, ordered
+    by version; pass the returned ``version`` as the next ``since``. With
+    ``since`` the filters only set each item's ``matches`` flag, so tickets
+    that changed out of the filtered view are reported with ``matches: False``.
+    """
+    params = (status, assigned_to, ticket_type, source, created_after, created_before, since, cursor, limit)
+    if all(p is None for p in params):
+        return {ticket["id"]: ticket for ticket in await run_in_threadpool(list_tickets)}
+    if cursor is not None and not cursor.isdigit():
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    page = await run_in_threadpool(
+        query_tickets,
+        status=status,
+        assigned_to=assigned_to,
+        ticket_type=ticket_type,
+        source=source,
+        created_after=created_after.isoformat() if created_after else None,
+        created_before=created_before.isoformat() if created_before else None,
+        since=since,
+        cursor=cursor,
+        limit=limit or 100,
+    )
+    return _page_response(page)
+
+
+@app.get("/events")
+async def stream_events(
+    request: Request,
+    topics: Optional[str] = None,
+    last_event_id: Optional[int] = Query(None, ge=0),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+):
+    """
+    Server-Sent Events stream of ``ticket.created``, ``ticket.updated`` and
+    ``alert.silenced`` events.
+
+    ``topics`` is an optional comma-separated filter. Reconnecting clients
+    replay missed events from the ``Last-Event-ID`` header (sent
+    automatically by EventSource) or the ``last_event_id`` query parameter.
+    A ``resync`` event means events were lost (slow consumer or replay
+    window exceeded, or an id from before a server restart) and the client
+    should re-fetch ``/tickets`` and ``/alerts``.
+    """
+    if last_event_id is None and last_event_id_header and last_event_id_header.isdigit():
+        last_event_id = int(last_event_id_header)
+    topic_list = [t.strip() for t in topics.split(",") if t.strip()] if topics else None
+
+    async def event_stream():
+        async for event in event_bus.subscribe(last_event_id, topic_list):
+            if await request.is_disconnected():
+                break
+            yield format_sse(event)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.post("/process_ticket")
@@ -221,7 +425,7 @@ async def process_ticket(req: TicketRequest):
         logger.info("Processing ticket request: ticket_type=%s alert_id=%s", 
                    req.ticket_type, req.alert_id)
         
-        ticket_id = create_ticket(
+        ticket_id = await acreate_ticket(
             req.description, 
             req.alert_id, 
             req.ticket_type, 
@@ -233,7 +437,7 @@ async def process_ticket(req: TicketRequest):
         )
         logger.info("Created ticket %s", ticket_id)
         
-        result = graph.invoke({
+        result = await graph.ainvoke({
             "ticket_id": ticket_id,
             "description": req.description,
             "alert_id": req.alert_id,
@@ -246,7 +450,7 @@ async def process_ticket(req: TicketRequest):
         logger.info("Graph result for %s: %s", ticket_id, result)
         
         # Update ticket with workflow results
-        _update_ticket_from_result(ticket_id, result)
+        await _update_ticket_from_result(ticket_id, result)
         
         return result
     except ValueError as e:
@@ -257,125 +461,130 @@ async def process_ticket(req: TicketRequest):
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
-@app.post("/chat", response_model=ChatResponse)
-async def chat(payload: ChatRequest):
-    """Handle chatbot conversation with improved structure."""
-    try:
-        logger.info("Chat request: session=%s action=%s message=%s", 
-                   payload.session_id, payload.action, payload.message)
-        
-        # Handle session initialization
-        if payload.action == "start" or payload.session_id not in chat_sessions:
-            chat_sessions[payload.session_id] = ChatbotState()
-            chatbot = get_chatbot_graph()
-            result_dict = chatbot.invoke(chat_sessions[payload.session_id].dict())
-            result = ChatbotState(**result_dict)
-            chat_sessions[payload.session_id] = result
-            return _create_chat_response(result)
-        
-        # Handle session reset
-        if payload.action == "reset":
-            chat_sessions[payload.session_id] = ChatbotState()
-            chatbot = get_chatbot_graph()
-            result_dict = chatbot.invoke(chat_sessions[payload.session_id].dict())
-            result = ChatbotState(**result_dict)
-            chat_sessions[payload.session_id] = result
-            return _create_chat_response(result)
-        
-        # Continue conversation
-        state = chat_sessions[payload.session_id]
-        
-        # Add user message
-        if payload.message:
-            state.messages.append(ChatMessage(role="user", content=payload.message))
+async def _process_chat(payload: ChatRequest) -> Dict[str, Any]:
+    """Advance a chat session by one request and return the ChatResponse payload."""
+    logger.info("Chat request: session=%s action=%s message=%s", 
+               payload.session_id, payload.action, payload.message)
+    
+    # Handle session initialization (new, expired or evicted sessions start over)
+    state = None if payload.action == "start" else chat_sessions.get(payload.session_id)
+    if state is None:
+        chat_sessions[payload.session_id] = ChatbotState()
+        chatbot = get_async_chatbot_graph()
+        result_dict = await chatbot.ainvoke(chat_sessions[payload.session_id].dict())
+        result = ChatbotState(**result_dict)
+        chat_sessions[payload.session_id] = result
+        return _create_chat_response(result)
+    
+    # Handle session reset
+    if payload.action == "reset":
+        chat_sessions[payload.session_id] = ChatbotState()
+        chatbot = get_async_chatbot_graph()
+        result_dict = await chatbot.ainvoke(chat_sessions[payload.session_id].dict())
+        result = ChatbotState(**result_dict)
+        chat_sessions[payload.session_id] = result
+        return _create_chat_response(result)
+    
+    # Continue conversation
+    # Add user message
+    if payload.message:
+        state.messages.append(ChatMessage(role="user", content=payload.message))
+    
+    # Check if last assistant message was "Is there anything else I can help you with?"
+    # and user replied no - just acknowledge and don't create new ticket
+    if (len(state.messages) >= 2 and 
+        not state.awaiting_confirmation and 
+        not state.ticket_created and
+        "anything else" in state.messages[-2].content.lower() and
+        payload.message and
+        payload.message.lower().strip() in ["no", "nope", "no thanks", "no thank you", "nothing", "that's all"]):
         
-        # Check if last assistant message was "Is there anything else I can help you with?"
-        # and user replied no - just acknowledge and don't create new ticket
-        if (len(state.messages) >= 2 and 
-            not state.awaiting_confirmation and 
-            not state.ticket_created and
-            "anything else" in state.messages[-2].content.lower() and
-            payload.message and
-            payload.message.lower().strip() in ["no", "nope", "no thanks", "no thank you", "nothing", "that's all"]):
+        state.messages.append(ChatMessage(
+            role="assistant",
+            content="👍 Alright! Feel free to reach out if you need anything in the future. Have a great day!"
+        ))
+        state.needs_user_input = False
+        chat_sessions[payload.session_id] = state
+        return _create_chat_response(state)
+    
+    # Check if awaiting confirmation for RFI ticket
+    if state.awaiting_confirmation and payload.message:
+        response_lower = payload.message.lower().strip()
+        if any(word in response_lower for word in ["yes", "yeah", "yep", "correct", "thanks", "thank you", "perfect"]):
+            # User is satisfied, close the ticket
+            # aupdate_ticket returns None for an unknown id
+            if state.ticket_id and await aupdate_ticket(state.ticket_id, status="closed"):
+                logger.info("Ticket %s closed after user confirmation", state.ticket_id)
+            
+            state.messages.append(ChatMessage(
+                role="assistant", 
+                content=f"✅ Great! I'm glad I could help. Ticket {state.ticket_id} has been closed. Is there anything else I can assist you with?"
+            ))
+            state.awaiting_confirmation = False
+            state.ticket_created = False
+            state.ticket_id = None
+            chat_sessions[payload.session_id] = state
+            return _create_chat_response(state)
+            
+        elif any(word in response_lower for word in ["no", "nope", "not really", "need more", "more info"]):
+            # User needs more information, assign to L1
+            if state.ticket_id and (ticket := await run_in_threadpool(get_ticket, state.ticket_id)):
+                await aupdate_ticket(
+                    state.ticket_id,
+                    assigned_to="L1 Team",
+                    status="open",
+                    work_comments=(ticket.get("work_comments") or "") + "\n\n**User requested additional information**\nTicket escalated to L1 Team for further assistance.",
+                )
+                logger.info("Ticket %s assigned to L1 Team after user requested more info", state.ticket_id)
             
             state.messages.append(ChatMessage(
                 role="assistant",
-                content="👍 Alright! Feel free to reach out if you need anything in the future. Have a great day!"
+                content=f"📋 I understand. Ticket {state.ticket_id} has been assigned to our L1 Team for additional research. They will provide more detailed information shortly. Is there anything else I can help you with in the meantime?"
             ))
-            state.needs_user_input = False
+            state.awaiting_confirmation = False
+            state.ticket_created = False
+            state.ticket_id = None
             chat_sessions[payload.session_id] = state
             return _create_chat_response(state)
-        
-        # Check if awaiting confirmation for RFI ticket
-        if state.awaiting_confirmation and payload.message:
-            response_lower = payload.message.lower().strip()
-            if any(word in response_lower for word in ["yes", "yeah", "yep", "correct", "thanks", "thank you", "perfect"]):
-                # User is satisfied, close the ticket
-                if state.ticket_id and state.ticket_id in tickets:
-                    tickets[state.ticket_id]["status"] = "closed"
-                    logger.info("Ticket %s closed after user confirmation", state.ticket_id)
-                
-                state.messages.append(ChatMessage(
-                    role="assistant", 
-                    content=f"✅ Great! I'm glad I could help. Ticket {state.ticket_id} has been closed. Is there anything else I can assist you with?"
-                ))
-                state.awaiting_confirmation = False
-                state.ticket_created = False
-                state.ticket_id = None
-                chat_sessions[payload.session_id] = state
-                return _create_chat_response(state)
-                
-            elif any(word in response_lower for word in ["no", "nope", "not really", "need more", "more info"]):
-                # User needs more information, assign to L1
-                if state.ticket_id and state.ticket_id in tickets:
-                    tickets[state.ticket_id]["assigned_to"] = "L1 Team"
-                    tickets[state.ticket_id]["status"] = "open"
-                    tickets[state.ticket_id]["work_comments"] += "\n\n**User requested additional information**\nTicket escalated to L1 Team for further assistance."
-                    logger.info("Ticket %s assigned to L1 Team after user requested more info", state.ticket_id)
-                
-                state.messages.append(ChatMessage(
-                    role="assistant",
-                    content=f"📋 I understand. Ticket {state.ticket_id} has been assigned to our L1 Team for additional research. They will provide more detailed information shortly. Is there anything else I can help you with in the meantime?"
-                ))
-                state.awaiting_confirmation = False
-                state.ticket_created = False
-                state.ticket_id = None
-                chat_sessions[payload.session_id] = state
-                return _create_chat_response(state)
-            else:
-                # User is asking a NEW question instead of confirming - reset state for new request
-                logger.info("User asked new question while awaiting confirmation, resetting state")
-                # Close the previous ticket first
-                if state.ticket_id and state.ticket_id in tickets:
-                    tickets[state.ticket_id]["status"] = "closed"
-                    logger.info("Auto-closing previous ticket %s", state.ticket_id)
-                
-                # Reset state for new question but keep conversation history
-                state.awaiting_confirmation = False
-                state.ticket_created = False
-                state.ticket_id = None
-                state.description = None
-                state.intent = None
-                state.alert_id = None
-                state.application = None
-                state.start_time = None
-                state.end_time = None
-                state.missing_fields = []
-                state.target_agent = None
-                state.details_requested = False
-                # Continue to process the new question below
-        
-        # Process based on current state
-        if state.missing_fields:
-            state = _handle_missing_fields(state)
         else:
-            state = _handle_new_message(state)
-        
-        # Update session
-        chat_sessions[payload.session_id] = state
-        
-        return _create_chat_response(state)
+            # User is asking a NEW question instead of confirming - reset state for new request
+            logger.info("User asked new question while awaiting confirmation, resetting state")
+            # Close the previous ticket first
+            if state.ticket_id and await aupdate_ticket(state.ticket_id, status="closed"):
+                logger.info("Auto-closing previous ticket %s", state.ticket_id)
+            
+            # Reset state for new question but keep conversation history
+            state.awaiting_confirmation = False
+            state.ticket_created = False
+            state.ticket_id = None
+            state.description = None
+            state.intent = None
+            state.alert_id = None
+            state.application = None
+            state.start_time = None
+            state.end_time = None
+            state.missing_fields = []
+            state.target_agent = None
+            state.details_requested = False
+            # Continue to process the new question below
+    
+    # Process based on current state
+    if state.missing_fields:
+        state = await _handle_missing_fields(state)
+    else:
+        state = await _handle_new_message(state)
     
+    # Update session
+    chat_sessions[payload.session_id] = state
+    
+    return _create_chat_response(state)
+
+
+@app.post("/chat", response_model=ChatResponse)
+async def chat(payload: ChatRequest):
+    """Handle chatbot conversation with improved structure."""
+    try:
+        return await _process_chat(payload)
     except ValueError as e:
         logger.error("Invalid chat request: %s", str(e))
         raise HTTPException(status_code=400, detail=str(e))
@@ -384,13 +593,70 @@ async def chat(payload: ChatRequest):
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@app.post("/chat/stream")
+async def chat_stream(payload: ChatRequest):
+    """
+    Streaming variant of ``/chat`` (Server-Sent Events).
+
+    Emits workflow progress as it happens (``ticket_created``, ``classified``,
+    ``searching_confluence``, ``searching_knowledge_base``, ``answering``),
+    answer text as ``token`` events, and ``discard`` when a streamed answer
+    was rejected and the client should drop the partial text. The last event
+    is ``response`` carrying the same body ``/chat`` returns, or ``error``.
+    """
+    loop = asyncio.get_running_loop()
+    events: "asyncio.Queue[tuple]" = asyncio.Queue()
+
+    def sink(event: str, data: Dict[str, Any]) -> None:
+        # Nodes may run on worker threads
+        loop.call_soon_threadsafe(events.put_nowait, (event, data))
+
+    async def run() -> Dict[str, Any]:
+        with progress_sink(sink):
+            return await _process_chat(payload)
+
+    async def event_stream():
+        # Not cancelled on disconnect, so the session and ticket are still updated
+        task = asyncio.create_task(run())
+        while not task.done():
+            getter = asyncio.ensure_future(events.get())
+            done, _ = await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+            if getter in done:
+                yield _sse(*getter.result())
+            else:
+                getter.cancel()
+        await asyncio.sleep(0)  # let callbacks scheduled from worker threads land
+        while not events.empty():
+            yield _sse(*events.get_nowait())
+
+        try:
+            yield _sse("response", task.result())
+        except ValueError as e:
+            logger.error("Invalid chat request: %s", str(e))
+            yield _sse("error", {"status_code": 400, "detail": str(e)})
+        except Exception:
+            logger.error("Chat processing failed", exc_info=True)
+            yield _sse("error", {"status_code": 500, "detail": "Internal server error"})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # RAG Document Management Endpoints
 @app.post("/documents/upload")
 async def upload_document(
     file: UploadFile = File(...),
-    uploaded_by: str = Form("admin")
+    uploaded_by: str = Form("admin"),
+    train: bool = Form(False)
 ):
-    """Upload a document for RAG training."""
+    """Upload a document for RAG training; ``train=true`` also queues a training job."""
     try:
         # Validate file type
         allowed_extensions = [".pdf", ".md", ".txt", ".doc", ".docx"]
@@ -406,13 +672,17 @@ async def upload_document(
         content = await file.read()
         
         # Save document
-        metadata = rag_service.save_document(content, file.filename, uploaded_by)
+        metadata = await run_in_threadpool(rag_service.save_document, content, file.filename, uploaded_by)
         
-        return {
+        response = {
             "success": True,
             "message": "Document uploaded successfully",
             "document": metadata
         }
+        if train:
+            response["job"] = training_jobs.submit_training(metadata["id"]).to_dict()
+            response["message"] = "Document uploaded, training queued"
+        return response
     except HTTPException:
         raise
     except Exception as e:
@@ -421,20 +691,94 @@ async def upload_document(
 
 
 @app.get("/documents")
-async def list_documents():
-    """Get all uploaded documents."""
+async def list_documents(
+    status: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+):
+    """
+    List uploaded documents in upload order, one page at a time.
+
+    ``total`` counts every matching document; pass ``next_cursor`` back as
+    ``cursor`` to fetch the next page (null on the last page).
+    """
+    if cursor is not None and not cursor.isdigit():
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     try:
-        documents = rag_service.get_all_documents()
+        page = rag_service.list_documents(status=status, cursor=cursor, limit=limit)
         return {
             "success": True,
-            "documents": documents,
-            "total": len(documents)
+            "documents": page["items"],
+            "total": page["total"],
+            "next_cursor": page["next_cursor"]
         }
     except Exception as e:
         logger.error(f"Failed to list documents: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/documents/ingest", status_code=202)
+async def ingest_documents(req: Optional[IngestRequest] = None):
+    """
+    Queue a bulk ingestion job: parse documents in parallel, embed in large
+    batches and write the vector store once. Without ``doc_ids`` every
+    supported file in the upload directory is ingested.
+    """
+    req = req or IngestRequest()
+    if req.doc_ids is not None:
+        missing = [d for d in req.doc_ids if not rag_service.get_document(d)]
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Documents not found: {', '.join(missing)}")
+        target = req.doc_ids
+        run = lambda job: rag_service.ingest_documents(
+            req.doc_ids, progress=job.report, is_cancelled=job.is_cancelled, skip_trained=not req.retrain
+        )
+    else:
+        target = "uploads"
+        run = lambda job: rag_service.ingest_directory(
+            progress=job.report, is_cancelled=job.is_cancelled, skip_trained=not req.retrain
+        )
+    job = training_jobs.submit("ingest", target, run)
+    return {"success": True, "message": "Bulk ingestion queued", "job": job.to_dict()}
+
+
+@app.post("/documents/compact", status_code=202)
+async def compact_documents_index():
+    """
+    Queue a rebuild of the vector index without the chunks of deleted or
+    retrained documents. Searches keep running on the old index until the
+    new one is swapped in; the job result reports size and latency before/after.
+    """
+    job = training_jobs.submit("compact", "index", lambda job: rag_service.compact_index())
+    return {"success": True, "message": "Index compaction queued", "job": job.to_dict()}
+
+
+# Job routes are declared before /documents/{doc_id} so "jobs" is not taken as a doc_id
+@app.get("/documents/jobs")
+async def list_training_jobs(status: Optional[str] = None):
+    """List background training jobs, newest first."""
+    jobs = training_jobs.list(status)
+    return {"success": True, "jobs": jobs, "total": len(jobs)}
+
+
+@app.get("/documents/jobs/{job_id}")
+async def get_training_job(job_id: str):
+    """Get the status and progress of a training job."""
+    job = training_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"success": True, "job": job.to_dict()}
+
+
+@app.delete("/documents/jobs/{job_id}")
+async def cancel_training_job(job_id: str):
+    """Cancel a queued or running training job."""
+    job = training_jobs.cancel(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"success": True, "message": "Cancellation requested", "job": job.to_dict()}
+
+
 @app.get("/documents/{doc_id}")
 async def get_document(doc_id: str):
     """Get document metadata."""
@@ -450,18 +794,22 @@ async def get_document(doc_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/documents/{doc_id}/train")
+@app.post("/documents/{doc_id}/train", status_code=202)
 async def train_document(doc_id: str):
-    """Train a document into the vector database."""
+    """Queue a document for training into the vector database; poll /documents/jobs/{job_id}."""
     try:
-        metadata = rag_service.train_document(doc_id)
+        metadata = rag_service.get_document(doc_id)
+        if not metadata:
+            raise HTTPException(status_code=404, detail=f"Document not found: {doc_id}")
+        job = training_jobs.submit_training(doc_id)
         return {
             "success": True,
-            "message": "Document trained successfully",
-            "document": metadata
+            "message": "Document training queued",
+            "document": metadata,
+            "job": job.to_dict()
         }
-    except ValueError as e:
-        raise HTTPException(status_code=404, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Document training failed: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -471,7 +819,7 @@ async def train_document(doc_id: str):
 async def delete_document(doc_id: str):
     """Delete a document."""
     try:
-        success = rag_service.delete_document(doc_id)
+        success = await run_in_threadpool(rag_service.delete_document, doc_id)
         if not success:
             raise HTTPException(status_code=404, detail="Document not found")
         return {
@@ -485,11 +833,38 @@ async def delete_document(doc_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/documents/search/batch")
+async def search_documents_batch(req: BatchSearchRequest):
+    """
+    Search many queries in one call: the queries are embedded together and
+    looked up in one vector search. ``filters`` limits results to documents
+    with the given ``doc_id`` and/or ``filename`` (a value or a list).
+    """
+    filters = req.filters.dict(exclude_none=True) if req.filters else None
+    started = time.perf_counter()
+    try:
+        results = await rag_service.asearch_batch(req.queries, req.k, filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Batch document search failed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+    return {
+        "success": True,
+        "results": [
+            {"query": query, "results": hits, "count": len(hits)}
+            for query, hits in zip(req.queries, results)
+        ],
+        "count": len(results),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
 @app.post("/documents/search")
 async def search_documents(query: str = Form(...), k: int = Form(3)):
     """Search documents in vector database."""
     try:
-        results = rag_service.search(query, k)
+        results = await rag_service.asearch(query, k)
         return {
             "success": True,
             "query": query,
@@ -0,0 +1,183 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from services.rag_service import rag_service
+
+logger = logging.getLogger("backend.services.answer_cache")
+
+# Semantic answer cache configuration
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.92"))
+ANSWER_CACHE_TTL_SECONDS = float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "512"))
+
+# State fields replayed from a cached answer
+CACHED_FIELDS = ("info_found", "rag_found", "assigned_to", "work_comments", "result", "closed")
+
+
+class SemanticAnswerCache:
+    """
+    Response cache for the Info/RAG agents keyed by query embedding.
+
+    A lookup is a hit when a live entry's embedding has cosine similarity
+    >= ``threshold`` with the query. Entries expire after ``ttl_seconds``,
+    the least recently used entry is evicted beyond ``max_entries``, and
+    entries built from a document are dropped when that document changes.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[str], Optional[List[float]]],
+        threshold: float = ANSWER_CACHE_THRESHOLD,
+        ttl_seconds: float = ANSWER_CACHE_TTL_SECONDS,
+        max_entries: int = ANSWER_CACHE_MAX_ENTRIES,
+        enabled: bool = ANSWER_CACHE_ENABLED,
+    ):
+        self.embed_fn = embed_fn
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.enabled = enabled and np is not None
+
+        self._entries: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._next_key = 0
+        self._lock = threading.Lock()
+        # Query vectors from recent lookups, reused by store()
+        self._recent_vectors: "OrderedDict[str, Any]" = OrderedDict()
+        self._counters = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    def _embed(self, query: str):
+        with self._lock:
+            if query in self._recent_vectors:
+                return self._recent_vectors[query]
+        vector = self.embed_fn(query)
+        if vector is None:
+            return None
+        vector = np.asarray(vector, dtype="float32")
+        norm = float(np.linalg.norm(vector))
+        if norm:
+            vector = vector / norm
+        with self._lock:
+            self._recent_vectors[query] = vector
+            if len(self._recent_vectors) > 64:
+                self._recent_vectors.popitem(last=False)
+        return vector
+
+    def _drop_expired(self, now: float) -> None:
+        expired = [key for key, entry in self._entries.items() if entry["expires_at"] <= now]
+        for key in expired:
+            del self._entries[key]
+        self._counters["expirations"] += len(expired)
+
+    def lookup(self, query: str) -> Optional[Dict[str, Any]]:
+        """Return the cached answer fields for a semantically matching query, if any."""
+        if not self.enabled or not query:
+            return None
+        try:
+            vector = self._embed(query)
+        except Exception as e:
+            logger.warning(f"Answer cache embedding failed, skipping lookup: {e}")
+            return None
+        if vector is None:
+            return None
+
+        with self._lock:
+            self._drop_expired(time.monotonic())
+            best_key, best_score = None, -1.0
+            for key, entry in self._entries.items():
+                score = float(np.dot(entry["vector"], vector))
+                if score > best_score:
+                    best_key, best_score = key, score
+
+            if best_key is None or best_score < self.threshold:
+                self._counters["misses"] += 1
+                return None
+
+            self._entries.move_to_end(best_key)
+            self._counters["hits"] += 1
+            entry = self._entries[best_key]
+
+        logger.info(f"Answer cache hit (similarity={best_score:.3f}) for query: {query[:50]}")
+        return dict(entry["answer"])
+
+    def store(self, query: str, result: Dict[str, Any], doc_ids: Iterable[str] = ()) -> None:
+        """Cache the answer fields of an agent result, tagged with the source documents."""
+        if not self.enabled or not query:
+            return
+        try:
+            vector = self._embed(query)
+        except Exception as e:
+            logger.warning(f"Answer cache embedding failed, not storing: {e}")
+            return
+        if vector is None:
+            return
+
+        answer = {field: result[field] for field in CACHED_FIELDS if field in result}
+        with self._lock:
+            self._entries[self._next_key] = {
+                "query": query,
+                "vector": vector,
+                "answer": answer,
+                "doc_ids": {doc_id for doc_id in doc_ids if doc_id},
+                "expires_at": time.monotonic() + self.ttl_seconds,
+            }
+            self._next_key += 1
+            self._counters["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    async def alookup(self, query: str) -> Optional[Dict[str, Any]]:
+        """Async variant of lookup; embeds the query in a worker thread."""
+        return await asyncio.to_thread(self.lookup, query)
+
+    async def astore(self, query: str, result: Dict[str, Any], doc_ids: Iterable[str] = ()) -> None:
+        """Async variant of store."""
+        await asyncio.to_thread(self.store, query, result, doc_ids)
+
+    def invalidate_document(self, doc_id: str) -> int:
+        """Drop every entry whose answer was built from ``doc_id``."""
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if doc_id in entry["doc_ids"]]
+            for key in stale:
+                del self._entries[key]
+            self._counters["invalidations"] += len(stale)
+        if stale:
+            logger.info(f"Answer cache invalidated {len(stale)} entries for document {doc_id}")
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._recent_vectors.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                **self._counters,
+                "hit_rate": round(self._counters["hits"] / lookups, 4) if lookups else 0.0,
+            }
+
+
+def _embed_query(query: str) -> Optional[List[float]]:
+    if rag_service.embeddings is None:
+        return None
+    return rag_service.embeddings.embed_query(query)
+
+
+# Global answer cache instance
+answer_cache = SemanticAnswerCache(embed_fn=_embed_query)
+rag_service.add_document_listener(answer_cache.invalidate_document)
@@ -1,7 +1,13 @@
+import asyncio
 import logging
 import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
 import requests
-from typing import List, Dict, Any, Optional
+import httpx
+from requests.adapters import HTTPAdapter
+from typing import List, Dict, Any, Optional, Tuple
 
 logger = logging.getLogger("backend.services.confluence_mcp")
 
@@ -9,17 +15,220 @@ logger = logging.getLogger("backend.services.confluence_mcp")
 CONFLUENCE_MCP_URL = os.getenv("CONFLUENCE_MCP_URL", "http://localhost:3001")
 CONFLUENCE_ENABLED = os.getenv("CONFLUENCE_ENABLED", "true").lower() == "true"
 
+# Connection pool configuration
+CONFLUENCE_POOL_SIZE = int(os.getenv("CONFLUENCE_POOL_SIZE", "10"))
+CONFLUENCE_CONNECT_TIMEOUT = float(os.getenv("CONFLUENCE_CONNECT_TIMEOUT", "3"))
+CONFLUENCE_READ_TIMEOUT = float(os.getenv("CONFLUENCE_READ_TIMEOUT", "10"))
+CONFLUENCE_KEEPALIVE_SECONDS = float(os.getenv("CONFLUENCE_KEEPALIVE_SECONDS", "30"))
+
 
 class ConfluenceMCPClient:
-    """Client for interacting with Confluence MCP server."""
+    """Client for interacting with Confluence MCP server.
+    
+    Sync calls share a keep-alive ``requests.Session`` and async calls share a
+    keep-alive ``httpx.AsyncClient``; both are capped at ``pool_size``
+    concurrent connections. Callers beyond the cap wait for a free slot,
+    which is reported as ``waiting`` by :meth:`pool_stats`.
+    
+    The async client belongs to the event loop it was created on; call
+    :meth:`aclose` on that loop before it ends (the app does so on shutdown).
+    """
     
-    def __init__(self):
+    def __init__(
+        self,
+        pool_size: int = CONFLUENCE_POOL_SIZE,
+        connect_timeout: float = CONFLUENCE_CONNECT_TIMEOUT,
+        read_timeout: float = CONFLUENCE_READ_TIMEOUT,
+        keepalive_seconds: float = CONFLUENCE_KEEPALIVE_SECONDS,
+    ):
         self.enabled = CONFLUENCE_ENABLED
         self.base_url = CONFLUENCE_MCP_URL
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.keepalive_seconds = keepalive_seconds
+        
+        # Sync pool: requests.Session + urllib3 connection pool
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._session.headers.update({"Content-Type": "application/json"})
+        self._sync_slots = threading.BoundedSemaphore(pool_size)
+        
+        # Async pool is bound to an event loop, so it is created on first use
+        self._async_http: Optional[httpx.AsyncClient] = None
+        self._async_slots: Optional[asyncio.Semaphore] = None
+        self._async_loop = None
+        self._async_lock = threading.Lock()
+        
+        # Pool usage counters
+        self._stats_lock = threading.Lock()
+        self._in_use = {"sync": 0, "async": 0}
+        # Connections each pool holds open: it opens one per concurrent request
+        # (up to pool_size) and keeps them until they sit idle for keepalive_seconds
+        self._open = {"sync": 0, "async": 0}
+        self._last_used = {"sync": 0.0, "async": 0.0}
+        self._waiting = 0
+        self._requests = 0
         
         if not self.enabled:
             logger.warning("Confluence MCP is disabled. Set CONFLUENCE_ENABLED=true to enable.")
     
+    @property
+    def timeout(self):
+        """(connect, read) timeout tuple for requests."""
+        return (self.connect_timeout, self.read_timeout)
+    
+    def _get_async_http(self) -> Tuple[httpx.AsyncClient, asyncio.Semaphore]:
+        """The async client and its slots for the running loop, replacing one left on another loop."""
+        loop = asyncio.get_running_loop()
+        with self._async_lock:
+            if self._async_http is not None and self._async_loop is loop:
+                return self._async_http, self._async_slots
+            if self._async_http is not None:
+                self._discard_async_http(self._async_http, self._async_loop)
+            self._async_http = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(
+                    max_connections=self.pool_size,
+                    max_keepalive_connections=self.pool_size,
+                    keepalive_expiry=self.keepalive_seconds,
+                ),
+                headers={"Content-Type": "application/json"},
+            )
+            self._async_slots = asyncio.Semaphore(self.pool_size)
+            self._async_loop = loop
+            return self._async_http, self._async_slots
+    
+    def _discard_async_http(self, http: httpx.AsyncClient, loop: asyncio.AbstractEventLoop) -> None:
+        """Close a client created on another event loop (on that loop, which owns its sockets)."""
+        with self._stats_lock:
+            self._open["async"] = 0
+        if loop.is_running():
+            # Requests still running there keep their own client and slots until they finish
+            asyncio.run_coroutine_threadsafe(http.aclose(), loop)
+        else:
+            logger.warning("Confluence async client's event loop ended without aclose(); its connections were not closed cleanly")
+    
+    def _mark_waiting(self, delta: int) -> None:
+        with self._stats_lock:
+            self._waiting += delta
+    
+    def _mark_in_use(self, kind: str, delta: int) -> None:
+        with self._stats_lock:
+            self._expire_idle(kind)
+            self._in_use[kind] += delta
+            self._open[kind] = min(self.pool_size, max(self._open[kind], self._in_use[kind]))
+            self._last_used[kind] = time.monotonic()
+            if delta > 0:
+                self._requests += 1
+    
+    def _expire_idle(self, kind: str) -> None:
+        """Caller holds _stats_lock. Idle connections are dropped after keepalive_seconds."""
+        if not self._in_use[kind] and time.monotonic() - self._last_used[kind] > self.keepalive_seconds:
+            self._open[kind] = 0
+    
+    @contextmanager
+    def _sync_connection(self):
+        self._mark_waiting(1)
+        self._sync_slots.acquire()
+        self._mark_waiting(-1)
+        self._mark_in_use("sync", 1)
+        try:
+            yield self._session
+        finally:
+            self._mark_in_use("sync", -1)
+            self._sync_slots.release()
+    
+    @asynccontextmanager
+    async def _async_connection(self):
+        # Held for the whole request, so a client replaced meanwhile does not affect it
+        http, slots = self._get_async_http()
+        self._mark_waiting(1)
+        try:
+            await slots.acquire()
+        finally:
+            self._mark_waiting(-1)
+        self._mark_in_use("async", 1)
+        try:
+            yield http
+        finally:
+            self._mark_in_use("async", -1)
+            slots.release()
+    
+    def pool_stats(self) -> Dict[str, Any]:
+        """
+        Connection pool usage: open, idle, in-use and waiting connections.
+        ``open`` and ``idle`` are derived from the usage counters (peak
+        concurrent requests since the pools last sat idle for
+        ``keepalive_seconds``), not read from the HTTP libraries.
+        """
+        with self._stats_lock:
+            for kind in self._open:
+                self._expire_idle(kind)
+            in_use = sum(self._in_use.values())
+            open_connections = sum(self._open.values())
+            waiting = self._waiting
+            total_requests = self._requests
+        return {
+            "pool_size": self.pool_size,
+            "open": open_connections,
+            "idle": open_connections - in_use,
+            "in_use": in_use,
+            "waiting": waiting,
+            "requests": total_requests,
+        }
+    
+    def close(self) -> None:
+        """Close pooled sync connections."""
+        self._session.close()
+        with self._stats_lock:
+            self._open["sync"] = 0
+    
+    async def aclose(self) -> None:
+        """Close pooled sync and async connections. Call on the loop the async client was used on."""
+        self.close()
+        with self._async_lock:
+            http, loop = self._async_http, self._async_loop
+            self._async_http = self._async_slots = self._async_loop = None
+        if http is None:
+            return
+        with self._stats_lock:
+            self._open["async"] = 0
+        if loop is asyncio.get_running_loop():
+            await http.aclose()
+        else:
+            self._discard_async_http(http, loop)
+    
+    @staticmethod
+    def _format_space(item: Dict[str, Any]) -> str:
+        space = item.get("space", "Unknown")
+        return space.get("key", "Unknown") if isinstance(space, dict) else space
+    
+    def _format_search_results(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Transform MCP search response to standard format."""
+        return [
+            {
+                "title": item.get("title", ""),
+                "content": item.get("content", item.get("excerpt", "")),
+                "url": item.get("url", ""),
+                "space": self._format_space(item),
+                "relevance_score": item.get("relevance_score", item.get("score", 0.5))
+            }
+            for item in data.get("results", [])
+        ]
+    
+    def _format_page(self, data: Dict[str, Any], page_id: str) -> Dict[str, Any]:
+        """Transform MCP page response to standard format."""
+        return {
+            "id": data.get("id", page_id),
+            "title": data.get("title", ""),
+            "content": data.get("content", data.get("body", "")),
+            "url": data.get("url", ""),
+            "space": self._format_space(data)
+        }
+    
     def search(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
         """
         Search Confluence for relevant pages via MCP server.
@@ -47,29 +256,12 @@ class ConfluenceMCPClient:
                 "max_results": max_results
             }
             
-            # Make request to MCP server
-            response = requests.post(
-                url,
-                json=payload,
-                timeout=10,
-                headers={"Content-Type": "application/json"}
-            )
+            # Make request to MCP server over the pooled session
+            with self._sync_connection() as session:
+                response = session.post(url, json=payload, timeout=self.timeout)
             
             if response.status_code == 200:
-                data = response.json()
-                results = data.get("results", [])
-                
-                # Transform MCP response to standard format
-                formatted_results = []
-                for item in results:
-                    formatted_results.append({
-                        "title": item.get("title", ""),
-                        "content": item.get("content", item.get("excerpt", "")),
-                        "url": item.get("url", ""),
-                        "space": item.get("space", {}).get("key", "Unknown") if isinstance(item.get("space"), dict) else item.get("space", "Unknown"),
-                        "relevance_score": item.get("relevance_score", item.get("score", 0.5))
-                    })
-                
+                formatted_results = self._format_search_results(response.json())
                 logger.info(f"Found {len(formatted_results)} results from Confluence MCP")
                 return formatted_results
             else:
@@ -105,25 +297,12 @@ class ConfluenceMCPClient:
             # MCP server endpoint for getting page
             url = f"{self.base_url}/page/{page_id}"
             
-            # Make request to MCP server
-            response = requests.get(
-                url,
-                timeout=10,
-                headers={"Content-Type": "application/json"}
-            )
+            # Make request to MCP server over the pooled session
+            with self._sync_connection() as session:
+                response = session.get(url, timeout=self.timeout)
             
             if response.status_code == 200:
-                data = response.json()
-                
-                # Transform MCP response to standard format
-                page = {
-                    "id": data.get("id", page_id),
-                    "title": data.get("title", ""),
-                    "content": data.get("content", data.get("body", "")),
-                    "url": data.get("url", ""),
-                    "space": data.get("space", {}).get("key", "Unknown") if isinstance(data.get("space"), dict) else data.get("space", "Unknown")
-                }
-                
+                page = self._format_page(response.json(), page_id)
                 logger.info(f"Successfully fetched page: {page['title']}")
                 return page
             else:
@@ -141,5 +320,85 @@ class ConfluenceMCPClient:
             return None
 
 
+    async def asearch(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
+        """
+        Async variant of :meth:`search` that does not block the event loop.
+        
+        Args:
+            query: Search query string
+            max_results: Maximum number of results to return
+            
+        Returns:
+            List of search results with title, content, and URL
+        """
+        if not self.enabled:
+            logger.info("Confluence MCP disabled, returning empty results")
+            return []
+        
+        try:
+            logger.info(f"Searching Confluence MCP server (async) for: {query}")
+            
+            async with self._async_connection() as http:
+                response = await http.post(
+                    f"{self.base_url}/search",
+                    json={"query": query, "max_results": max_results},
+                )
+            
+            if response.status_code == 200:
+                formatted_results = self._format_search_results(response.json())
+                logger.info(f"Found {len(formatted_results)} results from Confluence MCP")
+                return formatted_results
+            else:
+                logger.warning(f"Confluence MCP search returned status {response.status_code}: {response.text}")
+                return []
+            
+        except httpx.TimeoutException:
+            logger.error("Confluence MCP search timed out")
+            return []
+        except httpx.ConnectError:
+            logger.error(f"Failed to connect to Confluence MCP server at {self.base_url}")
+            return []
+        except Exception as e:
+            logger.error(f"Confluence search failed: {e}", exc_info=True)
+            return []
+    
+    async def aget_page(self, page_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Async variant of :meth:`get_page`.
+        
+        Args:
+            page_id: Confluence page ID
+            
+        Returns:
+            Page data with title, content, and metadata
+        """
+        if not self.enabled:
+            return None
+        
+        try:
+            logger.info(f"Fetching Confluence page from MCP server (async): {page_id}")
+            
+            async with self._async_connection() as http:
+                response = await http.get(f"{self.base_url}/page/{page_id}")
+            
+            if response.status_code == 200:
+                page = self._format_page(response.json(), page_id)
+                logger.info(f"Successfully fetched page: {page['title']}")
+                return page
+            else:
+                logger.warning(f"Confluence MCP get_page returned status {response.status_code}")
+                return None
+            
+        except httpx.TimeoutException:
+            logger.error("Confluence MCP get_page timed out")
+            return None
+        except httpx.ConnectError:
+            logger.error(f"Failed to connect to Confluence MCP server at {self.base_url}")
+            return None
+        except Exception as e:
+            logger.error(f"Failed to fetch Confluence page {page_id}: {e}", exc_info=True)
+            return None
+
+
 # Singleton instance
 confluence_client = ConfluenceMCPClient()
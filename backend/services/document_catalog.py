@@ -0,0 +1,307 @@
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("backend.services.document_catalog")
+
+# Document metadata catalog configuration
+DOCUMENT_CATALOG = os.getenv("DOCUMENT_CATALOG", "sqlite").lower()  # sqlite | memory
+DOCUMENT_CATALOG_PATH = os.getenv("DOCUMENT_CATALOG_PATH", "./data/documents.sqlite3")
+DOCUMENT_PAGE_MAX = 1000
+
+DOCUMENT_FIELDS = (
+    "filename",
+    "filepath",
+    "size",
+    "content_hash",
+    "uploaded_at",
+    "uploaded_by",
+    "status",
+    "trained",
+    "chunk_count",
+    "trained_at",
+    "error",
+)
+# Omitted from document dicts when unset, matching the shape callers already expect
+OPTIONAL_FIELDS = ("trained_at", "error")
+
+
+class DocumentCatalog:
+    """
+    Storage interface for RAG document metadata (doc_id -> metadata dict).
+
+    Documents are listed in registration order. Every method is a single
+    transaction, so a crash never leaves a half-updated document.
+    """
+
+    def get(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def put(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert or replace a document (keyed by ``doc["id"]``)."""
+        raise NotImplementedError
+
+    def update(self, doc_id: str, **fields: Any) -> Optional[Dict[str, Any]]:
+        """Update fields of a document; ``None`` clears optional fields. Returns it, or None if missing."""
+        updated = self.update_many({doc_id: fields})
+        return updated.get(doc_id)
+
+    def update_many(self, updates: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Apply per-document updates atomically. Returns the updated documents that exist."""
+        raise NotImplementedError
+
+    def delete(self, doc_id: str) -> bool:
+        """Remove a document and its chunk links."""
+        raise NotImplementedError
+
+    def set_chunks(self, links: Dict[str, List[str]]) -> None:
+        """Replace the chunk ids (vector index fingerprints) linked to each given document, atomically."""
+        raise NotImplementedError
+
+    def chunk_links(self) -> Dict[str, List[str]]:
+        """doc_id -> linked chunk ids in document order, for every document that has links."""
+        raise NotImplementedError
+
+    def query(self, status: Optional[str] = None, cursor: Optional[str] = None, limit: int = 100) -> Dict[str, Any]:
+        """One page of documents: ``{items, next_cursor, total}``."""
+        raise NotImplementedError
+
+    def list(self) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def __contains__(self, doc_id: object) -> bool:
+        return isinstance(doc_id, str) and self.get(doc_id) is not None
+
+    def __len__(self) -> int:
+        return self.count()
+
+    @staticmethod
+    def _clean(doc: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in doc.items() if not (k in OPTIONAL_FIELDS and v is None)}
+
+
+class InMemoryDocumentCatalog(DocumentCatalog):
+    """Process-local catalog (lost on restart)."""
+
+    def __init__(self):
+        # doc_id -> (seq, metadata)
+        self._docs: "OrderedDict[str, tuple]" = OrderedDict()
+        self._chunks: Dict[str, List[str]] = {}
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def get(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._docs.get(doc_id)
+            return dict(entry[1]) if entry else None
+
+    def put(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        doc = self._clean({**doc, "updated_at": datetime.now().isoformat()})
+        with self._lock:
+            entry = self._docs.get(doc["id"])
+            if entry is None:
+                self._seq += 1
+                self._docs[doc["id"]] = (self._seq, doc)
+            else:
+                self._docs[doc["id"]] = (entry[0], doc)
+        return dict(doc)
+
+    def update_many(self, updates: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        now = datetime.now().isoformat()
+        updated = {}
+        with self._lock:
+            for doc_id, fields in updates.items():
+                entry = self._docs.get(doc_id)
+                if entry is None:
+                    continue
+                doc = self._clean({**entry[1], **{f: v for f, v in fields.items() if f in DOCUMENT_FIELDS}, "updated_at": now})
+                self._docs[doc_id] = (entry[0], doc)
+                updated[doc_id] = dict(doc)
+        return updated
+
+    def delete(self, doc_id: str) -> bool:
+        with self._lock:
+            self._chunks.pop(doc_id, None)
+            return self._docs.pop(doc_id, None) is not None
+
+    def set_chunks(self, links: Dict[str, List[str]]) -> None:
+        with self._lock:
+            self._chunks.update({doc_id: list(ids) for doc_id, ids in links.items()})
+
+    def chunk_links(self) -> Dict[str, List[str]]:
+        with self._lock:
+            return {doc_id: list(ids) for doc_id, ids in self._chunks.items() if ids}
+
+    def query(self, status=None, cursor=None, limit=100):
+        limit = max(1, min(limit, DOCUMENT_PAGE_MAX))
+        after = int(cursor) if cursor else 0
+        with self._lock:
+            matching = [(seq, doc) for seq, doc in self._docs.values() if status is None or doc["status"] == status]
+        page = [(seq, doc) for seq, doc in matching if seq > after][:limit + 1]
+        next_cursor = str(page[limit - 1][0]) if len(page) > limit else None
+        return {"items": [dict(doc) for _, doc in page[:limit]], "next_cursor": next_cursor, "total": len(matching)}
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(doc) for _, doc in self._docs.values()]
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self._docs)
+
+
+class SQLiteDocumentCatalog(DocumentCatalog):
+    """
+    SQLite-backed catalog: metadata survives restarts and opening it does
+    not read any documents. Listing pages by registration sequence using
+    the primary key, and ``status`` filters use an index.
+    """
+
+    def __init__(self, path: str = DOCUMENT_CATALOG_PATH):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            " seq INTEGER PRIMARY KEY AUTOINCREMENT, id TEXT NOT NULL UNIQUE,"
+            " filename TEXT NOT NULL, filepath TEXT NOT NULL, size INTEGER NOT NULL DEFAULT 0,"
+            " content_hash TEXT, uploaded_at TEXT NOT NULL, uploaded_by TEXT,"
+            " status TEXT NOT NULL, trained INTEGER NOT NULL DEFAULT 0,"
+            " chunk_count INTEGER NOT NULL DEFAULT 0, trained_at TEXT, error TEXT,"
+            " updated_at TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_documents_status ON documents(status)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_documents_content_hash ON documents(content_hash)")
+        # Chunk fingerprints per document; a chunk shared by several documents has one row each
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS document_chunks ("
+            " doc_id TEXT NOT NULL, chunk_id TEXT NOT NULL, position INTEGER NOT NULL,"
+            " PRIMARY KEY (doc_id, chunk_id))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_document_chunks_chunk_id ON document_chunks(chunk_id)")
+        # No training run survives a restart; settle documents it left mid-way
+        stale = self._conn.execute(
+            "UPDATE documents SET status = CASE WHEN trained THEN 'trained' ELSE 'uploaded' END"
+            " WHERE status = 'training'"
+        ).rowcount
+        self._conn.commit()
+        if stale:
+            logger.info(f"Reset {stale} documents left in 'training' by a previous run")
+
+    @staticmethod
+    def _row_to_doc(row: sqlite3.Row) -> Dict[str, Any]:
+        doc = {"id": row["id"], **{f: row[f] for f in DOCUMENT_FIELDS}, "updated_at": row["updated_at"]}
+        doc["trained"] = bool(doc["trained"])
+        return DocumentCatalog._clean(doc)
+
+    def get(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM documents WHERE id = ?", (doc_id,)).fetchone()
+        return self._row_to_doc(row) if row else None
+
+    def put(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        values = {f: doc.get(f) for f in DOCUMENT_FIELDS}
+        values["trained"] = int(bool(values["trained"]))
+        values["chunk_count"] = values["chunk_count"] or 0
+        now = datetime.now().isoformat()
+        columns = ", ".join(DOCUMENT_FIELDS)
+        with self._lock, self._conn:
+            # Upsert keeps the original seq, so a re-registered document keeps its list position
+            self._conn.execute(
+                f"INSERT INTO documents (id, {columns}, updated_at) VALUES (?, {', '.join('?' for _ in DOCUMENT_FIELDS)}, ?)"
+                f" ON CONFLICT(id) DO UPDATE SET {', '.join(f'{f} = excluded.{f}' for f in DOCUMENT_FIELDS)},"
+                " updated_at = excluded.updated_at",
+                (doc["id"], *values.values(), now),
+            )
+        return self._clean({"id": doc["id"], **values, "trained": bool(values["trained"]), "updated_at": now})
+
+    def update_many(self, updates: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        now = datetime.now().isoformat()
+        with self._lock, self._conn:
+            for doc_id, fields in updates.items():
+                fields = {f: (int(v) if f == "trained" else v) for f, v in fields.items() if f in DOCUMENT_FIELDS}
+                assignments = "".join(f"{f} = ?, " for f in fields)
+                self._conn.execute(
+                    f"UPDATE documents SET {assignments}updated_at = ? WHERE id = ?",
+                    (*fields.values(), now, doc_id),
+                )
+            rows = self._conn.execute(
+                f"SELECT * FROM documents WHERE id IN ({', '.join('?' for _ in updates)})", tuple(updates)
+            ).fetchall() if updates else []
+        return {row["id"]: self._row_to_doc(row) for row in rows}
+
+    def delete(self, doc_id: str) -> bool:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM document_chunks WHERE doc_id = ?", (doc_id,))
+            return self._conn.execute("DELETE FROM documents WHERE id = ?", (doc_id,)).rowcount > 0
+
+    def set_chunks(self, links: Dict[str, List[str]]) -> None:
+        with self._lock, self._conn:
+            for doc_id, chunk_ids in links.items():
+                self._conn.execute("DELETE FROM document_chunks WHERE doc_id = ?", (doc_id,))
+                self._conn.executemany(
+                    "INSERT INTO document_chunks (doc_id, chunk_id, position) VALUES (?, ?, ?)",
+                    [(doc_id, chunk_id, position) for position, chunk_id in enumerate(chunk_ids)],
+                )
+
+    def chunk_links(self) -> Dict[str, List[str]]:
+        links: Dict[str, List[str]] = {}
+        with self._lock:
+            rows = self._conn.execute("SELECT doc_id, chunk_id FROM document_chunks ORDER BY doc_id, position").fetchall()
+        for row in rows:
+            links.setdefault(row["doc_id"], []).append(row["chunk_id"])
+        return links
+
+    def query(self, status=None, cursor=None, limit=100):
+        limit = max(1, min(limit, DOCUMENT_PAGE_MAX))
+        where, params = ("WHERE status = ?", [status]) if status is not None else ("", [])
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM documents {where}", params).fetchone()[0]
+            if cursor:
+                where = f"{where} AND seq > ?" if where else "WHERE seq > ?"
+                params.append(int(cursor))
+            rows = self._conn.execute(
+                f"SELECT * FROM documents {where} ORDER BY seq LIMIT ?", (*params, limit + 1)
+            ).fetchall()
+        next_cursor = str(rows[limit - 1]["seq"]) if len(rows) > limit else None
+        return {"items": [self._row_to_doc(row) for row in rows[:limit]], "next_cursor": next_cursor, "total": total}
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM documents ORDER BY seq").fetchall()
+        return [self._row_to_doc(row) for row in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def create_document_catalog(backend: str = DOCUMENT_CATALOG) -> DocumentCatalog:
+    """Build the configured document catalog."""
+    if backend == "memory":
+        return InMemoryDocumentCatalog()
+    if backend != "sqlite":
+        logger.warning(f"Unknown DOCUMENT_CATALOG '{backend}', using sqlite")
+    try:
+        return SQLiteDocumentCatalog()
+    except Exception as e:
+        logger.error(f"Failed to open document catalog at {DOCUMENT_CATALOG_PATH}, using in-memory catalog: {e}")
+        return InMemoryDocumentCatalog()
@@ -0,0 +1,193 @@
+"""
+Embedding model backends.
+
+``EMBEDDING_BACKEND`` selects how the sentence-transformers model runs:
+
+- ``hf``: eager PyTorch through LangChain's ``HuggingFaceEmbeddings``.
+- ``onnx`` (experimental): ONNX Runtime. The model is exported to ONNX
+  once and cached under ``EMBEDDING_ONNX_DIR``. With
+  ``EMBEDDING_ONNX_QUANTIZE`` its weights are dynamically quantized to
+  int8, which is smaller and faster for short queries. Pooling and
+  normalization match all-MiniLM-L6-v2 (mean pooling, L2 norm);
+  ``benchmarks/embedding_backend_bench.py`` checks parity against ``hf``.
+
+``EMBEDDING_THREADS`` caps the intra-op threads of either runtime. Without
+a cap, PyTorch and ONNX Runtime each claim every core, and they compete
+with the uvicorn workers on the same host.
+
+Every backend has the LangChain ``embed_documents``/``embed_query``
+interface, and is wrapped in the shared batching service by RAGService.
+"""
+import inspect
+import logging
+import os
+from pathlib import Path
+from typing import Any, List, Optional
+
+logger = logging.getLogger("backend.services.embedding_backends")
+
+# Embedding backend configuration
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "hf").lower()  # hf | onnx
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+EMBEDDING_THREADS = int(os.getenv("EMBEDDING_THREADS", "0"))  # intra-op threads, 0 = runtime default
+EMBEDDING_ONNX_QUANTIZE = os.getenv("EMBEDDING_ONNX_QUANTIZE", "true").lower() == "true"  # dynamic int8 weights
+EMBEDDING_ONNX_DIR = Path(os.getenv("EMBEDDING_ONNX_DIR", "./data/models"))  # exported models are cached here
+
+BACKENDS = ("hf", "onnx")
+# all-MiniLM-L6-v2 truncates input at 256 word pieces
+MAX_SEQUENCE_LENGTH = 256
+# Texts are sorted by length and run in sub-batches of this size to limit padding
+ONNX_BATCH_SIZE = 32
+
+
+class OnnxEmbeddings:
+    """Sentence embeddings from an ONNX export of a transformers encoder."""
+
+    def __init__(
+        self,
+        model_name: str = EMBEDDING_MODEL,
+        quantize: bool = EMBEDDING_ONNX_QUANTIZE,
+        threads: int = EMBEDDING_THREADS,
+        cache_dir: Path = EMBEDDING_ONNX_DIR,
+    ):
+        import numpy as np
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        self.np = np
+        self.model_name = model_name
+        self.quantized = quantize
+        model_dir = cache_dir / model_name.strip("/").replace("/", "--")
+        model_path = _export_onnx(model_name, model_dir)
+        if quantize:
+            model_path = _quantize(model_path)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads > 0:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(str(model_path), options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.tokenizer = AutoTokenizer.from_pretrained(str(model_dir))
+        logger.info(f"ONNX embeddings loaded from {model_path} (threads={threads or 'default'})")
+
+    def _encode(self, texts: List[str]) -> Any:
+        np = self.np
+        tokens = self.tokenizer(
+            texts, padding=True, truncation=True, max_length=MAX_SEQUENCE_LENGTH, return_tensors="np"
+        )
+        feed = {name: tokens[name].astype(np.int64) for name in self.input_names if name in tokens}
+        hidden = self.session.run(None, feed)[0]
+        # Mean pooling over real tokens, then L2 normalization
+        mask = tokens["attention_mask"][..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        return pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+        for start in range(0, len(order), ONNX_BATCH_SIZE):
+            batch = order[start:start + ONNX_BATCH_SIZE]
+            for i, vector in zip(batch, self._encode([texts[i] for i in batch])):
+                vectors[i] = vector.tolist()
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+def _export_onnx(model_name: str, model_dir: Path) -> Path:
+    """Export the encoder to ``model_dir/model.onnx`` (with its tokenizer), once."""
+    path = model_dir / "model.onnx"
+    if path.exists():
+        return path
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    logger.info(f"Exporting {model_name} to ONNX in {model_dir}...")
+    model_dir.mkdir(parents=True, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    encoder = AutoModel.from_pretrained(model_name).eval()
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+
+    class Encoder(torch.nn.Module):
+        # Keyword inputs (forward's positional order varies across transformers
+        # versions), and the hidden states as a plain tensor rather than a ModelOutput
+        def __init__(self):
+            super().__init__()
+            self.encoder = encoder
+
+        def forward(self, *inputs):
+            return self.encoder(**dict(zip(names, inputs))).last_hidden_state
+
+    model = Encoder().eval()
+    axes = {name: {0: "batch", 1: "sequence"} for name in names}
+    axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+    tmp = path.with_suffix(".onnx.tmp")
+    # The TorchScript exporter; newer torch defaults to the dynamo one, which needs onnxscript
+    options = {"dynamo": False} if "dynamo" in inspect.signature(torch.onnx.export).parameters else {}
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in names),
+            str(tmp),
+            input_names=names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=axes,
+            opset_version=14,
+            **options,
+        )
+    tokenizer.save_pretrained(str(model_dir))
+    tmp.replace(path)
+    return path
+
+
+def _quantize(path: Path) -> Path:
+    """Dynamic int8 quantization of the weights (activations stay float)."""
+    quantized = path.with_name("model-int8.onnx")
+    if not quantized.exists():
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        logger.info(f"Quantizing {path} to int8...")
+        tmp = quantized.with_suffix(".onnx.tmp")
+        quantize_dynamic(str(path), str(tmp), weight_type=QuantType.QInt8)
+        tmp.replace(quantized)
+    return quantized
+
+
+def _load_hf(model_name: str, threads: int) -> Any:
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+
+    if threads > 0:
+        import torch
+
+        torch.set_num_threads(threads)
+    return HuggingFaceEmbeddings(model_name=model_name)
+
+
+def load_embedding_model(
+    backend: Optional[str] = None,
+    model_name: str = EMBEDDING_MODEL,
+    threads: int = EMBEDDING_THREADS,
+    quantize: bool = EMBEDDING_ONNX_QUANTIZE,
+) -> Any:
+    """The embedding model for ``backend``. Falls back to ``hf`` if ONNX Runtime is not installed."""
+    backend = (backend or EMBEDDING_BACKEND).lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown EMBEDDING_BACKEND {backend!r}; expected one of {', '.join(BACKENDS)}")
+    if backend == "onnx":
+        try:
+            return OnnxEmbeddings(model_name, quantize=quantize, threads=threads)
+        except ImportError as e:
+            logger.warning(f"ONNX backend unavailable ({e}); install onnxruntime. Using hf")
+    return _load_hf(model_name, threads)
+
+
+def describe(model: Any) -> str:
+    if isinstance(model, OnnxEmbeddings):
+        return "onnx-int8" if model.quantized else "onnx"
+    return "hf" if type(model).__name__ == "HuggingFaceEmbeddings" else type(model).__name__
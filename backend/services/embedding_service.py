@@ -0,0 +1,215 @@
+"""
+Shared embedding service with dynamic micro-batching.
+
+Embedding runs on the CPU. A forward pass over a few dozen short texts
+costs little more than a pass over one, while concurrent single-text passes
+compete for the same cores. ``BatchingEmbeddings`` wraps the embedding model
+and calls it from a single worker thread:
+
+- callers queue their texts and block until their rows are ready;
+- the worker takes every request already queued, and while requests are
+  arriving concurrently it waits up to ``EMBED_BATCH_MAX_WAIT_MS`` for
+  more, without going past ``EMBED_BATCH_MAX_SIZE`` texts;
+- it embeds the batch in one call and hands each caller its rows.
+
+Large ``embed_documents`` calls (ingestion) are split into batch-sized
+requests, so queries can slot in between them rather than waiting for a
+whole document.
+
+Query embeddings are also kept in an LRU cache (``EMBED_QUERY_CACHE_SIZE``).
+The answer cache lookup, RAG search and answer cache store all embed the
+same ticket description.
+"""
+import logging
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Dict, List
+
+from services.embedding_backends import describe
+
+logger = logging.getLogger("backend.services.embedding_service")
+
+# Micro-batching configuration
+EMBED_BATCH_MAX_SIZE = int(os.getenv("EMBED_BATCH_MAX_SIZE", "64"))  # texts per model call
+EMBED_BATCH_MAX_WAIT_MS = float(os.getenv("EMBED_BATCH_MAX_WAIT_MS", "3"))  # how long a batch waits to fill
+EMBED_QUERY_CACHE_SIZE = int(os.getenv("EMBED_QUERY_CACHE_SIZE", "2048"))  # cached query vectors, 0 disables
+
+
+class _Request:
+    __slots__ = ("texts", "future")
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.future: Future = Future()
+
+
+class BatchingEmbeddings:
+    """
+    Drop-in replacement for a LangChain ``Embeddings`` object
+    (``embed_documents``, ``embed_query``) that batches concurrent calls
+    into one model call. ``embed_queries``/``submit_queries`` embed
+    several queries through the query cache.
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        max_batch_size: int = EMBED_BATCH_MAX_SIZE,
+        max_wait_ms: float = EMBED_BATCH_MAX_WAIT_MS,
+        cache_size: int = EMBED_QUERY_CACHE_SIZE,
+    ):
+        self.model = model
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._queue: "queue.Queue[_Request]" = queue.Queue()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.texts = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [vector for request in self._submit(list(texts)) for vector in request.future.result()]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_queries([text])[0]
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Embed queries, taking repeated ones from the LRU cache."""
+        return self.submit_queries(texts).result()
+
+    def submit_queries(self, texts: List[str]) -> Future:
+        """
+        Queue queries for embedding and return a Future of their vectors, so
+        the caller can do other work (e.g. keyword search) meanwhile.
+        """
+        found: Dict[str, List[float]] = {}
+        if self.cache_size > 0:
+            with self._cache_lock:
+                for text in texts:
+                    vector = self._cache.get(text)
+                    if vector is not None:
+                        self._cache.move_to_end(text)
+                        found[text] = vector
+        missing = list(dict.fromkeys(text for text in texts if text not in found))
+        with self._stats_lock:
+            self.cache_hits += len(texts) - len(missing)
+            self.cache_misses += len(missing)
+
+        result: Future = Future()
+        if not missing:
+            result.set_result([found[text] for text in texts])
+            return result
+        requests = self._submit(missing)
+        pending = [len(requests)]
+        pending_lock = threading.Lock()
+
+        def finish(_: Future) -> None:
+            with pending_lock:
+                pending[0] -= 1
+                if pending[0]:
+                    return
+            try:
+                vectors = [vector for request in requests for vector in request.future.result()]
+            except Exception as e:
+                result.set_exception(e)
+                return
+            found.update(zip(missing, vectors))
+            self._remember(missing, vectors)
+            result.set_result([found[text] for text in texts])
+
+        for request in requests:
+            request.future.add_done_callback(finish)
+        return result
+
+    def _remember(self, texts: List[str], vectors: List[List[float]]) -> None:
+        if self.cache_size <= 0:
+            return
+        with self._cache_lock:
+            for text, vector in zip(texts, vectors):
+                self._cache[text] = vector
+                self._cache.move_to_end(text)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def __call__(self, text: str) -> List[float]:
+        return self.embed_query(text)
+
+    def _submit(self, texts: List[str]) -> List[_Request]:
+        """Queue ``texts`` as batch-sized requests."""
+        if self._worker is None:
+            with self._worker_lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                    self._worker.start()
+        requests = [
+            _Request(texts[start:start + self.max_batch_size])
+            for start in range(0, len(texts), self.max_batch_size)
+        ]
+        for request in requests:
+            self._queue.put(request)
+        # Let the worker pick the batch up now; a caller that goes on to CPU-bound
+        # work would otherwise hold the GIL until the next forced switch (~5 ms)
+        time.sleep(0)
+        return requests
+
+    def _run(self) -> None:
+        carry = None
+        concurrent = False
+        while True:
+            first, carry = carry or self._queue.get(), None
+            batch, size = [first], len(first.texts)
+            # A lone caller is not kept waiting; once callers overlap, batches are given time to fill
+            deadline = time.monotonic() + (self.max_wait if concurrent else 0.0)
+            while size < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    # Past the deadline, still take whatever is already queued
+                    request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if size + len(request.texts) > self.max_batch_size:
+                    carry = request
+                    break
+                batch.append(request)
+                size += len(request.texts)
+
+            try:
+                vectors = self.model.embed_documents([text for request in batch for text in request.texts])
+            except Exception as e:
+                logger.error(f"Embedding batch of {size} texts failed: {e}")
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+            offset = 0
+            for request in batch:
+                request.future.set_result(vectors[offset:offset + len(request.texts)])
+                offset += len(request.texts)
+            concurrent = len(batch) > 1 or carry is not None or not self._queue.empty()
+            with self._stats_lock:
+                self.batches += 1
+                self.texts += size
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            lookups = self.cache_hits + self.cache_misses
+            return {
+                "backend": describe(self.model),
+                "batches": self.batches,
+                "texts": self.texts,
+                "avg_batch_size": round(self.texts / self.batches, 2) if self.batches else 0,
+                "queued": self._queue.qsize(),
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "query_cache_entries": len(self._cache),
+                "query_cache_hit_rate": round(self.cache_hits / lookups, 3) if lookups else 0.0,
+            }
@@ -0,0 +1,164 @@
+"""
+In-process event bus for pushing ticket and alert changes to dashboards.
+
+Publishers (ticket repository wrappers, the Grafana mock) call ``publish``
+from any thread. Each subscriber gets a bounded asyncio queue; a subscriber
+that falls behind is not allowed to hold up publishers or grow without
+bound - its backlog is dropped and it receives a single ``resync`` event
+telling it to re-fetch (``GET /tickets?since=<version>``). Recent events
+are kept in a ring buffer so a reconnecting client can replay from its
+``Last-Event-ID``.
+"""
+import asyncio
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+
+logger = logging.getLogger("backend.services.event_bus")
+
+# Event bus configuration
+EVENT_BUFFER_SIZE = int(os.getenv("EVENT_BUFFER_SIZE", "1000"))  # events kept for Last-Event-ID replay
+EVENT_SUBSCRIBER_QUEUE_SIZE = int(os.getenv("EVENT_SUBSCRIBER_QUEUE_SIZE", "256"))
+EVENT_KEEPALIVE_SECONDS = float(os.getenv("EVENT_KEEPALIVE_SECONDS", "15"))
+
+TICKET_CREATED = "ticket.created"
+TICKET_UPDATED = "ticket.updated"
+ALERT_SILENCED = "alert.silenced"
+RESYNC = "resync"
+
+
+class _Subscriber:
+    def __init__(self, loop: asyncio.AbstractEventLoop, queue_size: int, topics: Optional[set]):
+        self.loop = loop
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=queue_size)
+        self.topics = topics
+        self.overflowed = False
+
+    def wants(self, event: Dict[str, Any]) -> bool:
+        return self.topics is None or event["type"] in self.topics or event["type"] == RESYNC
+
+    def offer(self, event: Dict[str, Any]) -> None:
+        """Runs on the subscriber's loop."""
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Drop the backlog and tell the client to re-fetch instead
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"id": event["id"], "type": RESYNC, "data": {"reason": "slow_consumer"}})
+
+
+class EventBus:
+    """Thread-safe fan-out of change events to asyncio subscribers."""
+
+    def __init__(self, buffer_size: int = EVENT_BUFFER_SIZE, queue_size: int = EVENT_SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._buffer: Deque[Dict[str, Any]] = deque(maxlen=buffer_size)
+        self._subscribers: List[_Subscriber] = []
+        self._ids = itertools.count(1)
+        self._last_id = 0
+        self._lock = threading.Lock()
+        self._published = 0
+        self._resyncs = 0
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Record an event and hand it to every subscriber. Safe to call from any thread."""
+        with self._lock:
+            event = {"id": next(self._ids), "type": event_type, "data": data, "ts": time.time()}
+            self._last_id = event["id"]
+            self._buffer.append(event)
+            self._published += 1
+            subscribers = list(self._subscribers)
+
+        for subscriber in subscribers:
+            if not subscriber.wants(event):
+                continue
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.offer, event)
+            except RuntimeError:
+                # Subscriber's loop has closed; it is removed on unsubscribe
+                pass
+        return event
+
+    def _replay(self, last_event_id: Optional[int]) -> List[Dict[str, Any]]:
+        if last_event_id is None:
+            return []
+        with self._lock:
+            buffered = list(self._buffer)
+            last_id = self._last_id
+        if last_event_id > last_id:
+            # An id this process never issued, e.g. from before a restart (ids start again at 1)
+            self._resyncs += 1
+            return [{"id": last_id, "type": RESYNC, "data": {"reason": "unknown_event_id"}}]
+        if buffered and buffered[0]["id"] > last_event_id + 1:
+            # Requested events have been evicted from the ring buffer
+            self._resyncs += 1
+            return [{"id": buffered[-1]["id"], "type": RESYNC, "data": {"reason": "replay_gap"}}]
+        return [e for e in buffered if e["id"] > last_event_id]
+
+    async def subscribe(
+        self,
+        last_event_id: Optional[int] = None,
+        topics: Optional[List[str]] = None,
+    ) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Yield events as they are published, starting with any buffered events
+        after ``last_event_id``. Yields ``None`` every EVENT_KEEPALIVE_SECONDS
+        without traffic so the caller can send a keep-alive.
+        """
+        subscriber = _Subscriber(asyncio.get_running_loop(), self.queue_size, set(topics) if topics else None)
+        with self._lock:
+            self._subscribers.append(subscriber)
+        try:
+            # Registered before replaying, so nothing published in between is lost
+            replayed = [e for e in self._replay(last_event_id) if subscriber.wants(e)]
+            seen = replayed[-1]["id"] if replayed else (last_event_id or 0)
+            for event in replayed:
+                yield event
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), EVENT_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if event["type"] == RESYNC:
+                    self._resyncs += 1
+                    subscriber.overflowed = False
+                    logger.warning("Event subscriber fell behind, sent resync at event %s", event["id"])
+                elif event["id"] <= seen:
+                    continue
+                seen = event["id"]
+                yield event
+        finally:
+            with self._lock:
+                self._subscribers.remove(subscriber)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "published": self._published,
+                "buffered": len(self._buffer),
+                "last_event_id": self._buffer[-1]["id"] if self._buffer else 0,
+                "resyncs": self._resyncs,
+            }
+
+
+def format_sse(event: Optional[Dict[str, Any]]) -> str:
+    """Encode an event (or a keep-alive for ``None``) as a text/event-stream frame."""
+    if event is None:
+        return ": keep-alive\n\n"
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+
+
+# Global event bus instance
+event_bus = EventBus()
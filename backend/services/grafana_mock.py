@@ -1,26 +1,72 @@
 import logging
+import threading
+
+from services.event_bus import event_bus, ALERT_SILENCED
 
 logger = logging.getLogger("backend.services.grafana")
 
 alerts = [
-    {"id": "1", "name": "Real User Monitoring Alert", "status": "ok"},
-    {"id": "2", "name": "API Monitoring Alerts", "status": "ok"},
-    {"id": "3", "name": "User Flow Monitoring Alerts", "status": "ok"},
-    {"id": "4", "name": "Infrastructure Alerts", "status": "ok"},
+    {"id": "1", "name": "Real User Monitoring Alert", "status": "ok", "version": 0},
+    {"id": "2", "name": "API Monitoring Alerts", "status": "ok", "version": 0},
+    {"id": "3", "name": "User Flow Monitoring Alerts", "status": "ok", "version": 0},
+    {"id": "4", "name": "Infrastructure Alerts", "status": "ok", "version": 0},
 ]
 
+# Monotonic change counter; each alert records the value of its last change
+_alerts_version = 0
+_alerts_lock = threading.Lock()
+
+ALERT_PAGE_MAX = 1000
+
 
 def silence_alert(alert_id, start_time=None, end_time=None):
+    global _alerts_version
     logger.info("Silence request for alert %s start=%s end=%s", alert_id, start_time, end_time)
     for a in alerts:
         if a["id"] == alert_id:
-            a["status"] = "silenced"
-            # record suppression window if provided
-            if start_time:
-                a["silenced_from"] = str(start_time)
-            if end_time:
-                a["silenced_until"] = str(end_time)
+            with _alerts_lock:
+                a["status"] = "silenced"
+                # record suppression window if provided
+                if start_time:
+                    a["silenced_from"] = str(start_time)
+                if end_time:
+                    a["silenced_until"] = str(end_time)
+                _alerts_version += 1
+                a["version"] = _alerts_version
+                silenced = dict(a)
+            event_bus.publish(ALERT_SILENCED, silenced)
             logger.info("Alert %s silenced, window from=%s to=%s", alert_id, a.get("silenced_from"), a.get("silenced_until"))
             return {"status": "success", "silenced_from": a.get("silenced_from"), "silenced_until": a.get("silenced_until")}
     logger.warning("Alert %s not found to silence", alert_id)
-    return {"status": "not_found"}
\ No newline at end of file
+    return {"status": "not_found"}
+
+
+def list_alerts(status=None, since=None, cursor=None, limit=100):
+    """
+    One page of alerts, optionally filtered by status. With ``since`` every
+    alert changed after that version is returned, in change order, with
+    ``matches`` set to whether it has ``status`` (so a client can drop an
+    alert that left its filtered view).
+    Returns ``{"items", "next_cursor", "version"}``.
+    """
+    limit = max(1, min(limit, ALERT_PAGE_MAX))
+    with _alerts_lock:
+        version = _alerts_version
+        snapshot = [dict(a) for a in alerts]
+
+    if since is not None:
+        after = max(since, int(cursor)) if cursor else since
+        matches = sorted(
+            ({**a, "matches": status is None or a["status"] == status} for a in snapshot if a["version"] > after),
+            key=lambda a: a["version"],
+        )
+        position = lambda a: a["version"]
+    else:
+        # Alert ids are numeric strings in list order
+        after = int(cursor) if cursor else 0
+        matches = [a for a in snapshot if (status is None or a["status"] == status) and int(a["id"]) > after]
+        position = lambda a: int(a["id"])
+
+    page = matches[:limit]
+    next_cursor = str(position(page[-1])) if len(matches) > limit else None
+    return {"items": page, "next_cursor": next_cursor, "version": version}
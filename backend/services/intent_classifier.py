@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from services.rag_service import rag_service
+
+logger = logging.getLogger("backend.services.intent_classifier")
+
+# Local fast-path classifier configuration
+INTENT_FASTPATH_ENABLED = os.getenv("INTENT_FASTPATH_ENABLED", "true").lower() == "true"
+INTENT_FASTPATH_THRESHOLD = float(os.getenv("INTENT_FASTPATH_THRESHOLD", "0.8"))
+# Softmax temperature over cosine similarities; lower = more confident
+INTENT_FASTPATH_TEMPERATURE = float(os.getenv("INTENT_FASTPATH_TEMPERATURE", "0.05"))
+
+# Labelled seed examples the centroids are built from
+SEED_EXAMPLES: Dict[str, List[str]] = {
+    "rfi": [
+        "what is the password policy",
+        "how to onboard a new employee",
+        "tell me about the leave policy",
+        "explain the expense reimbursement process",
+        "where can I find the VPN setup guide",
+        "how do I configure my email signature",
+        "what are the office working hours",
+        "I want to know more about the travel policy",
+        "help me understand the code review guidelines",
+        "what is the process for requesting time off",
+        "how does the backup retention policy work",
+        "find documentation about the deployment process",
+    ],
+    "ritm": [
+        "I need access to Jira",
+        "request a new laptop",
+        "please install Visual Studio Code on my machine",
+        "create a new user account for a new joiner",
+        "suppress alerts for website 1 tomorrow",
+        "silence the API monitoring alert during maintenance",
+        "grant me admin permissions on the staging database",
+        "I need a software license for Photoshop",
+        "request a second monitor",
+        "add me to the finance shared drive",
+        "mute infrastructure alerts for the deployment window",
+        "provision a new virtual machine for testing",
+    ],
+    "incident": [
+        "my laptop is not working",
+        "the application is down",
+        "I am getting an error message when I log in",
+        "the website returns a 500 error",
+        "email is not syncing on my phone",
+        "VPN keeps disconnecting",
+        "the printer on floor 3 is broken",
+        "payment service is timing out",
+        "users cannot access the portal since this morning",
+        "database connection failures in production",
+        "my account is locked and I cannot sign in",
+        "the build pipeline is failing with a crash",
+    ],
+}
+
+
+class EmbeddingIntentClassifier:
+    """
+    Nearest-centroid intent classifier over sentence embeddings.
+
+    ``classify`` returns the closest label and a softmax confidence over the
+    cosine similarities to each label centroid. Callers only need the LLM
+    when the confidence is below ``threshold``.
+    """
+
+    def __init__(
+        self,
+        embed_documents: Callable[[List[str]], List[List[float]]],
+        examples: Dict[str, List[str]] = SEED_EXAMPLES,
+        threshold: float = INTENT_FASTPATH_THRESHOLD,
+        temperature: float = INTENT_FASTPATH_TEMPERATURE,
+        enabled: bool = INTENT_FASTPATH_ENABLED,
+    ):
+        self.embed_documents = embed_documents
+        self.examples = examples
+        self.threshold = threshold
+        self.temperature = temperature
+        self.enabled = enabled and np is not None
+        self.labels: List[str] = list(examples.keys())
+        self._centroids = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(matrix):
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def _ensure_centroids(self) -> bool:
+        if self._centroids is not None:
+            return True
+        with self._lock:
+            if self._centroids is not None:
+                return True
+            texts = [text for label in self.labels for text in self.examples[label]]
+            vectors = self.embed_documents(texts)
+            if vectors is None:
+                return False
+            vectors = self._normalize(np.asarray(vectors, dtype="float32"))
+            centroids, offset = [], 0
+            for label in self.labels:
+                count = len(self.examples[label])
+                centroids.append(vectors[offset:offset + count].mean(axis=0))
+                offset += count
+            self._centroids = self._normalize(np.stack(centroids))
+            logger.info(f"Intent classifier centroids built from {len(texts)} examples")
+            return True
+
+    def warm_up(self) -> bool:
+        """Build the centroids ahead of the first request; False if embeddings are unavailable."""
+        try:
+            return self.enabled and self._ensure_centroids()
+        except Exception as e:
+            logger.warning(f"Intent classifier warm-up failed: {e}")
+            return False
+
+    def classify(self, text: str) -> Tuple[Optional[str], float]:
+        """Return (label, confidence); (None, 0.0) if the classifier is unavailable."""
+        if not self.enabled or not text:
+            return None, 0.0
+        try:
+            if not self._ensure_centroids():
+                return None, 0.0
+            query = self.embed_documents([text])
+            if query is None:
+                return None, 0.0
+            query = self._normalize(np.asarray(query, dtype="float32"))[0]
+            sims = self._centroids @ query
+            logits = (sims - sims.max()) / self.temperature
+            probs = np.exp(logits) / np.exp(logits).sum()
+            best = int(probs.argmax())
+            return self.labels[best], float(probs[best])
+        except Exception as e:
+            logger.warning(f"Local intent classification failed: {e}")
+            return None, 0.0
+
+    def predict(self, text: str) -> Tuple[Optional[str], float]:
+        """Like classify, but the label is None when confidence is below threshold."""
+        label, confidence = self.classify(text)
+        if label is None or confidence < self.threshold:
+            return None, confidence
+        return label, confidence
+
+    async def apredict(self, text: str) -> Tuple[Optional[str], float]:
+        """Async variant of predict; embeds in a worker thread."""
+        return await asyncio.to_thread(self.predict, text)
+
+
+def _embed_documents(texts: List[str]) -> Optional[List[List[float]]]:
+    if rag_service.embeddings is None:
+        return None
+    return rag_service.embeddings.embed_documents(texts)
+
+
+# Global fast-path classifier instance
+intent_classifier = EmbeddingIntentClassifier(embed_documents=_embed_documents)
@@ -0,0 +1,173 @@
+"""
+In-memory BM25 inverted index over the RAG chunks.
+
+Dense embeddings blur exact identifiers - policy names, ticket codes,
+product names - that a keyword index matches directly. ``RAGService``
+keeps this index in step with the vector store: it holds the same chunk
+ids, and deleted (tombstoned) chunks are skipped at query time, just as
+in the vector search, until compaction removes them from both.
+"""
+import heapq
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# BM25 parameters
+RAG_BM25_K1 = float(os.getenv("RAG_BM25_K1", "1.2"))  # term-frequency saturation
+RAG_BM25_B = float(os.getenv("RAG_BM25_B", "0.75"))  # chunk-length normalization
+
+# Words, numbers and codes such as "SEC-1234", "v2.1" or "INC0012345"
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-_./][a-z0-9]+)*")
+STOPWORDS = frozenset(
+    "a an and are as at be but by can do does for from has have how i if in is it its me my no not of on or "
+    "our should so than that the their them then there these they this to was we what when where which who "
+    "why will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased terms; compound codes are indexed whole and by their parts."""
+    terms = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        terms.append(token)
+        if not token.isalnum():
+            terms.extend(part for part in re.split(r"[-_./]", token) if part and part not in STOPWORDS)
+    return terms
+
+
+class LexicalIndex:
+    """BM25 over chunk texts, keyed by chunk id."""
+
+    def __init__(self, k1: float = RAG_BM25_K1, b: float = RAG_BM25_B):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = {}  # term -> chunk id -> term frequency
+        self._lengths: Dict[str, int] = {}  # chunk id -> number of terms
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def _add(self, chunk_id: str, text: str) -> None:
+        if chunk_id in self._lengths:
+            return
+        terms = tokenize(text)
+        for term, count in Counter(terms).items():
+            self._postings.setdefault(term, {})[chunk_id] = count
+        self._lengths[chunk_id] = len(terms)
+        self._total_length += len(terms)
+
+    def add_many(self, chunks: Iterable[Tuple[str, str]]) -> None:
+        """Index ``(chunk_id, text)`` pairs; ids already present are left as they are."""
+        with self._lock:
+            for chunk_id, text in chunks:
+                self._add(chunk_id, text)
+
+    def remove_many(self, chunk_ids: Iterable[str]) -> None:
+        with self._lock:
+            for chunk_id in chunk_ids:
+                length = self._lengths.pop(chunk_id, None)
+                if length is None:
+                    continue
+                self._total_length -= length
+            # Postings are pruned lazily in search(). Chunk ids are content fingerprints,
+            # so an id added again brings back the same terms.
+
+    def rebuild(self, chunks: Iterable[Tuple[str, str]]) -> None:
+        with self._lock:
+            self._postings, self._lengths, self._total_length = {}, {}, 0
+            for chunk_id, text in chunks:
+                self._add(chunk_id, text)
+
+    def search(
+        self,
+        query: str,
+        k: int,
+        exclude: Optional[Set[str]] = None,
+        only: Optional[Set[str]] = None,
+    ) -> List[Tuple[str, float, float]]:
+        """
+        Top ``k`` chunks as ``(chunk_id, bm25 score, coverage)``, where
+        coverage is the IDF-weighted share of the query terms the chunk
+        contains (1.0 = every term, rare terms counting most). ``only``
+        restricts the results to the given chunk ids.
+        """
+        return self.search_many([query], k, exclude, only)[0]
+
+    def search_many(
+        self,
+        queries: List[str],
+        k: int,
+        exclude: Optional[Set[str]] = None,
+        only: Optional[Set[str]] = None,
+    ) -> List[List[Tuple[str, float, float]]]:
+        """``search`` for several queries. Each distinct term's postings are scored once per call."""
+        # Deferred like the rest of the numeric stack, so importing the service stays cheap
+        import numpy as np
+
+        query_terms = [set(tokenize(query)) for query in queries]
+        exclude = exclude or set()
+        with self._lock:
+            count = len(self._lengths)
+            if not count:
+                return [[] for _ in queries]
+            average_length = self._total_length / count
+            chunk_ids: List[str] = []
+            slots: Dict[str, int] = {}
+            # term -> (idf, chunk slots, BM25 contributions)
+            weights: Dict[str, tuple] = {}
+            for term in set().union(*query_terms):
+                postings = self._postings.get(term)
+                if postings is None:
+                    # Unknown terms still count against coverage
+                    weights[term] = (math.log(1 + (count + 0.5) / 0.5), None, None)
+                    continue
+                # Postings are pruned lazily here (see remove_many)
+                for chunk_id in [chunk_id for chunk_id in postings if chunk_id not in self._lengths]:
+                    del postings[chunk_id]
+                df = len(postings)
+                idf = math.log(1 + (count - df + 0.5) / (df + 0.5))
+                term_slots, contributions = [], []
+                for chunk_id, tf in postings.items():
+                    if chunk_id in exclude or (only is not None and chunk_id not in only):
+                        continue
+                    slot = slots.get(chunk_id)
+                    if slot is None:
+                        slot = slots[chunk_id] = len(chunk_ids)
+                        chunk_ids.append(chunk_id)
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[chunk_id] / average_length)
+                    term_slots.append(slot)
+                    contributions.append(idf * tf * (self.k1 + 1) / (tf + norm))
+                weights[term] = (idf, np.asarray(term_slots, dtype=np.int64), np.asarray(contributions))
+
+        results = []
+        for terms in query_terms:
+            present = [weights[term] for term in terms if weights[term][1] is not None and len(weights[term][1])]
+            if not present:
+                results.append([])
+                continue
+            total_idf = sum(weights[term][0] for term in terms)
+            hits, positions = np.unique(np.concatenate([w[1] for w in present]), return_inverse=True)
+            scores = np.bincount(positions, weights=np.concatenate([w[2] for w in present]))
+            matched = np.bincount(positions, weights=np.concatenate([np.full(len(w[1]), w[0]) for w in present]))
+            top = np.argsort(-scores, kind="stable")[:k]
+            results.append([(chunk_ids[hits[i]], float(scores[i]), float(matched[i] / total_idf)) for i in top])
+        return results
+
+    def stats(self) -> Dict[str, int]:
+        return {"chunks": len(self._lengths), "terms": len(self._postings)}
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """Fuse ranked id lists: each id scores sum(1 / (k + rank)), rank starting at 1."""
+    fused: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            fused[item] = fused.get(item, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
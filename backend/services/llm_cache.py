@@ -0,0 +1,276 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+logger = logging.getLogger("backend.services.llm_cache")
+
+# LLM memoization configuration
+LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "memory").lower()  # memory | disk | none
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024"))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", "3600"))
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "./data/llm_cache.sqlite3")
+
+
+class LLMCacheBackend:
+    """Storage interface for memoized LLM completions (key -> completion text)."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._counter_lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "bypassed": 0}
+
+    def get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def record(self, counter: str) -> None:
+        with self._counter_lock:
+            self._counters[counter] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._counter_lock:
+            counters = dict(self._counters)
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            "backend": type(self).__name__,
+            "entries": len(self),
+            **counters,
+            "hit_rate": round(counters["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+
+class InMemoryLLMCache(LLMCacheBackend):
+    """Process-local LRU cache with TTL."""
+
+    def __init__(self, max_entries: int = LLM_CACHE_MAX_ENTRIES, ttl_seconds: float = LLM_CACHE_TTL_SECONDS):
+        super().__init__(max_entries, ttl_seconds)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskLLMCache(LLMCacheBackend):
+    """SQLite-backed cache shared across restarts and uvicorn workers."""
+
+    def __init__(
+        self,
+        path: str = LLM_CACHE_PATH,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = LLM_CACHE_TTL_SECONDS,
+    ):
+        super().__init__(max_entries, ttl_seconds)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache(last_access)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, now + self.ttl_seconds, now),
+            )
+            self._conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                " SELECT key FROM llm_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+
+def create_llm_cache(backend: str = LLM_CACHE_BACKEND) -> Optional[LLMCacheBackend]:
+    """Build the configured cache backend, or None when memoization is disabled."""
+    if backend == "memory":
+        return InMemoryLLMCache()
+    if backend == "disk":
+        try:
+            return DiskLLMCache()
+        except Exception as e:
+            logger.error(f"Failed to open disk LLM cache at {LLM_CACHE_PATH}, falling back to memory: {e}")
+            return InMemoryLLMCache()
+    if backend not in ("none", "off", ""):
+        logger.warning(f"Unknown LLM_CACHE_BACKEND '{backend}', LLM memoization disabled")
+    return None
+
+
+def _message_parts(message: Any) -> tuple:
+    if isinstance(message, dict):
+        return (message.get("role", ""), message.get("content", ""))
+    if isinstance(message, (tuple, list)) and len(message) == 2:
+        return (str(message[0]), message[1])
+    if hasattr(message, "content"):
+        return (getattr(message, "type", ""), message.content)
+    return ("", str(message))
+
+
+def _embeds_current_time(text: str) -> bool:
+    """True if the prompt mentions today's date, i.e. its answer is only valid right now."""
+    now = datetime.now()
+    return any(
+        day.strftime("%Y-%m-%d") in text
+        for day in (now, now - timedelta(days=1))
+    )
+
+
+class CachedChatModel:
+    """
+    Exact-match memoization around a chat model's ``invoke``, ``ainvoke`` and ``astream``.
+
+    The key is a hash of model name, temperature and the full prompt.
+    Prompts that embed the current date/time are never cached. Everything
+    else is delegated to the wrapped model.
+    """
+
+    def __init__(self, llm: Any, cache: LLMCacheBackend):
+        self.llm = llm
+        self.cache = cache
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.llm, name)
+
+    def _cache_key(self, prompt: Any) -> Optional[str]:
+        messages = prompt if isinstance(prompt, list) else [prompt]
+        parts = [_message_parts(m) for m in messages]
+        serialized = json.dumps(parts, sort_keys=True, default=str)
+        if _embeds_current_time(serialized):
+            self.cache.record("bypassed")
+            return None
+        model = getattr(self.llm, "model_name", None) or getattr(self.llm, "model", "")
+        temperature = getattr(self.llm, "temperature", None)
+        prompt_hash = hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+        return f"{model}:{temperature}:{prompt_hash}"
+
+    def _lookup(self, key: Optional[str]) -> Optional[AIMessage]:
+        if key is None:
+            return None
+        value = self.cache.get(key)
+        if value is None:
+            self.cache.record("misses")
+            return None
+        self.cache.record("hits")
+        return AIMessage(content=value)
+
+    def _store(self, key: Optional[str], response: Any) -> None:
+        if key is not None and isinstance(getattr(response, "content", None), str):
+            self.cache.set(key, response.content)
+
+    def invoke(self, prompt: Any, *args, **kwargs) -> Any:
+        key = self._cache_key(prompt)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+        response = self.llm.invoke(prompt, *args, **kwargs)
+        self._store(key, response)
+        return response
+
+    async def ainvoke(self, prompt: Any, *args, **kwargs) -> Any:
+        key = self._cache_key(prompt)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+        response = await self.llm.ainvoke(prompt, *args, **kwargs)
+        self._store(key, response)
+        return response
+
+    async def astream(self, prompt: Any, *args, **kwargs) -> AsyncIterator[Any]:
+        """Stream from the wrapped model; a cache hit is replayed as a single chunk."""
+        key = self._cache_key(prompt)
+        cached = self._lookup(key)
+        if cached is not None:
+            yield AIMessageChunk(content=cached.content)
+            return
+        parts = []
+        async for chunk in self.llm.astream(prompt, *args, **kwargs):
+            if isinstance(chunk.content, str):
+                parts.append(chunk.content)
+            yield chunk
+        if key is not None:
+            self.cache.set(key, "".join(parts))
+
+
+# Global LLM cache shared by all memoized clients
+llm_cache = create_llm_cache()
+
+
+def memoize_llm(llm: Any) -> Any:
+    """Wrap a chat model with the global LLM cache (no-op if disabled or llm is None)."""
+    if llm is None or llm_cache is None:
+        return llm
+    return CachedChatModel(llm, llm_cache)
@@ -1,45 +1,132 @@
 import os
+import asyncio
+import contextlib
 import hashlib
+import json
+import re
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional
 import logging
 
-# Vector DB and embeddings
-try:
-    from langchain_community.embeddings import HuggingFaceEmbeddings
-    from langchain_community.vectorstores import FAISS
-    from langchain_text_splitters import RecursiveCharacterTextSplitter
-    from langchain_community.document_loaders import (
-        PyPDFLoader,
-        TextLoader,
-        UnstructuredMarkdownLoader,
-        Docx2txtLoader
-    )
-    IMPORTS_AVAILABLE = True
-except ImportError as e:
-    # Fallback if not installed
-    logger = logging.getLogger("backend.rag_service")
-    logger.warning(f"RAG dependencies not installed: {e}")
-    IMPORTS_AVAILABLE = False
-    HuggingFaceEmbeddings = None
-    FAISS = None
-    RecursiveCharacterTextSplitter = None
-    PyPDFLoader = None
-    TextLoader = None
-    UnstructuredMarkdownLoader = None
-    Docx2txtLoader = None
+from services.document_catalog import create_document_catalog
+from services.embedding_backends import load_embedding_model
+from services.embedding_service import BatchingEmbeddings
+from services.lexical_index import LexicalIndex, reciprocal_rank_fusion
 
 logger = logging.getLogger("backend.rag_service")
 
+# Vector DB and embeddings. Imported on first use by _import_dependencies so that
+# importing this module (and main.py) does not load langchain, FAISS and numpy.
+IMPORTS_AVAILABLE: Optional[bool] = None  # None until the import has been attempted
+FAISS = None
+InMemoryDocstore = None
+Document = None
+faiss = None
+np = None
+SegmentStore = None
+vector_index = None
+RecursiveCharacterTextSplitter = None
+PyPDFLoader = None
+TextLoader = None
+UnstructuredMarkdownLoader = None
+Docx2txtLoader = None
+_import_lock = threading.Lock()
+
+
+def _import_dependencies() -> bool:
+    """Import the RAG stack once; returns whether it is installed."""
+    global IMPORTS_AVAILABLE, FAISS, InMemoryDocstore, Document, faiss, np, SegmentStore, vector_index
+    global RecursiveCharacterTextSplitter, PyPDFLoader, TextLoader, UnstructuredMarkdownLoader, Docx2txtLoader
+    with _import_lock:
+        if IMPORTS_AVAILABLE is not None:
+            return IMPORTS_AVAILABLE
+        try:
+            from langchain_core.embeddings import Embeddings
+            from langchain_community.vectorstores import FAISS
+            from langchain_community.docstore.in_memory import InMemoryDocstore
+            from langchain_core.documents import Document
+            import faiss
+            import numpy as np
+            from services.vector_segments import SegmentStore
+            from services import vector_index
+            from langchain_text_splitters import RecursiveCharacterTextSplitter
+            from langchain_community.document_loaders import (
+                PyPDFLoader,
+                TextLoader,
+                UnstructuredMarkdownLoader,
+                Docx2txtLoader
+            )
+            # The batching wrapper implements the Embeddings interface; FAISS checks isinstance
+            Embeddings.register(BatchingEmbeddings)
+            IMPORTS_AVAILABLE = True
+        except ImportError as e:
+            # Fallback if not installed
+            logger.warning(f"RAG dependencies not installed: {e}")
+            IMPORTS_AVAILABLE = False
+        return IMPORTS_AVAILABLE
+
 # Storage paths
 UPLOAD_DIR = Path("./data/uploads")
 VECTOR_DB_DIR = Path("./data/vectordb")
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 VECTOR_DB_DIR.mkdir(parents=True, exist_ok=True)
 
-# Document metadata store (in-memory for now)
-documents_store: Dict[str, Dict[str, Any]] = {}
+# Chunks embedded per embed_documents call during training
+RAG_EMBED_BATCH_SIZE = int(os.getenv("RAG_EMBED_BATCH_SIZE", "64"))
+# Bulk ingestion: parser threads and (larger) embedding batches
+RAG_INGEST_WORKERS = int(os.getenv("RAG_INGEST_WORKERS", "4"))
+RAG_INGEST_BATCH_SIZE = int(os.getenv("RAG_INGEST_BATCH_SIZE", "256"))
+
+SUPPORTED_EXTENSIONS = (".pdf", ".md", ".txt", ".doc", ".docx")
+FILE_MISSING_ERROR = "File missing from uploads"
+
+# Append-only vector segments + manifest (see services/vector_segments.py)
+SEGMENTS_DIR = VECTOR_DB_DIR / "segments"
+# Pre-segment format: index.faiss/index.pkl (+ tombstones.json), migrated on first load
+LEGACY_INDEX_PATH = VECTOR_DB_DIR / "index.faiss"
+LEGACY_TOMBSTONES_PATH = VECTOR_DB_DIR / "tombstones.json"
+
+# Deleted chunks are tombstoned and filtered from search; compaction drops them from the index
+RAG_COMPACT_TOMBSTONE_RATIO = float(os.getenv("RAG_COMPACT_TOMBSTONE_RATIO", "0.2"))  # auto-compact above this, 0 disables
+RAG_COMPACT_LATENCY_PROBES = int(os.getenv("RAG_COMPACT_LATENCY_PROBES", "50"))
+
+# Hybrid retrieval: BM25 over the same chunks, fused with the vector results (see services/lexical_index.py)
+RAG_HYBRID_SEARCH = os.getenv("RAG_HYBRID_SEARCH", "true").lower() == "true"
+RAG_HYBRID_CANDIDATES = int(os.getenv("RAG_HYBRID_CANDIDATES", "20"))  # candidates taken from each retriever
+RAG_RRF_K = int(os.getenv("RAG_RRF_K", "60"))  # reciprocal rank fusion constant
+RAG_SEARCH_BATCH_MAX = int(os.getenv("RAG_SEARCH_BATCH_MAX", "256"))  # queries per search_batch call
+SEARCH_FILTER_FIELDS = ("doc_id", "filename")
+
+# Persistent document metadata (see services/document_catalog.py)
+document_catalog = create_document_catalog()
+
+
+def _check_filters(filters: Optional[Dict[str, Any]]) -> None:
+    unknown = set(filters or {}) - set(SEARCH_FILTER_FIELDS)
+    if unknown:
+        raise ValueError(f"Unsupported search filters: {', '.join(sorted(unknown))}; expected {', '.join(SEARCH_FILTER_FIELDS)}")
+
+
+class TrainingCancelled(Exception):
+    """Raised when a training run is cancelled between embedding batches."""
+
+
+# Files saved by save_document are named <doc_id>_<filename>
+UPLOAD_NAME_PATTERN = re.compile(r"^(doc_[0-9a-f]{12})_(.+)$")
+
+
+def _doc_id_for(file_content: bytes) -> str:
+    return f"doc_{hashlib.md5(file_content).hexdigest()[:12]}"
+
+
+def _chunk_fingerprint(text: str) -> str:
+    """Content address of a chunk, used as its vector store id. Ignores whitespace differences."""
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()[:32]
 
 
 class RAGService:
@@ -47,16 +134,58 @@ class RAGService:
         self.embeddings = None
         self.vector_store = None
         self.text_splitter = None
-        
-        if IMPORTS_AVAILABLE and RecursiveCharacterTextSplitter:
-            self.text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=1000,
-                chunk_overlap=200,
-                length_function=len,
-            )
-        
-        self._initialize_embeddings()
-        self._load_vector_store()
+        # Callbacks notified with a doc_id when its content is retrained or deleted
+        self._document_listeners: List[Callable[[str], None]] = []
+        # Serializes vector store writes; embedding happens outside it
+        self._index_lock = threading.Lock()
+        # doc_id -> docstore ids of its live chunks
+        self._doc_chunk_ids: Dict[str, List[str]] = {}
+        # docstore id -> doc_ids using that chunk; identical chunks are stored once
+        self._chunk_refs: Dict[str, set] = {}
+        # docstore ids of deleted/replaced chunks still physically in the index
+        self._tombstones: set = set()
+        # Bumped whenever chunks are added, so compaction can detect concurrent writes
+        self._index_version = 0
+        self._compacting = threading.Lock()
+        self.segments = None
+        # Keyword index over the same chunk ids as the vector store
+        self.lexical_index = LexicalIndex()
+        # Loading the embedding model and the index is deferred to warm_up()
+        self._warm_lock = threading.Lock()
+        self._ready = threading.Event()
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def warm_up(self, phase: Callable[[str], Any] = lambda name: contextlib.nullcontext()) -> None:
+        """
+        Import the RAG stack, load the embedding model and rebuild the vector
+        index. Idempotent; concurrent callers wait for the first one. ``phase``
+        is a context manager factory used to time each step.
+        """
+        with self._warm_lock:
+            if self._ready.is_set():
+                return
+            with phase("rag_imports"):
+                _import_dependencies()
+            if IMPORTS_AVAILABLE:
+                self.text_splitter = RecursiveCharacterTextSplitter(
+                    chunk_size=1000,
+                    chunk_overlap=200,
+                    length_function=len,
+                )
+                self.segments = SegmentStore(SEGMENTS_DIR)
+            with phase("embedding_model"):
+                self._initialize_embeddings()
+            with phase("vector_index"):
+                self._load_vector_store()
+            self._ready.set()
+
+    def _ensure_ready(self) -> None:
+        """Warm up on first use when nothing did so at startup (CLI, scripts)."""
+        if not self._ready.is_set():
+            self.warm_up()
 
     def _initialize_embeddings(self):
         """Initialize embedding model."""
@@ -66,67 +195,212 @@ class RAGService:
             
         try:
             logger.info("Initializing embeddings model...")
-            self.embeddings = HuggingFaceEmbeddings(
-                model_name="sentence-transformers/all-MiniLM-L6-v2"
-            )
+            # Ingestion, search, the answer cache and the intent classifier share one batching worker
+            self.embeddings = BatchingEmbeddings(self._load_embedding_model())
             logger.info("Embeddings model initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize embeddings: {e}")
             self.embeddings = None
 
+    def _load_embedding_model(self) -> Any:
+        # EMBEDDING_BACKEND picks eager PyTorch or ONNX Runtime
+        return load_embedding_model()
+
     def _load_vector_store(self):
         """Load existing vector store or create new one."""
         try:
-            index_path = VECTOR_DB_DIR / "index.faiss"
-            if index_path.exists() and self.embeddings:
+            if self.embeddings and self.segments.exists():
+                logger.info("Loading vector store from segments...")
+                ids, texts, metadatas, vectors, tombstones = self.segments.load()
+                # Background merges may already have dropped some tombstoned rows
+                self._tombstones = tombstones & set(ids)
+                self.vector_store = self._build_store(ids, texts, metadatas, vectors) if ids else None
+                if self.vector_store:
+                    self._load_chunk_ids()
+                logger.info(f"Vector store loaded successfully ({len(ids)} vectors, {len(self._tombstones)} deleted)")
+            elif self.embeddings and LEGACY_INDEX_PATH.exists():
                 logger.info("Loading existing vector store...")
                 self.vector_store = FAISS.load_local(
                     str(VECTOR_DB_DIR), 
                     self.embeddings,
                     allow_dangerous_deserialization=True
                 )
+                self._migrate_legacy_index()
+                self._load_chunk_ids()
                 logger.info("Vector store loaded successfully")
             else:
                 logger.info("No existing vector store found")
                 self.vector_store = None
+            if self.vector_store:
+                self.lexical_index.rebuild(
+                    (chunk_id, doc.page_content) for chunk_id, doc in self.vector_store.docstore._dict.items()
+                )
+                logger.info(f"Lexical index built ({self.lexical_index.stats()['terms']} terms)")
         except Exception as e:
             logger.error(f"Failed to load vector store: {e}")
             self.vector_store = None
 
+    def _build_store(self, ids: List[str], texts: List[str], metadatas: List[Dict[str, Any]], vectors: Any) -> Any:
+        """In-memory FAISS store over the given rows, in order, using the RAG_INDEX_TYPE index."""
+        index = vector_index.build_index(vectors)
+        return FAISS(
+            embedding_function=self.embeddings,
+            index=index,
+            docstore=InMemoryDocstore({
+                chunk_id: Document(page_content=text, metadata=metadata)
+                for chunk_id, text, metadata in zip(ids, texts, metadatas)
+            }),
+            index_to_docstore_id=dict(enumerate(ids)),
+        )
+
+    def _migrate_legacy_index(self) -> None:
+        """Write a single-file index (and its tombstones) out as the first segment."""
+        store = self.vector_store
+        ids = [store.index_to_docstore_id[i] for i in range(store.index.ntotal)]
+        docs = [store.docstore.search(chunk_id) for chunk_id in ids]
+        if LEGACY_TOMBSTONES_PATH.exists():
+            self._tombstones = set(json.loads(LEGACY_TOMBSTONES_PATH.read_text()))
+        self.segments.append(
+            ids,
+            [doc.page_content for doc in docs],
+            [doc.metadata for doc in docs],
+            store.index.reconstruct_n(0, store.index.ntotal),
+            self._tombstones,
+        )
+        logger.info(f"Migrated legacy index ({len(ids)} vectors) to segments in {SEGMENTS_DIR}")
+
+    def _stored_vectors(self, store: Any, chunk_ids: List[str]) -> Any:
+        """
+        Exact vectors for chunks in ``store``, from the segment files. A
+        background merge may already have dropped tombstoned rows from disk;
+        those are reconstructed from the index (approximate if compressed).
+        """
+        try:
+            return self.segments.vectors(chunk_ids)
+        except KeyError:
+            positions = {chunk_id: pos for pos, chunk_id in store.index_to_docstore_id.items()}
+            stored = []
+            for chunk_id in chunk_ids:
+                try:
+                    stored.append(self.segments.vectors([chunk_id])[0])
+                except KeyError:
+                    stored.append(store.index.reconstruct(positions[chunk_id]))
+            return np.asarray(stored, dtype=np.float32)
+
+    def _load_chunk_ids(self) -> None:
+        """
+        Rebuild the doc_id -> chunk id map and chunk reference counts from the
+        chunk links in the document catalog. Chunks indexed before links were
+        recorded belong to the doc_id in their metadata; live chunks no
+        document references (e.g. after a crash mid-commit) are tombstoned.
+        """
+        links = document_catalog.chunk_links()
+        live = {
+            chunk_id for chunk_id in self.vector_store.index_to_docstore_id.values()
+            if chunk_id not in self._tombstones
+        }
+        linked = {chunk_id for chunk_ids in links.values() for chunk_id in chunk_ids}
+        self._doc_chunk_ids = {}
+        for doc_id, chunk_ids in links.items():
+            chunk_ids = [chunk_id for chunk_id in chunk_ids if chunk_id in live]
+            if chunk_ids:
+                self._doc_chunk_ids[doc_id] = chunk_ids
+        orphans = set()
+        for chunk_id in live - linked:
+            doc_id = self.vector_store.docstore.search(chunk_id).metadata.get("doc_id")
+            if doc_id and doc_id not in links:
+                self._doc_chunk_ids.setdefault(doc_id, []).append(chunk_id)
+            else:
+                orphans.add(chunk_id)
+        self._chunk_refs = {}
+        for doc_id, chunk_ids in self._doc_chunk_ids.items():
+            for chunk_id in chunk_ids:
+                self._chunk_refs.setdefault(chunk_id, set()).add(doc_id)
+        if orphans:
+            self._tombstones.update(orphans)
+            logger.info(f"Hid {len(orphans)} chunks no document references")
+
+    def _tombstone_document(self, doc_id: str) -> int:
+        """
+        Unlink a document from its chunks and hide the ones no other document
+        uses. Returns how many were hidden. Caller holds _index_lock and
+        persists the tombstones.
+        """
+        hidden = 0
+        for chunk_id in self._doc_chunk_ids.pop(doc_id, []):
+            owners = self._chunk_refs.get(chunk_id, set())
+            owners.discard(doc_id)
+            if not owners:
+                self._chunk_refs.pop(chunk_id, None)
+                self._tombstones.add(chunk_id)
+                hidden += 1
+        return hidden
+
+    def add_document_listener(self, callback: Callable[[str], None]) -> None:
+        """Register a callback invoked with doc_id whenever a document is retrained or deleted."""
+        self._document_listeners.append(callback)
+
+    def _notify_document_changed(self, doc_id: str) -> None:
+        for callback in self._document_listeners:
+            try:
+                callback(doc_id)
+            except Exception as e:
+                logger.error(f"Document listener failed for {doc_id}: {e}", exc_info=True)
+
     def save_document(self, file_content: bytes, filename: str, uploaded_by: str = "admin") -> Dict[str, Any]:
         """Save uploaded document and metadata."""
         try:
             # Generate unique ID
-            file_hash = hashlib.md5(file_content).hexdigest()
-            doc_id = f"doc_{file_hash[:12]}"
+            doc_id = _doc_id_for(file_content)
             
             # Save file
             file_path = UPLOAD_DIR / f"{doc_id}_{filename}"
             with open(file_path, "wb") as f:
                 f.write(file_content)
             
-            # Store metadata
-            metadata = {
-                "id": doc_id,
-                "filename": filename,
-                "filepath": str(file_path),
-                "size": len(file_content),
-                "uploaded_at": datetime.now().isoformat(),
-                "uploaded_by": uploaded_by,
-                "status": "uploaded",
-                "trained": False,
-                "chunk_count": 0,
-            }
-            documents_store[doc_id] = metadata
-            
+            metadata = self._register(doc_id, filename, file_path, file_content, uploaded_by)
             logger.info(f"Document saved: {doc_id} - {filename}")
             return metadata
         except Exception as e:
             logger.error(f"Failed to save document: {e}", exc_info=True)
             raise
 
+    def _register(self, doc_id: str, filename: str, file_path: Path, file_content: bytes, uploaded_by: str) -> Dict[str, Any]:
+        """Store metadata for a document file that is already on disk."""
+        return document_catalog.put({
+            "id": doc_id,
+            "filename": filename,
+            "filepath": str(file_path),
+            "size": len(file_content),
+            "content_hash": hashlib.md5(file_content).hexdigest(),
+            "uploaded_at": datetime.now().isoformat(),
+            "uploaded_by": uploaded_by,
+            "status": "uploaded",
+            "trained": False,
+            "chunk_count": 0,
+        })
+
+    def register_file(self, path: Path, uploaded_by: str = "bulk") -> Dict[str, Any]:
+        """
+        Register a file for training. Files already in UPLOAD_DIR (named
+        ``<doc_id>_<filename>``) are registered in place; others are copied in.
+        """
+        content = path.read_bytes()
+        in_uploads = path.parent.resolve() == UPLOAD_DIR.resolve()
+        # Uploaded files keep the id they were saved under, even if their bytes changed since
+        match = UPLOAD_NAME_PATTERN.match(path.name) if in_uploads else None
+        doc_id = match.group(1) if match else _doc_id_for(content)
+        existing = document_catalog.get(doc_id)
+        if existing is not None:
+            return existing
+        if not in_uploads:
+            return self.save_document(content, path.name, uploaded_by)
+        filename = match.group(2) if match else path.name
+        return self._register(doc_id, filename, path, content, uploaded_by)
+
     def load_document(self, filepath: str) -> List[Any]:
         """Load document based on file type."""
+        self._ensure_ready()
         if not IMPORTS_AVAILABLE:
             raise RuntimeError("RAG dependencies not installed. Please install: pip install langchain langchain-community pypdf python-docx unstructured")
         
@@ -151,9 +425,154 @@ class RAGService:
             logger.error(f"Failed to load document {filepath}: {e}", exc_info=True)
             raise
 
-    def train_document(self, doc_id: str) -> Dict[str, Any]:
-        """Process and train document into vector store."""
-        if doc_id not in documents_store:
+    def _prepare_chunks(self, doc_id: str, doc_meta: Dict[str, Any], progress: Callable[..., None]) -> List[Any]:
+        """Load and split a document into chunks tagged with its metadata."""
+        documents = self.load_document(doc_meta["filepath"])
+        progress(pages_parsed=len(documents))
+
+        chunks = self.text_splitter.split_documents(documents)
+        for chunk in chunks:
+            chunk.metadata.update({
+                "doc_id": doc_id,
+                "filename": doc_meta["filename"],
+                "source": doc_meta["filepath"]
+            })
+        return chunks
+
+    def _chunks_to_embed(self, chunks: List[Any]) -> List[Any]:
+        """One chunk per fingerprint that has no vector in the index yet."""
+        store = self.vector_store
+        present = store.docstore._dict if store is not None else {}
+        pending: Dict[str, Any] = {}
+        for chunk in chunks:
+            fingerprint = _chunk_fingerprint(chunk.page_content)
+            if fingerprint not in present and fingerprint not in pending:
+                pending[fingerprint] = chunk
+        return list(pending.values())
+
+    def _embed_chunks(
+        self,
+        chunks: List[Any],
+        progress: Callable[..., None],
+        is_cancelled: Callable[[], bool],
+        batch_size: int = RAG_EMBED_BATCH_SIZE,
+    ) -> List[List[float]]:
+        """Embed chunk texts in batches, checking for cancellation between batches."""
+        texts = [chunk.page_content for chunk in chunks]
+        vectors: List[List[float]] = []
+        for start in range(0, len(texts), batch_size):
+            if is_cancelled():
+                raise TrainingCancelled()
+            vectors.extend(self.embeddings.embed_documents(texts[start:start + batch_size]))
+            progress(chunks_embedded=len(vectors))
+        return vectors
+
+    def _commit_chunks(self, doc_ids: List[str], chunks: List[Any], embedded: List[Any], vectors: List[List[float]]) -> None:
+        """
+        Replace the chunks of ``doc_ids`` with ``chunks``. Chunks are stored
+        under their fingerprint, so only ``embedded`` (the chunks selected by
+        _chunks_to_embed, with their ``vectors``) add rows; unchanged and
+        shared chunks are linked to the existing rows, and rows no document
+        references any more are tombstoned.
+        """
+        links: Dict[str, Dict[str, None]] = {doc_id: {} for doc_id in doc_ids}
+        first_chunk: Dict[str, Any] = {}
+        for chunk in chunks:
+            fingerprint = _chunk_fingerprint(chunk.page_content)
+            links.setdefault(chunk.metadata.get("doc_id"), {})[fingerprint] = None
+            first_chunk.setdefault(fingerprint, chunk)
+        linked = set(first_chunk)
+
+        with self._index_lock:
+            store = self.vector_store
+            present = store.docstore._dict if store is not None else {}
+            rows: Dict[str, tuple] = {}
+            for chunk, vector in zip(embedded, vectors):
+                fingerprint = _chunk_fingerprint(chunk.page_content)
+                if fingerprint not in present:
+                    rows.setdefault(fingerprint, (chunk, vector))
+            # Rows compacted away since the caller checked need embedding after all
+            missing = [f for f in linked if f not in present and f not in rows]
+            if missing:
+                texts = [first_chunk[f].page_content for f in missing]
+                for fingerprint, vector in zip(missing, self.embeddings.embed_documents(texts)):
+                    rows[fingerprint] = (first_chunk[fingerprint], vector)
+            # Tombstoned rows used again are written to a new segment too, so merges cannot drop them
+            revived = [f for f in linked if f in self._tombstones and f in present]
+            if revived:
+                revived_docs = [store.docstore.search(f) for f in revived]
+                revived_vectors = list(self._stored_vectors(store, revived))
+            else:
+                revived_docs, revived_vectors = [], []
+
+            previous = {doc_id: self._doc_chunk_ids.get(doc_id, []) for doc_id in links}
+            refs = {
+                f: set(self._chunk_refs.get(f, ()))
+                for f in linked.union(*previous.values())
+            }
+            for doc_id, chunk_ids in previous.items():
+                for chunk_id in chunk_ids:
+                    refs[chunk_id].discard(doc_id)
+            for doc_id, fingerprints in links.items():
+                for fingerprint in fingerprints:
+                    refs[fingerprint].add(doc_id)
+            unreferenced = {chunk_id for chunk_id, owners in refs.items() if not owners}
+
+            # Durable first: one segment holding only new content, then the links, then the in-memory index
+            self.segments.append(
+                list(rows) + revived,
+                [chunk.page_content for chunk, _ in rows.values()] + [doc.page_content for doc in revived_docs],
+                [chunk.metadata for chunk, _ in rows.values()] + [doc.metadata for doc in revived_docs],
+                [vector for _, vector in rows.values()] + revived_vectors,
+                (self._tombstones - linked) | unreferenced,
+            )
+            document_catalog.set_chunks({doc_id: list(fingerprints) for doc_id, fingerprints in links.items()})
+
+            if rows:
+                text_embeddings = [(chunk.page_content, vector) for chunk, vector in rows.values()]
+                metadatas = [chunk.metadata for chunk, _ in rows.values()]
+                if store is None:
+                    self.vector_store = self._build_store(
+                        list(rows),
+                        [text for text, _ in text_embeddings],
+                        metadatas,
+                        np.asarray([vector for _, vector in text_embeddings], dtype=np.float32),
+                    )
+                else:
+                    store.add_embeddings(text_embeddings, metadatas=metadatas, ids=list(rows))
+                self.lexical_index.add_many((fingerprint, chunk.page_content) for fingerprint, (chunk, _) in rows.items())
+            self._tombstones.difference_update(linked)
+            self._tombstones.update(unreferenced)
+            for chunk_id, owners in refs.items():
+                if owners:
+                    self._chunk_refs[chunk_id] = owners
+                else:
+                    self._chunk_refs.pop(chunk_id, None)
+            for doc_id, fingerprints in links.items():
+                if fingerprints:
+                    self._doc_chunk_ids[doc_id] = list(fingerprints)
+                else:
+                    self._doc_chunk_ids.pop(doc_id, None)
+            self._index_version += 1
+        self._maybe_compact()
+
+    def train_document(
+        self,
+        doc_id: str,
+        progress: Optional[Callable[..., None]] = None,
+        is_cancelled: Optional[Callable[[], bool]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Process and train document into vector store.
+
+        ``progress`` receives keyword updates (pages_parsed, chunks_total,
+        chunks_embedded, chunks_reused); ``is_cancelled`` is polled between
+        embedding batches and raises TrainingCancelled, leaving the vector
+        store untouched. Retraining only embeds chunks whose content changed.
+        """
+        self._ensure_ready()
+        doc_meta = document_catalog.get(doc_id)
+        if doc_meta is None:
             raise ValueError(f"Document not found: {doc_id}")
         
         if not IMPORTS_AVAILABLE:
@@ -162,100 +581,606 @@ class RAGService:
         if not self.embeddings:
             raise RuntimeError("Embeddings not initialized. Install required packages.")
         
-        doc_meta = documents_store[doc_id]
+        progress = progress or (lambda **_: None)
+        is_cancelled = is_cancelled or (lambda: False)
         
         try:
             # Update status
-            doc_meta["status"] = "training"
-            
-            # Load document
-            documents = self.load_document(doc_meta["filepath"])
+            document_catalog.update(doc_id, status="training")
             
-            # Split into chunks
-            chunks = self.text_splitter.split_documents(documents)
-            
-            # Add metadata to chunks
-            for chunk in chunks:
-                chunk.metadata.update({
-                    "doc_id": doc_id,
-                    "filename": doc_meta["filename"],
-                    "source": doc_meta["filepath"]
-                })
-            
-            # Create or update vector store
-            if self.vector_store is None:
-                self.vector_store = FAISS.from_documents(chunks, self.embeddings)
-            else:
-                self.vector_store.add_documents(chunks)
-            
-            # Save vector store
-            self.vector_store.save_local(str(VECTOR_DB_DIR))
+            chunks = self._prepare_chunks(doc_id, doc_meta, progress)
+            # Unchanged chunks keep their vectors; only new content is embedded
+            embedded = self._chunks_to_embed(chunks)
+            progress(chunks_total=len(embedded), chunks_embedded=0, chunks_reused=len(chunks) - len(embedded))
+            vectors = self._embed_chunks(embedded, progress, is_cancelled)
+            self._commit_chunks([doc_id], chunks, embedded, vectors)
             
             # Update metadata
-            doc_meta["status"] = "trained"
-            doc_meta["trained"] = True
-            doc_meta["chunk_count"] = len(chunks)
-            doc_meta["trained_at"] = datetime.now().isoformat()
+            doc_meta = document_catalog.update(
+                doc_id,
+                status="trained",
+                trained=True,
+                chunk_count=len(chunks),
+                trained_at=datetime.now().isoformat(),
+                error=None,
+            )
+            self._notify_document_changed(doc_id)
             
-            logger.info(f"Document trained successfully: {doc_id} ({len(chunks)} chunks)")
+            logger.info(f"Document trained successfully: {doc_id} ({len(chunks)} chunks, {len(embedded)} embedded)")
             return doc_meta
+        except TrainingCancelled:
+            document_catalog.update(doc_id, status="trained" if doc_meta.get("trained") else "uploaded")
+            logger.info(f"Training cancelled for document {doc_id}")
+            raise
         except Exception as e:
-            doc_meta["status"] = "error"
-            doc_meta["error"] = str(e)
+            document_catalog.update(doc_id, status="error", error=str(e))
             logger.error(f"Failed to train document {doc_id}: {e}", exc_info=True)
             raise
 
-    def search(self, query: str, k: int = 3) -> List[Dict[str, Any]]:
-        """Search vector store for relevant documents."""
+    def _indexed_doc_ids(self) -> set:
+        """doc_ids that already have chunks in the loaded vector store."""
+        return set(self._doc_chunk_ids)
+
+    def ingest_documents(
+        self,
+        doc_ids: List[str],
+        progress: Optional[Callable[..., None]] = None,
+        is_cancelled: Optional[Callable[[], bool]] = None,
+        workers: int = RAG_INGEST_WORKERS,
+        batch_size: int = RAG_INGEST_BATCH_SIZE,
+        skip_trained: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Train many documents at once: parse them in parallel, embed all their
+        chunks in large batches, and commit the vector store with a single
+        write. Documents that fail to parse are marked ``error`` and skipped.
+
+        Returns a throughput report (docs/s, chunks/s, batch utilisation).
+        """
+        self._ensure_ready()
+        if not IMPORTS_AVAILABLE:
+            raise RuntimeError("RAG dependencies not installed. Please install: pip install langchain langchain-community sentence-transformers faiss-cpu pypdf python-docx unstructured")
+        
+        if not self.embeddings:
+            raise RuntimeError("Embeddings not initialized. Install required packages.")
+
+        progress = progress or (lambda **_: None)
+        is_cancelled = is_cancelled or (lambda: False)
+        started = time.perf_counter()
+
+        docs = [doc for doc in map(document_catalog.get, dict.fromkeys(doc_ids)) if doc is not None]
+        indexed = self._indexed_doc_ids() if skip_trained else set()
+        skipped = [d["id"] for d in docs if skip_trained and (d.get("trained") or d["id"] in indexed)]
+        docs = [d for d in docs if d["id"] not in skipped]
+        progress(phase="parsing", docs_total=len(docs), docs_parsed=0, docs_skipped=len(skipped))
+        document_catalog.update_many({d["id"]: {"status": "training"} for d in docs})
+
+        # Parse in parallel
+        parsed: Dict[str, List[Any]] = {}
+        failed: Dict[str, str] = {}
+        noop = lambda **_: None
+
+        def parse(doc_meta: Dict[str, Any]) -> None:
+            try:
+                parsed[doc_meta["id"]] = self._prepare_chunks(doc_meta["id"], doc_meta, noop)
+            except Exception as e:
+                failed[doc_meta["id"]] = str(e)
+            progress(docs_parsed=len(parsed) + len(failed))
+
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="ingest") as pool:
+            list(pool.map(parse, docs))
+        parse_seconds = time.perf_counter() - started
+
+        document_catalog.update_many({doc_id: {"status": "error", "error": error} for doc_id, error in failed.items()})
+        for doc_id, error in failed.items():
+            logger.error(f"Failed to parse document {doc_id}: {error}")
+
+        # Embed new content in large batches (shared and unchanged chunks once at most), then write once
+        chunks = [chunk for doc_id in parsed for chunk in parsed[doc_id]]
+        embedded = self._chunks_to_embed(chunks)
+        progress(phase="embedding", chunks_total=len(embedded), chunks_embedded=0, chunks_reused=len(chunks) - len(embedded))
+        embed_started = time.perf_counter()
+        try:
+            vectors = self._embed_chunks(embedded, progress, is_cancelled, batch_size=batch_size)
+        except TrainingCancelled:
+            document_catalog.update_many({
+                d["id"]: {"status": "trained" if d.get("trained") else "uploaded"} for d in docs if d["id"] in parsed
+            })
+            logger.info(f"Bulk ingestion cancelled before commit ({len(parsed)} documents)")
+            raise
+        embed_seconds = time.perf_counter() - embed_started
+
+        progress(phase="committing")
+        commit_started = time.perf_counter()
+        if parsed:
+            self._commit_chunks(list(parsed), chunks, embedded, vectors)
+        commit_seconds = time.perf_counter() - commit_started
+
+        trained_at = datetime.now().isoformat()
+        document_catalog.update_many({
+            doc_id: {"status": "trained", "trained": True, "chunk_count": len(doc_chunks), "trained_at": trained_at, "error": None}
+            for doc_id, doc_chunks in parsed.items()
+        })
+        for doc_id in parsed:
+            self._notify_document_changed(doc_id)
+
+        total_seconds = time.perf_counter() - started
+        batches = -(-len(embedded) // batch_size) if embedded else 0
+        report = {
+            "documents": len(parsed),
+            "failed": failed,
+            "skipped": skipped,
+            "chunks": len(chunks),
+            "chunks_embedded": len(embedded),
+            "chunks_reused": len(chunks) - len(embedded),
+            "embedding_batches": batches,
+            "batch_size": batch_size,
+            "batch_utilisation": round(len(embedded) / (batches * batch_size), 3) if batches else 0.0,
+            "parse_seconds": round(parse_seconds, 3),
+            "embed_seconds": round(embed_seconds, 3),
+            "commit_seconds": round(commit_seconds, 3),
+            "total_seconds": round(total_seconds, 3),
+            "docs_per_second": round(len(parsed) / total_seconds, 2) if total_seconds else 0.0,
+            "chunks_per_second": round(len(chunks) / total_seconds, 2) if total_seconds else 0.0,
+        }
+        progress(phase="done")
+        logger.info(
+            f"Bulk ingestion: {report['documents']} documents, {report['chunks']} chunks "
+            f"({report['chunks_embedded']} embedded) in "
+            f"{report['total_seconds']}s ({report['docs_per_second']} docs/s, {report['chunks_per_second']} chunks/s, "
+            f"batch utilisation {report['batch_utilisation']:.0%})"
+        )
+        return report
+
+    def ingest_directory(self, directory: Path = UPLOAD_DIR, uploaded_by: str = "bulk", **kwargs: Any) -> Dict[str, Any]:
+        """Register every supported file under ``directory`` and ingest them with ingest_documents."""
+        paths = sorted(
+            p for p in Path(directory).rglob("*")
+            if p.is_file() and p.suffix.lower() in SUPPORTED_EXTENSIONS
+        )
+        doc_ids = [self.register_file(path, uploaded_by)["id"] for path in paths]
+        logger.info(f"Registered {len(doc_ids)} files from {directory} for ingestion")
+        return self.ingest_documents(doc_ids, **kwargs)
+
+    def reconcile_catalog(self, progress: Optional[Callable[..., None]] = None) -> Dict[str, Any]:
+        """
+        Bring the document catalog in line with the upload directory and the
+        vector index. Runs in the background after startup:
+
+        - files in UPLOAD_DIR with no catalog entry are registered;
+        - documents with chunks in the index (including ones missing from the
+          catalog) are marked trained with their live chunk count, and trained
+          documents without chunks go back to ``uploaded``;
+        - documents whose file is gone are marked ``error``.
+
+        Documents that are currently training are left alone.
+        """
+        self._ensure_ready()
+        progress = progress or (lambda **_: None)
+        started = time.perf_counter()
+
+        known_paths = {Path(d["filepath"]).resolve() for d in document_catalog.list() if d["filepath"]}
+        unregistered = sorted(
+            p for p in UPLOAD_DIR.iterdir()
+            if p.is_file() and p.suffix.lower() in SUPPORTED_EXTENSIONS and p.resolve() not in known_paths
+        )
+        for path in unregistered:
+            self.register_file(path, uploaded_by="reconcile")
+        progress(phase="checking", files_registered=len(unregistered))
+
+        with self._index_lock:
+            chunk_counts = {doc_id: len(ids) for doc_id, ids in self._doc_chunk_ids.items() if ids}
+            first_chunks = {doc_id: ids[0] for doc_id, ids in self._doc_chunk_ids.items() if ids}
+            store = self.vector_store
+        docs = {d["id"]: d for d in document_catalog.list()}
+
+        # Chunks whose document never made it into the catalog (e.g. indexed before it was persistent)
+        restored = 0
+        for doc_id in chunk_counts.keys() - docs.keys():
+            metadata = store.docstore.search(first_chunks[doc_id]).metadata
+            docs[doc_id] = document_catalog.put({
+                "id": doc_id,
+                "filename": metadata.get("filename", doc_id),
+                "filepath": metadata.get("source", ""),
+                "size": 0,
+                "uploaded_at": datetime.now().isoformat(),
+                "uploaded_by": "reconcile",
+                "status": "uploaded",
+                "trained": False,
+                "chunk_count": 0,
+            })
+            restored += 1
+
+        updates: Dict[str, Dict[str, Any]] = {}
+        for doc_id, doc in docs.items():
+            if doc["status"] == "training":
+                continue
+            chunks = chunk_counts.get(doc_id, 0)
+            fields: Dict[str, Any] = {}
+            if chunks and (not doc["trained"] or doc["chunk_count"] != chunks):
+                fields.update(trained=True, chunk_count=chunks, status="trained")
+                if not doc.get("trained_at"):
+                    fields["trained_at"] = datetime.now().isoformat()
+            elif not chunks and doc["trained"]:
+                fields.update(trained=False, chunk_count=0, status="uploaded", trained_at=None)
+            missing = not doc["filepath"] or not Path(doc["filepath"]).exists()
+            if missing and (fields or doc["status"] != "error" or doc.get("error") != FILE_MISSING_ERROR):
+                fields.update(status="error", error=FILE_MISSING_ERROR)
+            if fields:
+                updates[doc_id] = fields
+        document_catalog.update_many(updates)
+
+        report = {
+            "documents": len(docs),
+            "files_registered": len(unregistered),
+            "documents_restored": restored,
+            "documents_updated": len(updates),
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+        progress(phase="done")
+        logger.info(
+            f"Document catalog reconciled: {report['documents']} documents, {report['files_registered']} files registered, "
+            f"{report['documents_restored']} restored from the index, {report['documents_updated']} updated"
+        )
+        return report
+
+    def search(self, query: str, k: int = 3, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Search vector store for relevant documents. With RAG_HYBRID_SEARCH the
+        BM25 index is queried in parallel with the embedding + vector lookup
+        and the two rankings are merged by reciprocal rank fusion. ``score``
+        stays the vector distance for every result; keyword hits also carry
+        ``lexical_coverage`` (share of the query's term weight they contain).
+        ``filters`` restricts the search to some documents (see search_batch).
+        """
+        _check_filters(filters)
+        self._ensure_ready()
         if not self.vector_store:
             logger.warning("No vector store available for search")
             return []
         
         try:
-            results = self.vector_store.similarity_search_with_score(query, k=k)
-            
-            formatted_results = []
-            for doc, score in results:
-                formatted_results.append({
-                    "content": doc.page_content,
-                    "score": float(score),
-                    "metadata": doc.metadata,
-                })
-            
+            formatted_results = [self._format_result(*hit) for hit in self._search_many([query], k, filters)[0]]
             logger.info(f"Search found {len(formatted_results)} results for query: {query[:50]}...")
             return formatted_results
         except Exception as e:
             logger.error(f"Search failed: {e}", exc_info=True)
             return []
 
+    def search_batch(
+        self, queries: List[str], k: int = 3, filters: Optional[Dict[str, Any]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Search many queries at once: all of them are embedded in one model
+        call and looked up in one FAISS search over the query matrix.
+
+        ``filters`` maps ``doc_id`` and/or ``filename`` to a value or a list
+        of values; only chunks of documents matching every given field are
+        returned. Returns one result list per query, in order, formatted as
+        in ``search``. Errors are raised rather than logged.
+        """
+        _check_filters(filters)
+        if len(queries) > RAG_SEARCH_BATCH_MAX:
+            raise ValueError(f"At most {RAG_SEARCH_BATCH_MAX} queries per batch, got {len(queries)}")
+        self._ensure_ready()
+        if not self.vector_store or not queries:
+            return [[] for _ in queries]
+        started = time.perf_counter()
+        results = [[self._format_result(*hit) for hit in hits] for hits in self._search_many(queries, k, filters)]
+        logger.info(f"Batch search: {len(queries)} queries in {(time.perf_counter() - started) * 1000:.1f} ms")
+        return results
+
+    @staticmethod
+    def _format_result(doc: Any, score: float, coverage: Optional[float]) -> Dict[str, Any]:
+        result = {
+            "content": doc.page_content,
+            "score": float(score),
+            "metadata": doc.metadata,
+        }
+        if coverage is not None:
+            result["lexical_coverage"] = round(coverage, 3)
+        return result
+
+    def _search_many(self, queries: List[str], k: int, filters: Optional[Dict[str, Any]] = None) -> List[List[tuple]]:
+        """(doc, vector distance, lexical coverage or None) for the top k chunks of each query."""
+        # Read tombstones before the store: compaction swaps the store first
+        tombstones = self._tombstones
+        store = self.vector_store
+        doc_ids = self._filtered_doc_ids(filters)
+        allowed = None
+        if doc_ids is not None:
+            allowed = {chunk_id for doc_id in doc_ids for chunk_id in self._doc_chunk_ids.get(doc_id, ())} - tombstones
+            if not allowed:
+                return [[] for _ in queries]
+
+        candidates = max(k, RAG_HYBRID_CANDIDATES) if RAG_HYBRID_SEARCH else k
+        embedding_future = self.embeddings.submit_queries(queries)
+        # Keyword search runs on this thread while the embedding worker handles the queries
+        lexical_results = self.lexical_index.search_many(queries, candidates, tombstones, allowed) if RAG_HYBRID_SEARCH else []
+        embeddings = np.asarray(embedding_future.result(), dtype=np.float32)
+        if allowed is None:
+            dense = self._search_chunks_batch(embeddings, candidates, store, tombstones)
+        else:
+            dense = self._search_subset(embeddings, sorted(allowed), candidates, store)
+
+        if not RAG_HYBRID_SEARCH:
+            return [
+                [(self._attribute(chunk_id, store.docstore.search(chunk_id), doc_ids), score, None) for chunk_id, score in hits]
+                for hits in dense
+            ]
+        return [
+            self._fuse(embedding, hits, lexical, k, store, doc_ids)
+            for embedding, hits, lexical in zip(embeddings, dense, lexical_results)
+        ]
+
+    def _fuse(
+        self, embedding: Any, dense: List[tuple], lexical: List[tuple], k: int, store: Any, owners: Optional[set] = None
+    ) -> List[tuple]:
+        """Merge the vector and keyword rankings of one query by reciprocal rank fusion."""
+        distances = dict(dense)
+        coverage = {chunk_id: share for chunk_id, _, share in lexical}
+        fused = reciprocal_rank_fusion(
+            [[chunk_id for chunk_id, _ in dense], [chunk_id for chunk_id, _, _ in lexical]],
+            k=RAG_RRF_K,
+        )[:k]
+        # Keyword-only hits get their vector distance too, so score thresholds still apply
+        missing = [chunk_id for chunk_id, _ in fused if chunk_id not in distances]
+        if missing:
+            _, exact = vector_index.rerank(embedding, self._stored_vectors(store, missing), len(missing))
+            distances.update(zip(missing, exact))
+        return [
+            (self._attribute(chunk_id, store.docstore.search(chunk_id), owners), distances[chunk_id], coverage.get(chunk_id))
+            for chunk_id, _ in fused
+        ]
+
+    def _filtered_doc_ids(self, filters: Optional[Dict[str, Any]]) -> Optional[set]:
+        """Doc ids matching every given filter field; None when nothing is filtered."""
+        matched = None
+        for field, values in (filters or {}).items():
+            if values is None:
+                continue
+            values = {values} if isinstance(values, str) else set(values)
+            if field == "filename":
+                values = {doc["id"] for doc in document_catalog.list() if doc.get("filename") in values}
+            matched = values if matched is None else matched & values
+        return matched
+
+    def _search_by_vector(self, embedding: List[float], k: int, store: Any = None) -> List[Any]:
+        store = store or self.vector_store
+        return [
+            (self._attribute(chunk_id, store.docstore.search(chunk_id)), score)
+            for chunk_id, score in self._search_chunks(embedding, k, store)
+        ]
+
+    def _search_chunks(self, embedding: List[float], k: int, store: Any = None, tombstones: Optional[set] = None) -> List[tuple]:
+        return self._search_chunks_batch(np.array([embedding], dtype=np.float32), k, store, tombstones)[0]
+
+    def _search_chunks_batch(self, embeddings: Any, k: int, store: Any = None, tombstones: Optional[set] = None) -> List[List[tuple]]:
+        """
+        Nearest chunks for each row of ``embeddings``, skipping tombstoned ones.
+        Over-fetches by the number of tombstones so k live results come back
+        when they exist. On a compressed index, k * RAG_RERANK_FACTOR candidates
+        are rescored against their exact vectors from the segment files.
+        """
+        # Read tombstones before the store: compaction swaps the store first
+        tombstones = self._tombstones if tombstones is None else tombstones
+        store = store or self.vector_store
+        rerank = vector_index.RAG_RERANK_FACTOR > 1 and vector_index.index_compression(store.index) != "none"
+        wanted = k * vector_index.RAG_RERANK_FACTOR if rerank else k
+        fetch = min(wanted + len(tombstones), store.index.ntotal)
+        if fetch <= 0:
+            return [[] for _ in embeddings]
+        scores, positions = vector_index.search(store.index, embeddings, fetch)
+        results = []
+        for query, row_scores, row_positions in zip(embeddings, scores, positions):
+            candidates = []
+            for score, position in zip(row_scores, row_positions):
+                if position == -1:
+                    continue
+                chunk_id = store.index_to_docstore_id[position]
+                if chunk_id in tombstones:
+                    continue
+                candidates.append((chunk_id, score))
+                if len(candidates) == wanted:
+                    break
+            if rerank and candidates:
+                try:
+                    exact = self.segments.vectors([chunk_id for chunk_id, _ in candidates])
+                    order, distances = vector_index.rerank(query, exact, k)
+                    candidates = [(candidates[i][0], distances[i]) for i in order]
+                except KeyError as e:
+                    logger.warning(f"Exact vector missing for {e}; returning approximate scores")
+            results.append(candidates[:k])
+        return results
+
+    def _search_subset(self, embeddings: Any, chunk_ids: List[str], k: int, store: Any) -> List[List[tuple]]:
+        """Exact search restricted to ``chunk_ids`` (a metadata filter), over their stored vectors."""
+        subset = vector_index.build_index(self._stored_vectors(store, chunk_ids), "flat", "none")
+        scores, positions = subset.search(embeddings, min(k, len(chunk_ids)))
+        return [
+            [(chunk_ids[position], score) for score, position in zip(row_scores, row_positions) if position != -1]
+            for row_scores, row_positions in zip(scores, positions)
+        ]
+
+    def _attribute(self, chunk_id: str, doc: Any, preferred: Optional[set] = None) -> Any:
+        """
+        A stored chunk carries the metadata of the document that added it.
+        If that document no longer uses a shared chunk, credit one that does
+        (one of ``preferred`` if possible, e.g. the documents a search is filtered to).
+        """
+        owners = self._chunk_refs.get(chunk_id)
+        if preferred and owners:
+            owners = (owners & preferred) or owners
+        if not owners or doc.metadata.get("doc_id") in owners:
+            return doc
+        owner = min(owners)
+        owner_meta = document_catalog.get(owner) or {}
+        return Document(
+            page_content=doc.page_content,
+            metadata={
+                **doc.metadata,
+                "doc_id": owner,
+                "filename": owner_meta.get("filename", owner),
+                "source": owner_meta.get("filepath", ""),
+            },
+        )
+
+    def _index_report(self, store: Any, probes: List[List[float]]) -> Dict[str, Any]:
+        latencies = []
+        for probe in probes:
+            started = time.perf_counter()
+            self._search_by_vector(probe, 3, store)
+            latencies.append((time.perf_counter() - started) * 1000)
+        return {
+            "vectors": store.index.ntotal,
+            "index": vector_index.index_kind(store.index),
+            "compression": vector_index.index_compression(store.index),
+            "index_bytes": int(faiss.serialize_index(store.index).nbytes),
+            "search_p50_ms": round(statistics.median(latencies), 3) if latencies else None,
+        }
+
+    def compact_index(self) -> Dict[str, Any]:
+        """
+        Rebuild the index without tombstoned chunks, or to retrain it when
+        the corpus has outgrown it (see vector_index.needs_rebuild). The new
+        index is built from a snapshot while searches keep using the current
+        one, then swapped in; if chunks were added meanwhile the rebuild is
+        retried. Returns size and search latency before and after.
+        """
+        self._ensure_ready()
+        if self.vector_store is None:
+            return {"compacted": False, "reason": "no vector store"}
+
+        with self._compacting:
+            for _ in range(3):
+                with self._index_lock:
+                    store = self.vector_store
+                    version = self._index_version
+                    dead = set(self._tombstones)
+                    segment_names = self.segments.segment_names()
+                    live = [(pos, cid) for pos, cid in sorted(store.index_to_docstore_id.items()) if cid not in dead]
+
+                retrain = vector_index.needs_rebuild(store.index)
+                if not dead and not retrain:
+                    return {"compacted": False, "reason": "no deleted chunks"}
+
+                # Exact vectors from the segments, so a compressed index is not rebuilt from its own approximations
+                vectors = self._stored_vectors(store, [cid for _, cid in live]).reshape(len(live), store.index.d)
+                probes = [row.tolist() for row in vectors[:RAG_COMPACT_LATENCY_PROBES]]
+                before = self._index_report(store, probes)
+
+                started = time.perf_counter()
+                docs = [store.docstore.search(cid) for _, cid in live]
+                compacted = self._build_store(
+                    [cid for _, cid in live],
+                    [doc.page_content for doc in docs],
+                    [doc.metadata for doc in docs],
+                    vectors,
+                )
+                rebuild_seconds = time.perf_counter() - started
+
+                with self._index_lock:
+                    if self._index_version != version:
+                        logger.info("Chunks were added during compaction, rebuilding from a new snapshot")
+                        continue
+                    self.vector_store = compacted
+                    self.lexical_index.remove_many(dead)
+                    # Tombstones added during the rebuild still apply to the new index
+                    self._tombstones = self._tombstones - dead
+
+                # Rewrite the on-disk segments without the dropped rows; later segments may
+                # hold the same content-addressed ids again and must be left alone
+                if dead:
+                    self.segments.merge(names=segment_names, dead=dead)
+
+                after = self._index_report(compacted, probes)
+                report = {
+                    "compacted": True,
+                    "retrained": retrain,
+                    "removed_vectors": before["vectors"] - after["vectors"],
+                    "rebuild_seconds": round(rebuild_seconds, 3),
+                    "before": before,
+                    "after": after,
+                }
+                logger.info(
+                    f"Index compacted: {before['index']}/{before['compression']} -> {after['index']}/{after['compression']}, {before['vectors']} -> {after['vectors']} vectors, "
+                    f"{before['index_bytes']} -> {after['index_bytes']} bytes, "
+                    f"search p50 {before['search_p50_ms']} -> {after['search_p50_ms']} ms"
+                )
+                return report
+        return {"compacted": False, "reason": "index kept changing during compaction"}
+
+    def _maybe_compact(self) -> None:
+        """
+        Compact in the background once tombstones exceed RAG_COMPACT_TOMBSTONE_RATIO
+        of the index, or once the index needs retraining for its current size.
+        """
+        store = self.vector_store
+        if store is None or not store.index.ntotal or self._compacting.locked():
+            return
+        deleted = RAG_COMPACT_TOMBSTONE_RATIO and len(self._tombstones) / store.index.ntotal >= RAG_COMPACT_TOMBSTONE_RATIO
+        if not deleted and not vector_index.needs_rebuild(store.index):
+            return
+        threading.Thread(target=self.compact_index, name="index-compaction", daemon=True).start()
+
+    def index_stats(self) -> Dict[str, Any]:
+        store = self.vector_store
+        return {
+            "ready": self.ready,
+            "vectors": store.index.ntotal if store else 0,
+            "index": vector_index.describe(store.index) if store else None,
+            "deleted_vectors": len(self._tombstones),
+            "documents": len(self._doc_chunk_ids),
+            "segments": self.segments.stats() if self.segments else None,
+        }
+
+    async def asearch(self, query: str, k: int = 3, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Async variant of search; runs the embedding + FAISS lookup in a worker thread."""
+        return await asyncio.to_thread(self.search, query, k, filters)
+
+    async def asearch_batch(
+        self, queries: List[str], k: int = 3, filters: Optional[Dict[str, Any]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """Async variant of search_batch."""
+        return await asyncio.to_thread(self.search_batch, queries, k, filters)
+
     def get_all_documents(self) -> List[Dict[str, Any]]:
         """Get all document metadata."""
-        return list(documents_store.values())
+        return document_catalog.list()
+
+    def list_documents(self, status: Optional[str] = None, cursor: Optional[str] = None, limit: int = 100) -> Dict[str, Any]:
+        """One page of document metadata: ``{items, next_cursor, total}``."""
+        return document_catalog.query(status=status, cursor=cursor, limit=limit)
 
     def get_document(self, doc_id: str) -> Optional[Dict[str, Any]]:
         """Get single document metadata."""
-        return documents_store.get(doc_id)
+        return document_catalog.get(doc_id)
 
     def delete_document(self, doc_id: str) -> bool:
         """Delete document and remove from vector store."""
-        if doc_id not in documents_store:
+        self._ensure_ready()
+        doc_meta = document_catalog.get(doc_id)
+        if doc_meta is None:
             return False
         
         try:
-            doc_meta = documents_store[doc_id]
-            
             # Delete file
             file_path = Path(doc_meta["filepath"])
-            if file_path.exists():
+            if doc_meta["filepath"] and file_path.exists():
                 file_path.unlink()
             
             # Remove from store
-            del documents_store[doc_id]
+            document_catalog.delete(doc_id)
             
-            # Note: FAISS doesn't support deletion easily, would need to rebuild
-            # For now, we just mark it as deleted in metadata
+            # Hide its chunks immediately; compaction reclaims the space
+            with self._index_lock:
+                removed = self._tombstone_document(doc_id)
+                if removed:
+                    self.segments.set_tombstones(self._tombstones)
+            self._notify_document_changed(doc_id)
+            self._maybe_compact()
             
-            logger.info(f"Document deleted: {doc_id}")
+            logger.info(f"Document deleted: {doc_id} ({removed} chunks removed from search)")
             return True
         except Exception as e:
             logger.error(f"Failed to delete document {doc_id}: {e}", exc_info=True)
@@ -264,3 +1189,30 @@ class RAGService:
 
 # Global RAG service instance
 rag_service = RAGService()
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s - %(message)s")
+    parser = argparse.ArgumentParser(description="RAG knowledge base maintenance")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest_cmd = commands.add_parser("ingest", help="bulk-train every supported document in a directory")
+    ingest_cmd.add_argument("directory", nargs="?", default=str(UPLOAD_DIR))
+    ingest_cmd.add_argument("--workers", type=int, default=RAG_INGEST_WORKERS)
+    ingest_cmd.add_argument("--batch-size", type=int, default=RAG_INGEST_BATCH_SIZE)
+    ingest_cmd.add_argument("--retrain", action="store_true", help="also re-embed documents that are already trained")
+    commands.add_parser("reconcile", help="sync the document catalog with the upload directory and vector index")
+    args = parser.parse_args()
+
+    if args.command == "ingest":
+        report = rag_service.ingest_directory(
+            Path(args.directory),
+            workers=args.workers,
+            batch_size=args.batch_size,
+            skip_trained=not args.retrain,
+        )
+        print(json.dumps(report, indent=2))
+    elif args.command == "reconcile":
+        print(json.dumps(rag_service.reconcile_catalog(), indent=2))
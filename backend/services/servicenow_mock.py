@@ -1,13 +1,15 @@
 import logging
 
-tickets = {}
+from services.event_bus import event_bus, TICKET_CREATED, TICKET_UPDATED
+from services.ticket_store import create_ticket_repository
+
+# Ticket repository (SQLite by default; TICKET_STORE=memory for tests)
+tickets = create_ticket_repository()
 
 logger = logging.getLogger("backend.services.servicenow")
 
 
-def create_ticket(description, alert_id=None, ticket_type=None, start_time=None, end_time=None, assigned_to=None, service_type=None, application=None, source="form"):
-    ticket_id = f"TKT-{len(tickets)+1}"
-    
+def _new_ticket_fields(description, alert_id, ticket_type, start_time, end_time, assigned_to, service_type, application, source):
     # Set status based on ticket type
     if ticket_type == "silence_alert":
         status = "suppressed"
@@ -17,9 +19,8 @@ def create_ticket(description, alert_id=None, ticket_type=None, start_time=None,
             silence_alert(alert_id, start_time, end_time)
     else:
         status = "open"
-    
-    tickets[ticket_id] = {
-        "id": ticket_id,
+
+    return {
         "description": description,
         "alert_id": alert_id,
         "ticket_type": ticket_type,
@@ -32,5 +33,58 @@ def create_ticket(description, alert_id=None, ticket_type=None, start_time=None,
         "application": application,
         "source": source
     }
-    logger.info("Created ticket %s: type=%s alert=%s source=%s status=%s assigned_to=%s", ticket_id, ticket_type, alert_id, source, status, assigned_to)
-    return ticket_id
\ No newline at end of file
+
+
+def _created(ticket):
+    event_bus.publish(TICKET_CREATED, ticket)
+    logger.info("Created ticket %s: type=%s alert=%s source=%s status=%s assigned_to=%s", ticket["id"], ticket["ticket_type"], ticket["alert_id"], ticket["source"], ticket["status"], ticket["assigned_to"])
+    return ticket["id"]
+
+
+def create_ticket(description, alert_id=None, ticket_type=None, start_time=None, end_time=None, assigned_to=None, service_type=None, application=None, source="form"):
+    fields = _new_ticket_fields(description, alert_id, ticket_type, start_time, end_time, assigned_to, service_type, application, source)
+    return _created(tickets.create(fields))
+
+
+async def acreate_ticket(description, alert_id=None, ticket_type=None, start_time=None, end_time=None, assigned_to=None, service_type=None, application=None, source="form"):
+    """``create_ticket`` for async endpoints; awaits the write instead of blocking the event loop."""
+    fields = _new_ticket_fields(description, alert_id, ticket_type, start_time, end_time, assigned_to, service_type, application, source)
+    return _created(await tickets.acreate(fields))
+
+
+def get_ticket(ticket_id):
+    return tickets.get(ticket_id)
+
+
+def _updated(ticket_id, ticket):
+    if ticket is None:
+        logger.warning("Ticket %s not found to update", ticket_id)
+    else:
+        event_bus.publish(TICKET_UPDATED, ticket)
+    return ticket
+
+
+def update_ticket(ticket_id, **fields):
+    return _updated(ticket_id, tickets.update(ticket_id, **fields))
+
+
+async def aupdate_ticket(ticket_id, **fields):
+    """``update_ticket`` for async endpoints."""
+    return _updated(ticket_id, await tickets.aupdate(ticket_id, **fields))
+
+
+def list_tickets():
+    return tickets.list()
+
+
+def query_tickets(status=None, assigned_to=None, ticket_type=None, source=None,
+                  created_after=None, created_before=None, since=None, cursor=None, limit=100):
+    filters = {"status": status, "assigned_to": assigned_to, "ticket_type": ticket_type, "source": source}
+    return tickets.query(
+        filters={f: v for f, v in filters.items() if v is not None},
+        created_after=created_after,
+        created_before=created_before,
+        since=since,
+        cursor=cursor,
+        limit=limit,
+    )
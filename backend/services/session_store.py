@@ -0,0 +1,266 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from graph.chatbot_state import ChatbotState
+
+logger = logging.getLogger("backend.services.session_store")
+
+# Chat session storage configuration
+SESSION_STORE = os.getenv("SESSION_STORE", "memory").lower()  # memory | sqlite
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", "./data/sessions.sqlite3")
+SESSION_IDLE_TTL_SECONDS = float(os.getenv("SESSION_IDLE_TTL_SECONDS", "1800"))
+SESSION_MAX_COUNT = int(os.getenv("SESSION_MAX_COUNT", "5000"))
+SESSION_MAX_MESSAGES = int(os.getenv("SESSION_MAX_MESSAGES", "50"))
+SESSION_PRUNE_INTERVAL_SECONDS = float(os.getenv("SESSION_PRUNE_INTERVAL_SECONDS", "30"))
+
+
+class SessionStore:
+    """
+    Storage interface for chatbot sessions (session_id -> ChatbotState).
+
+    Sessions idle for longer than ``idle_ttl_seconds`` expire, the least
+    recently used ones are evicted beyond ``max_count``, and only the last
+    ``max_messages`` messages of a conversation are kept.
+    """
+
+    def __init__(self, idle_ttl_seconds: float, max_count: int, max_messages: int):
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_count = max_count
+        self.max_messages = max_messages
+        self._counter_lock = threading.Lock()
+        self._counters = {"expired": 0, "evicted": 0, "trimmed_messages": 0}
+
+    def get(self, session_id: str) -> Optional[ChatbotState]:
+        raise NotImplementedError
+
+    def put(self, session_id: str, state: ChatbotState) -> None:
+        raise NotImplementedError
+
+    def delete(self, session_id: str) -> None:
+        raise NotImplementedError
+
+    def memory_bytes(self) -> int:
+        """Approximate serialized size of all stored sessions."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def __contains__(self, session_id: object) -> bool:
+        return isinstance(session_id, str) and self.get(session_id) is not None
+
+    def __getitem__(self, session_id: str) -> ChatbotState:
+        state = self.get(session_id)
+        if state is None:
+            raise KeyError(session_id)
+        return state
+
+    def __setitem__(self, session_id: str, state: ChatbotState) -> None:
+        self.put(session_id, state)
+
+    def __delitem__(self, session_id: str) -> None:
+        self.delete(session_id)
+
+    def _trim(self, state: ChatbotState) -> ChatbotState:
+        overflow = len(state.messages) - self.max_messages
+        if overflow > 0:
+            state.messages = state.messages[overflow:]
+            self.record("trimmed_messages", overflow)
+        return state
+
+    def record(self, counter: str, amount: int = 1) -> None:
+        with self._counter_lock:
+            self._counters[counter] += amount
+
+    def stats(self) -> Dict[str, Any]:
+        with self._counter_lock:
+            counters = dict(self._counters)
+        return {
+            "backend": type(self).__name__,
+            "sessions": len(self),
+            "memory_bytes": self.memory_bytes(),
+            "max_count": self.max_count,
+            "idle_ttl_seconds": self.idle_ttl_seconds,
+            **counters,
+        }
+
+
+class InMemorySessionStore(SessionStore):
+    """Process-local LRU keyed by last access; expired sessions are dropped from the cold end."""
+
+    def __init__(
+        self,
+        idle_ttl_seconds: float = SESSION_IDLE_TTL_SECONDS,
+        max_count: int = SESSION_MAX_COUNT,
+        max_messages: int = SESSION_MAX_MESSAGES,
+    ):
+        super().__init__(idle_ttl_seconds, max_count, max_messages)
+        # session_id -> (state, last_access, approx_bytes), least recently used first
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _expire(self, now: float) -> None:
+        while self._sessions:
+            session_id, (_, last_access, size) = next(iter(self._sessions.items()))
+            if now - last_access < self.idle_ttl_seconds:
+                break
+            del self._sessions[session_id]
+            self._bytes -= size
+            self.record("expired")
+
+    def get(self, session_id: str) -> Optional[ChatbotState]:
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            state, _, size = entry
+            self._sessions[session_id] = (state, now, size)
+            self._sessions.move_to_end(session_id)
+            return state
+
+    def put(self, session_id: str, state: ChatbotState) -> None:
+        state = self._trim(state)
+        size = len(state.json())
+        now = time.monotonic()
+        with self._lock:
+            previous = self._sessions.pop(session_id, None)
+            if previous is not None:
+                self._bytes -= previous[2]
+            self._sessions[session_id] = (state, now, size)
+            self._bytes += size
+            self._expire(now)
+            while len(self._sessions) > self.max_count:
+                _, (_, _, evicted_size) = self._sessions.popitem(last=False)
+                self._bytes -= evicted_size
+                self.record("evicted")
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+            if entry is not None:
+                self._bytes -= entry[2]
+
+    def memory_bytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._expire(time.monotonic())
+            return len(self._sessions)
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    SQLite-backed store: sessions survive restarts and are shared by all
+    uvicorn workers on the host. Expiry and LRU eviction run at most once
+    per SESSION_PRUNE_INTERVAL_SECONDS.
+    """
+
+    def __init__(
+        self,
+        path: str = SESSION_DB_PATH,
+        idle_ttl_seconds: float = SESSION_IDLE_TTL_SECONDS,
+        max_count: int = SESSION_MAX_COUNT,
+        max_messages: int = SESSION_MAX_MESSAGES,
+    ):
+        super().__init__(idle_ttl_seconds, max_count, max_messages)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._last_prune = 0.0
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chat_sessions ("
+            " session_id TEXT PRIMARY KEY, state TEXT NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_chat_sessions_last_access ON chat_sessions(last_access)")
+        self._conn.commit()
+
+    def _prune(self, now: float) -> None:
+        if now - self._last_prune < SESSION_PRUNE_INTERVAL_SECONDS:
+            return
+        self._last_prune = now
+        expired = self._conn.execute(
+            "DELETE FROM chat_sessions WHERE last_access <= ?", (now - self.idle_ttl_seconds,)
+        ).rowcount
+        evicted = self._conn.execute(
+            "DELETE FROM chat_sessions WHERE session_id IN ("
+            " SELECT session_id FROM chat_sessions ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+            (self.max_count,),
+        ).rowcount
+        self.record("expired", expired)
+        self.record("evicted", evicted)
+
+    def get(self, session_id: str) -> Optional[ChatbotState]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state, last_access FROM chat_sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[1] >= self.idle_ttl_seconds:
+                self._conn.execute("DELETE FROM chat_sessions WHERE session_id = ?", (session_id,))
+                self._conn.commit()
+                self.record("expired")
+                return None
+            self._conn.execute("UPDATE chat_sessions SET last_access = ? WHERE session_id = ?", (now, session_id))
+            self._conn.commit()
+        return ChatbotState(**json.loads(row[0]))
+
+    def put(self, session_id: str, state: ChatbotState) -> None:
+        payload = self._trim(state).json()
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO chat_sessions (session_id, state, last_access) VALUES (?, ?, ?)",
+                (session_id, payload, now),
+            )
+            self._prune(now)
+            self._conn.commit()
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM chat_sessions WHERE session_id = ?", (session_id,))
+            self._conn.commit()
+
+    def memory_bytes(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(LENGTH(state)), 0) FROM chat_sessions").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        cutoff = time.time() - self.idle_ttl_seconds
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM chat_sessions WHERE last_access > ?", (cutoff,)
+            ).fetchone()[0]
+
+
+def create_session_store(backend: str = SESSION_STORE) -> SessionStore:
+    """Build the configured session store."""
+    if backend == "sqlite":
+        try:
+            return SQLiteSessionStore()
+        except Exception as e:
+            logger.error(f"Failed to open session database at {SESSION_DB_PATH}, falling back to memory: {e}")
+    elif backend != "memory":
+        logger.warning(f"Unknown SESSION_STORE '{backend}', using in-memory sessions")
+    return InMemorySessionStore()
@@ -0,0 +1,78 @@
+import contextlib
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger("backend.services.startup")
+
+
+class StartupTracker:
+    """
+    Times the phases of process start-up and records when the service is
+    ready to take traffic. ``/health`` reports liveness as soon as the app
+    is serving; ``/ready`` waits for ``mark_ready``.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._last_mark = self.started
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self.phases: Dict[str, float] = {}
+        self.current: Optional[str] = None
+        self.error: Optional[str] = None
+
+    def _record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.phases[name] = round(seconds, 3)
+        logger.info(f"Startup phase {name} took {seconds * 1000:.0f}ms")
+
+    def mark(self, name: str) -> None:
+        """Record the time since the previous mark (or process start) as a phase."""
+        now = time.perf_counter()
+        self._record(name, now - self._last_mark)
+        self._last_mark = now
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        """Time the enclosed block as one phase."""
+        self.current = name
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, time.perf_counter() - started)
+            self.current = None
+            self._last_mark = time.perf_counter()
+
+    def mark_ready(self) -> None:
+        self._ready.set()
+        breakdown = ", ".join(f"{name}={seconds:.2f}s" for name, seconds in self.phases.items())
+        logger.info(f"Service ready after {self.elapsed():.2f}s ({breakdown})")
+
+    def fail(self, error: Exception) -> None:
+        self.error = str(error)
+        logger.error(f"Startup warm-up failed: {error}", exc_info=True)
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            phases = dict(self.phases)
+        return {
+            "ready": self.ready,
+            "phase": self.current,
+            "phases": phases,
+            "elapsed_seconds": round(self.elapsed(), 3),
+            "error": self.error,
+        }
+
+
+# Global start-up tracker, created when main.py starts importing
+startup = StartupTracker()
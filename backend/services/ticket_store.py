@@ -0,0 +1,463 @@
+import asyncio
+import logging
+import os
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("backend.services.ticket_store")
+
+# Ticket storage configuration
+TICKET_STORE = os.getenv("TICKET_STORE", "sqlite").lower()  # sqlite | memory
+TICKET_DB_PATH = os.getenv("TICKET_DB_PATH", "./data/tickets.sqlite3")
+TICKET_WRITE_BATCH_SIZE = int(os.getenv("TICKET_WRITE_BATCH_SIZE", "64"))
+TICKET_WRITE_BATCH_WAIT_MS = float(os.getenv("TICKET_WRITE_BATCH_WAIT_MS", "2"))
+
+TICKET_FIELDS = (
+    "description",
+    "alert_id",
+    "ticket_type",
+    "start_time",
+    "end_time",
+    "status",
+    "assigned_to",
+    "work_comments",
+    "service_type",
+    "application",
+    "source",
+)
+INDEXED_FIELDS = ("status", "assigned_to", "ticket_type", "source")
+# Equality filters accepted by TicketRepository.query
+FILTER_FIELDS = INDEXED_FIELDS
+TICKET_PAGE_MAX = 1000
+
+
+def ticket_id_for(seq: int) -> str:
+    return f"TKT-{seq}"
+
+
+def seq_for(ticket_id: str) -> Optional[int]:
+    try:
+        return int(str(ticket_id).rsplit("-", 1)[1])
+    except (IndexError, ValueError):
+        return None
+
+
+class TicketRepository:
+    """Storage interface for ServiceNow tickets."""
+
+    def create(self, fields: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert a ticket, allocating its ID atomically. Returns the stored ticket."""
+        raise NotImplementedError
+
+    def get(self, ticket_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def update(self, ticket_id: str, **fields: Any) -> Optional[Dict[str, Any]]:
+        """Update fields of an existing ticket. Returns the updated ticket, or None if missing."""
+        raise NotImplementedError
+
+    async def acreate(self, fields: Dict[str, Any]) -> Dict[str, Any]:
+        """``create`` for async callers; must not block the event loop."""
+        return self.create(fields)
+
+    async def aupdate(self, ticket_id: str, **fields: Any) -> Optional[Dict[str, Any]]:
+        """``update`` for async callers; must not block the event loop."""
+        return self.update(ticket_id, **fields)
+
+    def list(self) -> List[Dict[str, Any]]:
+        """All tickets in creation order."""
+        raise NotImplementedError
+
+    def query(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        created_after: Optional[str] = None,
+        created_before: Optional[str] = None,
+        since: Optional[int] = None,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+    ) -> Dict[str, Any]:
+        """
+        One page of tickets.
+
+        ``filters`` holds equality filters on FILTER_FIELDS; ``created_after``
+        / ``created_before`` bound creation time (ISO strings). Without
+        ``since`` pages are in creation order; with ``since`` every ticket
+        whose change ``version`` is greater is returned, in change order,
+        with ``matches`` set to whether it passes the filters. A ticket that
+        changed out of the filter comes back with ``matches: False``, so a
+        client syncing a filtered view knows to drop it.
+        Returns ``{"items", "next_cursor", "version"}`` where ``version`` is
+        the current change counter to pass as the next ``since``.
+        """
+        raise NotImplementedError
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def __contains__(self, ticket_id: object) -> bool:
+        return isinstance(ticket_id, str) and self.get(ticket_id) is not None
+
+    def __len__(self) -> int:
+        return self.count()
+
+
+class InMemoryTicketRepository(TicketRepository):
+    """Dict-backed repository; non-durable, intended for tests and local runs."""
+
+    def __init__(self):
+        self._tickets: Dict[str, Dict[str, Any]] = {}
+        self._next_seq = 1
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def create(self, fields: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            ticket_id = ticket_id_for(self._next_seq)
+            self._next_seq += 1
+            self._version += 1
+            now = datetime.now().isoformat()
+            ticket = {
+                "id": ticket_id,
+                **{f: fields.get(f) for f in TICKET_FIELDS},
+                "version": self._version,
+                "created_at": now,
+                "updated_at": now,
+            }
+            self._tickets[ticket_id] = ticket
+            return dict(ticket)
+
+    def get(self, ticket_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            ticket = self._tickets.get(ticket_id)
+            return dict(ticket) if ticket else None
+
+    def update(self, ticket_id: str, **fields: Any) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            ticket = self._tickets.get(ticket_id)
+            if ticket is None:
+                return None
+            ticket.update({f: v for f, v in fields.items() if f in TICKET_FIELDS})
+            self._version += 1
+            ticket["version"] = self._version
+            ticket["updated_at"] = datetime.now().isoformat()
+            return dict(ticket)
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(t) for t in self._tickets.values()]
+
+    def query(self, filters=None, created_after=None, created_before=None, since=None, cursor=None, limit=100):
+        limit = max(1, min(limit, TICKET_PAGE_MAX))
+        def passes(t):
+            return (
+                all(t.get(f) == v for f, v in (filters or {}).items() if f in FILTER_FIELDS)
+                and (created_after is None or t["created_at"] >= created_after)
+                and (created_before is None or t["created_at"] < created_before)
+            )
+
+        with self._lock:
+            version = self._version
+            tickets = [dict(t) for t in self._tickets.values()]
+        if since is not None:
+            after = max(since, int(cursor)) if cursor else since
+            # Changed tickets outside the filters are returned too, flagged, so clients can drop them
+            matches = sorted(({**t, "matches": passes(t)} for t in tickets if t["version"] > after), key=lambda t: t["version"])
+            position = lambda t: t["version"]
+        else:
+            after = int(cursor) if cursor else 0
+            matches = [t for t in tickets if passes(t) and seq_for(t["id"]) > after]
+            position = lambda t: seq_for(t["id"])
+        page = matches[:limit]
+        next_cursor = str(position(page[-1])) if len(matches) > limit else None
+        return {"items": page, "next_cursor": next_cursor, "version": version}
+
+    def count(self) -> int:
+        return len(self._tickets)
+
+
+def _to_db(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+class SQLiteTicketRepository(TicketRepository):
+    """
+    Durable repository on SQLite in WAL mode.
+
+    All writes go through a single writer thread that commits queued
+    operations in batches (group commit); callers wait until their batch
+    is committed, so reads always see their own writes. ``acreate`` and
+    ``aupdate`` await the commit instead of blocking, so concurrent
+    requests on one event loop share a batch. Each operation runs under
+    its own savepoint: one that fails is rolled back and reported to its
+    caller alone. Reads use per-thread connections and do not block the
+    writer.
+    """
+
+    def __init__(
+        self,
+        path: str = TICKET_DB_PATH,
+        batch_size: int = TICKET_WRITE_BATCH_SIZE,
+        batch_wait_ms: float = TICKET_WRITE_BATCH_WAIT_MS,
+    ):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait_ms / 1000
+        self._local = threading.local()
+        self._writes: "queue.Queue[Optional[tuple]]" = queue.Queue()
+
+        conn = self._connect()
+        columns = ", ".join(f"{f} TEXT" for f in TICKET_FIELDS)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS tickets ("
+            " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+            f" {columns},"
+            " created_at TEXT NOT NULL, updated_at TEXT NOT NULL)"
+        )
+        existing = {row["name"] for row in conn.execute("PRAGMA table_info(tickets)")}
+        if "version" not in existing:
+            conn.execute("ALTER TABLE tickets ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+            conn.execute("UPDATE tickets SET version = seq")
+        for field in INDEXED_FIELDS + ("version", "created_at"):
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_tickets_{field} ON tickets({field})")
+        conn.commit()
+        self._writer_conn = conn
+
+        self._writer = threading.Thread(target=self._write_loop, name="ticket-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    # -- writer ---------------------------------------------------------------
+
+    def _write_loop(self) -> None:
+        while True:
+            item = self._writes.get()
+            if item is None:
+                return
+            batch = [item]
+            try:
+                while len(batch) < self.batch_size:
+                    nxt = self._writes.get(timeout=self.batch_wait)
+                    if nxt is None:
+                        self._writes.put(None)
+                        break
+                    batch.append(nxt)
+            except queue.Empty:
+                pass
+            self._commit_batch(batch)
+
+    def _commit_batch(self, batch: List[tuple]) -> None:
+        conn = self._writer_conn
+        outcomes = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for operation, _ in batch:
+                conn.execute("SAVEPOINT ticket_write")
+                try:
+                    outcomes.append((operation(conn), None))
+                except Exception as e:
+                    # Undo just this operation; the rest of the batch still commits
+                    conn.execute("ROLLBACK TO ticket_write")
+                    logger.error(f"Ticket write failed: {e}", exc_info=True)
+                    outcomes.append((None, e))
+                conn.execute("RELEASE ticket_write")
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Ticket write batch of {len(batch)} failed: {e}", exc_info=True)
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), (result, error) in zip(batch, outcomes):
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def _enqueue(self, operation: Callable[[sqlite3.Connection], Any]) -> Future:
+        future: Future = Future()
+        self._writes.put((operation, future))
+        return future
+
+    def _submit(self, operation: Callable[[sqlite3.Connection], Any]) -> Any:
+        return self._enqueue(operation).result()
+
+    async def _asubmit(self, operation: Callable[[sqlite3.Connection], Any]) -> Any:
+        return await asyncio.wrap_future(self._enqueue(operation))
+
+    # -- repository API -------------------------------------------------------
+
+    @staticmethod
+    def _row_to_ticket(row: sqlite3.Row) -> Dict[str, Any]:
+        ticket = {
+            "id": ticket_id_for(row["seq"]),
+            **{f: row[f] for f in TICKET_FIELDS},
+            "version": row["version"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+        }
+        if "matches" in row.keys():
+            ticket["matches"] = bool(row["matches"])
+        return ticket
+
+    @staticmethod
+    def _next_version(conn: sqlite3.Connection) -> int:
+        # Only the writer thread assigns versions, so MAX + 1 is monotonic
+        return conn.execute("SELECT COALESCE(MAX(version), 0) + 1 FROM tickets").fetchone()[0]
+
+    def _insert(self, fields: Dict[str, Any]) -> Tuple[Callable[[sqlite3.Connection], tuple], Callable[[tuple], Dict[str, Any]]]:
+        """The insert operation for the writer, and the function building the ticket from its result."""
+        values = [_to_db(fields.get(f)) for f in TICKET_FIELDS]
+        now = datetime.now().isoformat()
+
+        def insert(conn: sqlite3.Connection) -> tuple:
+            version = self._next_version(conn)
+            cursor = conn.execute(
+                f"INSERT INTO tickets ({', '.join(TICKET_FIELDS)}, version, created_at, updated_at)"
+                f" VALUES ({', '.join('?' for _ in TICKET_FIELDS)}, ?, ?, ?)",
+                (*values, version, now, now),
+            )
+            return cursor.lastrowid, version
+
+        def ticket(result: tuple) -> Dict[str, Any]:
+            seq, version = result
+            return {
+                "id": ticket_id_for(seq),
+                **{f: v for f, v in zip(TICKET_FIELDS, values)},
+                "version": version,
+                "created_at": now,
+                "updated_at": now,
+            }
+
+        return insert, ticket
+
+    def create(self, fields: Dict[str, Any]) -> Dict[str, Any]:
+        insert, ticket = self._insert(fields)
+        return ticket(self._submit(insert))
+
+    async def acreate(self, fields: Dict[str, Any]) -> Dict[str, Any]:
+        insert, ticket = self._insert(fields)
+        return ticket(await self._asubmit(insert))
+
+    def get(self, ticket_id: str) -> Optional[Dict[str, Any]]:
+        seq = seq_for(ticket_id)
+        if seq is None:
+            return None
+        row = self._reader().execute("SELECT * FROM tickets WHERE seq = ?", (seq,)).fetchone()
+        return self._row_to_ticket(row) if row else None
+
+    def _update(self, seq: int, fields: Dict[str, Any]) -> Optional[Callable[[sqlite3.Connection], int]]:
+        """The update operation for the writer (returns the row count), or None if no field changes."""
+        updates = {f: _to_db(v) for f, v in fields.items() if f in TICKET_FIELDS}
+        if not updates:
+            return None
+        assignments = ", ".join(f"{f} = ?" for f in updates)
+        now = datetime.now().isoformat()
+
+        def apply(conn: sqlite3.Connection) -> int:
+            return conn.execute(
+                f"UPDATE tickets SET {assignments}, version = ?, updated_at = ? WHERE seq = ?",
+                (*updates.values(), self._next_version(conn), now, seq),
+            ).rowcount
+
+        return apply
+
+    def update(self, ticket_id: str, **fields: Any) -> Optional[Dict[str, Any]]:
+        seq = seq_for(ticket_id)
+        if seq is None:
+            return None
+        apply = self._update(seq, fields)
+        if apply is not None and not self._submit(apply):
+            return None
+        return self.get(ticket_id)
+
+    async def aupdate(self, ticket_id: str, **fields: Any) -> Optional[Dict[str, Any]]:
+        seq = seq_for(ticket_id)
+        if seq is None:
+            return None
+        apply = self._update(seq, fields)
+        if apply is not None and not await self._asubmit(apply):
+            return None
+        return self.get(ticket_id)
+
+    def list(self) -> List[Dict[str, Any]]:
+        rows = self._reader().execute("SELECT * FROM tickets ORDER BY seq").fetchall()
+        return [self._row_to_ticket(row) for row in rows]
+
+    def query(self, filters=None, created_after=None, created_before=None, since=None, cursor=None, limit=100):
+        limit = max(1, min(limit, TICKET_PAGE_MAX))
+        filter_clauses, filter_params = [], []
+        for field, value in (filters or {}).items():
+            if field in FILTER_FIELDS:
+                filter_clauses.append(f"{field} = ?")
+                filter_params.append(value)
+        if created_after is not None:
+            filter_clauses.append("created_at >= ?")
+            filter_params.append(created_after)
+        if created_before is not None:
+            filter_clauses.append("created_at < ?")
+            filter_params.append(created_before)
+        if since is not None:
+            # Changed tickets outside the filters are returned too, flagged, so clients can drop them
+            order = "version"
+            columns = f"*, ({' AND '.join(filter_clauses) or '1'}) AS matches"
+            select_params = filter_params
+            clauses, params = ["version > ?"], [max(since, int(cursor)) if cursor else since]
+        else:
+            order = "seq"
+            columns, select_params = "*", []
+            clauses, params = filter_clauses, filter_params
+            if cursor:
+                clauses.append("seq > ?")
+                params.append(int(cursor))
+
+        conn = self._reader()
+        version = conn.execute("SELECT COALESCE(MAX(version), 0) FROM tickets").fetchone()[0]
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = conn.execute(
+            f"SELECT {columns} FROM tickets {where} ORDER BY {order} LIMIT ?", (*select_params, *params, limit + 1)
+        ).fetchall()
+        next_cursor = str(rows[limit - 1][order]) if len(rows) > limit else None
+        return {"items": [self._row_to_ticket(row) for row in rows[:limit]], "next_cursor": next_cursor, "version": version}
+
+    def count(self) -> int:
+        return self._reader().execute("SELECT COUNT(*) FROM tickets").fetchone()[0]
+
+    def close(self) -> None:
+        self._writes.put(None)
+        self._writer.join(timeout=5)
+
+
+def create_ticket_repository(backend: str = TICKET_STORE) -> TicketRepository:
+    """Build the configured ticket repository."""
+    if backend == "memory":
+        return InMemoryTicketRepository()
+    if backend != "sqlite":
+        logger.warning(f"Unknown TICKET_STORE '{backend}', using sqlite")
+    try:
+        return SQLiteTicketRepository()
+    except Exception as e:
+        logger.error(f"Failed to open ticket database at {TICKET_DB_PATH}, using in-memory store: {e}")
+        return InMemoryTicketRepository()
@@ -0,0 +1,165 @@
+import logging
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from services.rag_service import rag_service, TrainingCancelled
+
+logger = logging.getLogger("backend.services.training_jobs")
+
+# Background training configuration
+TRAINING_WORKERS = int(os.getenv("TRAINING_WORKERS", "2"))
+TRAINING_JOB_HISTORY = int(os.getenv("TRAINING_JOB_HISTORY", "200"))  # finished jobs kept for status queries
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+class TrainingJob:
+    """A queued unit of document ingestion work and its progress."""
+
+    def __init__(self, kind: str, target: Any):
+        self.id = f"job_{uuid.uuid4().hex[:12]}"
+        self.kind = kind
+        self.target = target
+        self.status = "queued"
+        self.progress: Dict[str, Any] = {}
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now().isoformat()
+        self.started_at: Optional[str] = None
+        self.finished_at: Optional[str] = None
+        self.future = None
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+
+    def report(self, **progress: Any) -> None:
+        """Merge progress counters; called from the worker thread."""
+        with self._lock:
+            self.progress.update(progress)
+
+    def is_cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "id": self.id,
+                "kind": self.kind,
+                "target": self.target,
+                "status": self.status,
+                "progress": dict(self.progress),
+                "result": self.result,
+                "error": self.error,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+            }
+
+
+class TrainingJobQueue:
+    """
+    Runs document training on a bounded worker pool so it never occupies
+    request threads. Jobs report progress as they go and can be cancelled
+    while queued or between embedding batches.
+    """
+
+    def __init__(self, max_workers: int = TRAINING_WORKERS, history: int = TRAINING_JOB_HISTORY):
+        self.history = history
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="training")
+        self._jobs: "OrderedDict[str, TrainingJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, target: Any, fn: Callable[[TrainingJob], Optional[Dict[str, Any]]]) -> TrainingJob:
+        """Queue ``fn(job)``; its return value becomes the job result."""
+        job = TrainingJob(kind, target)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        job.future = self._executor.submit(self._run, job, fn)
+        logger.info(f"Queued {kind} job {job.id} for {target}")
+        return job
+
+    def submit_training(self, doc_id: str) -> TrainingJob:
+        """Queue training for one document, reusing an active job for the same document."""
+        with self._lock:
+            for job in self._jobs.values():
+                if job.kind == "train" and job.target == doc_id and job.status in ACTIVE_STATUSES:
+                    return job
+
+        def train(job: TrainingJob) -> Dict[str, Any]:
+            doc = rag_service.train_document(doc_id, progress=job.report, is_cancelled=job.is_cancelled)
+            return {"doc_id": doc_id, "chunk_count": doc.get("chunk_count", 0)}
+
+        return self.submit("train", doc_id, train)
+
+    def _run(self, job: TrainingJob, fn: Callable[[TrainingJob], Optional[Dict[str, Any]]]) -> None:
+        with job._lock:
+            if job.is_cancelled():
+                job.status = "cancelled"
+                job.finished_at = datetime.now().isoformat()
+                return
+            job.status = "running"
+            job.started_at = datetime.now().isoformat()
+        try:
+            result = fn(job)
+            status, error = "completed", None
+        except TrainingCancelled:
+            result, status, error = None, "cancelled", None
+        except Exception as e:
+            logger.error(f"Job {job.id} ({job.kind} {job.target}) failed: {e}", exc_info=True)
+            result, status, error = None, "failed", str(e)
+        with job._lock:
+            job.result = result
+            job.status = status
+            job.error = error
+            job.finished_at = datetime.now().isoformat()
+        logger.info(f"Job {job.id} ({job.kind} {job.target}) {status}")
+
+    def _prune(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.status not in ACTIVE_STATUSES]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[TrainingJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Job snapshots, newest first."""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [job.to_dict() for job in reversed(jobs) if status is None or job.status == status]
+
+    def cancel(self, job_id: str) -> Optional[TrainingJob]:
+        """Request cancellation. Queued jobs never start; running jobs stop at the next batch."""
+        job = self.get(job_id)
+        if job is None:
+            return None
+        job.cancel()
+        with job._lock:
+            if job.status == "queued" and job.future is not None and job.future.cancel():
+                job.status = "cancelled"
+                job.finished_at = datetime.now().isoformat()
+        return job
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        return {status: statuses.count(status) for status in ("queued", "running", "completed", "failed", "cancelled")}
+
+    def shutdown(self) -> None:
+        for job in list(self._jobs.values()):
+            if job.status in ACTIVE_STATUSES:
+                job.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Global training job queue
+training_jobs = TrainingJobQueue()
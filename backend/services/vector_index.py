@@ -0,0 +1,227 @@
+"""
+FAISS index construction for the RAG vector store.
+
+``RAG_INDEX_TYPE`` selects the index built over the stored vectors:
+
+- ``flat``: exact search; cost grows linearly with the corpus.
+- ``ivf``: inverted lists over k-means centroids. Corpora below
+  ``RAG_IVF_MIN_ROWS`` stay flat, since there is too little data to train
+  centroids. The index is retrained once the corpus outgrows its centroids
+  (see ``needs_rebuild``).
+- ``hnsw``: a navigable small-world graph. It needs no training, but uses
+  more memory per vector.
+
+``RAG_INDEX_COMPRESSION`` selects how each type stores its vectors:
+
+- ``none``: float32, 1536 bytes per 384-dim vector.
+- ``fp16``: half precision, 768 bytes per vector.
+- ``int8``: 8-bit scalar quantization, 384 bytes per vector.
+- ``pq``: product quantization, ``RAG_PQ_M`` bytes per vector.
+
+Indexes smaller than ``RAG_COMPRESSION_MIN_ROWS`` stay float32: they are
+cheap to hold, and too small to train quantizer ranges and codebooks on.
+Crossing the threshold triggers a background rebuild (``needs_rebuild``).
+
+Compressed scores are approximate, so ``rerank`` rescores the top
+candidates against the exact float32 vectors kept in the on-disk segments.
+
+Deleted chunks are filtered after the search, so ``search`` widens the
+candidate list (HNSW ``efSearch``) to cover the over-fetch.
+"""
+import logging
+import math
+import os
+from typing import Any, Dict, Optional
+
+import faiss
+import numpy as np
+
+logger = logging.getLogger("backend.services.vector_index")
+
+# Index selection and tuning
+RAG_INDEX_TYPE = os.getenv("RAG_INDEX_TYPE", "flat").lower()  # flat | ivf | hnsw
+RAG_IVF_NLIST = int(os.getenv("RAG_IVF_NLIST", "0"))  # inverted lists; 0 picks ~4*sqrt(rows)
+RAG_IVF_NPROBE = int(os.getenv("RAG_IVF_NPROBE", "16"))  # lists scanned per query
+RAG_IVF_MIN_ROWS = int(os.getenv("RAG_IVF_MIN_ROWS", "4096"))  # smaller corpora use a flat index
+RAG_IVF_RETRAIN_GROWTH = float(os.getenv("RAG_IVF_RETRAIN_GROWTH", "2.0"))  # retrain once the ideal nlist grows by this factor
+RAG_HNSW_M = int(os.getenv("RAG_HNSW_M", "32"))  # graph neighbours per node
+RAG_HNSW_EF_CONSTRUCTION = int(os.getenv("RAG_HNSW_EF_CONSTRUCTION", "80"))
+RAG_HNSW_EF_SEARCH = int(os.getenv("RAG_HNSW_EF_SEARCH", "64"))  # candidate list size per query
+RAG_INDEX_COMPRESSION = os.getenv("RAG_INDEX_COMPRESSION", "none").lower()  # none | fp16 | int8 | pq
+RAG_PQ_M = int(os.getenv("RAG_PQ_M", "48"))  # PQ bytes per vector; must divide the embedding size
+RAG_COMPRESSION_MIN_ROWS = int(os.getenv("RAG_COMPRESSION_MIN_ROWS", "10000"))  # smaller indexes stay float32
+RAG_RERANK_FACTOR = int(os.getenv("RAG_RERANK_FACTOR", "4"))  # compressed: rescore k*factor candidates exactly, <=1 disables
+
+INDEX_TYPES = ("flat", "ivf", "hnsw")
+COMPRESSIONS = ("none", "fp16", "int8", "pq")
+SQ_TYPES = {"fp16": faiss.ScalarQuantizer.QT_fp16, "int8": faiss.ScalarQuantizer.QT_8bit}
+MAX_TRAINING_POINTS = 65536
+# 8-bit PQ codes: each sub-quantizer needs at least this many training points
+PQ_CODEBOOK_SIZE = 256
+# k-means wants roughly this many training points per centroid
+IVF_POINTS_PER_LIST = 39
+IVF_MAX_TRAINING_POINTS_PER_LIST = 256
+
+
+def ivf_nlist(rows: int, nlist: int = RAG_IVF_NLIST) -> int:
+    """Number of inverted lists for a corpus of ``rows`` vectors."""
+    if nlist <= 0:
+        nlist = int(4 * math.sqrt(rows))
+    return max(1, min(nlist, rows // IVF_POINTS_PER_LIST))
+
+
+def index_kind(index: Any) -> str:
+    if isinstance(index, faiss.IndexIVF):
+        return "ivf"
+    if isinstance(index, faiss.IndexHNSW):
+        return "hnsw"
+    return "flat"
+
+
+def effective_compression(
+    rows: int,
+    dim: int,
+    compression: Optional[str] = None,
+    pq_m: int = RAG_PQ_M,
+    min_rows: int = RAG_COMPRESSION_MIN_ROWS,
+) -> str:
+    """The compression actually used for ``rows`` vectors of size ``dim``."""
+    compression = compression or RAG_INDEX_COMPRESSION
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown RAG_INDEX_COMPRESSION {compression!r}; expected one of {', '.join(COMPRESSIONS)}")
+    if rows < min_rows:
+        return "none"
+    if compression == "pq" and dim % pq_m:
+        logger.warning(f"RAG_PQ_M={pq_m} does not divide the embedding size {dim}; using int8")
+        return "int8"
+    if compression == "pq" and rows < PQ_CODEBOOK_SIZE:
+        return "int8"
+    return compression
+
+
+def _training_sample(vectors: np.ndarray, limit: int) -> np.ndarray:
+    if len(vectors) <= limit:
+        return vectors
+    picks = np.random.default_rng(0).choice(len(vectors), limit, replace=False)
+    return vectors[np.sort(picks)]
+
+
+def build_index(
+    vectors: np.ndarray,
+    index_type: Optional[str] = None,
+    compression: Optional[str] = None,
+    nlist: int = RAG_IVF_NLIST,
+    nprobe: int = RAG_IVF_NPROBE,
+    min_rows: int = RAG_IVF_MIN_ROWS,
+    hnsw_m: int = RAG_HNSW_M,
+    ef_construction: int = RAG_HNSW_EF_CONSTRUCTION,
+    pq_m: int = RAG_PQ_M,
+    compression_min_rows: int = RAG_COMPRESSION_MIN_ROWS,
+) -> Any:
+    """Build (and train, where needed) an index of the configured type holding ``vectors`` in order."""
+    index_type = index_type or RAG_INDEX_TYPE
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown RAG_INDEX_TYPE {index_type!r}; expected one of {', '.join(INDEX_TYPES)}")
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    rows, dim = vectors.shape
+    compression = effective_compression(rows, dim, compression, pq_m, compression_min_rows)
+
+    if index_type == "ivf" and rows >= min_rows:
+        lists = ivf_nlist(rows, nlist)
+        quantizer = faiss.IndexFlatL2(dim)
+        if compression == "pq":
+            index = faiss.IndexIVFPQ(quantizer, dim, lists, pq_m, 8)
+        elif compression in SQ_TYPES:
+            index = faiss.IndexIVFScalarQuantizer(quantizer, dim, lists, SQ_TYPES[compression])
+        else:
+            index = faiss.IndexIVFFlat(quantizer, dim, lists)
+        sample = _training_sample(vectors, max(lists * IVF_MAX_TRAINING_POINTS_PER_LIST, MAX_TRAINING_POINTS))
+        index.train(sample)
+        index.nprobe = min(nprobe, lists)
+        # Array direct map: reconstruct() by position, which the legacy migration relies on
+        index.make_direct_map()
+        logger.info(f"Trained IVF index ({compression}) with {lists} lists on {len(sample)} of {rows} vectors")
+    else:
+        if index_type == "hnsw":
+            if compression == "pq":
+                index = faiss.IndexHNSWPQ(dim, pq_m, hnsw_m)
+            elif compression in SQ_TYPES:
+                index = faiss.IndexHNSWSQ(dim, SQ_TYPES[compression], hnsw_m)
+            else:
+                index = faiss.IndexHNSWFlat(dim, hnsw_m)
+            index.hnsw.efConstruction = ef_construction
+            index.hnsw.efSearch = RAG_HNSW_EF_SEARCH
+        elif compression == "pq":
+            index = faiss.IndexPQ(dim, pq_m, 8)
+        elif compression in SQ_TYPES:
+            index = faiss.IndexScalarQuantizer(dim, SQ_TYPES[compression])
+        else:
+            index = faiss.IndexFlatL2(dim)
+        if not index.is_trained and rows:
+            index.train(_training_sample(vectors, MAX_TRAINING_POINTS))
+
+    if rows:
+        index.add(vectors)
+    return index
+
+
+def needs_rebuild(
+    index: Any,
+    index_type: Optional[str] = None,
+    nlist: int = RAG_IVF_NLIST,
+    min_rows: int = RAG_IVF_MIN_ROWS,
+    growth: float = RAG_IVF_RETRAIN_GROWTH,
+) -> bool:
+    """
+    Whether the index should be rebuilt to match the configured type and
+    compression: e.g. a flat index that has grown past ``min_rows`` under
+    ``ivf``, IVF centroids trained on a corpus much smaller than the
+    current one, or a float32 index that has grown enough to compress.
+    """
+    index_type = index_type or RAG_INDEX_TYPE
+    kind = index_kind(index)
+    if index_compression(index) != effective_compression(index.ntotal, index.d):
+        return True
+    if index_type == "ivf":
+        if kind == "flat":
+            return index.ntotal >= min_rows
+        if kind == "ivf" and growth > 0:
+            return ivf_nlist(index.ntotal, nlist) >= growth * index.nlist
+        return False
+    return kind != index_type
+
+
+def index_compression(index: Any) -> str:
+    if isinstance(index, faiss.IndexHNSW):
+        index = faiss.downcast_index(index.storage)
+    if isinstance(index, (faiss.IndexPQ, faiss.IndexIVFPQ)):
+        return "pq"
+    if isinstance(index, (faiss.IndexScalarQuantizer, faiss.IndexIVFScalarQuantizer)):
+        return "fp16" if index.sq.qtype == faiss.ScalarQuantizer.QT_fp16 else "int8"
+    return "none"
+
+
+def search(index: Any, queries: np.ndarray, k: int, ef_search: int = RAG_HNSW_EF_SEARCH):
+    """``index.search`` with per-call parameters sized for ``k`` results."""
+    queries = np.ascontiguousarray(queries, dtype=np.float32)
+    kind = index_kind(index)
+    if kind == "hnsw":
+        # HNSW returns at most efSearch hits, so cover the tombstone over-fetch
+        return index.search(queries, k, params=faiss.SearchParametersHNSW(efSearch=max(ef_search, k)))
+    return index.search(queries, k)
+
+
+def rerank(query: np.ndarray, vectors: np.ndarray, k: int):
+    """Exact squared L2 distances of ``vectors`` to ``query``: (order of the k nearest, distances)."""
+    distances = ((np.asarray(vectors, dtype=np.float32) - np.asarray(query, dtype=np.float32)) ** 2).sum(axis=1)
+    return np.argsort(distances, kind="stable")[:k], distances
+
+
+def describe(index: Any) -> Dict[str, Any]:
+    kind = index_kind(index)
+    info: Dict[str, Any] = {"type": kind, "compression": index_compression(index), "vectors": index.ntotal}
+    if kind == "ivf":
+        info.update(nlist=index.nlist, nprobe=index.nprobe)
+    elif kind == "hnsw":
+        info.update(m=index.hnsw.nb_neighbors(1), ef_search=index.hnsw.efSearch)
+    return info
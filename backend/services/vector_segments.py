@@ -0,0 +1,315 @@
+"""
+Segmented on-disk storage for the RAG vector index.
+
+Each commit appends an immutable segment - ``<name>.npy`` (float32 vectors)
+and ``<name>.jsonl`` (chunk id, text and metadata per row) - and then
+atomically replaces ``MANIFEST.json``, which lists the live segments and the
+ids of deleted chunks (tombstones). A crash before the manifest rename
+leaves the previous manifest intact; files it does not reference are
+removed on the next open. Small segments are merged in the background,
+dropping tombstoned rows.
+
+The in-memory FAISS index is rebuilt from the segments at startup, so
+adding a document costs I/O proportional to that document rather than
+the whole corpus. The segments also keep the exact float32 vectors of a
+compressed index; ``vectors`` reads them through memory maps.
+"""
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger("backend.services.vector_segments")
+
+# Segment storage configuration
+VECTOR_SEGMENT_MERGE_MIN = int(os.getenv("VECTOR_SEGMENT_MERGE_MIN", "8"))  # merge once this many small segments exist
+VECTOR_SEGMENT_SMALL_ROWS = int(os.getenv("VECTOR_SEGMENT_SMALL_ROWS", "2048"))  # segments below this are "small"
+
+MANIFEST_NAME = "MANIFEST.json"
+FORMAT_VERSION = 1
+
+
+def _fsync_dir(path: Path) -> None:
+    try:
+        fd = os.open(str(path), os.O_RDONLY)
+    except OSError:
+        return  # not supported on this platform
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _write_atomic(path: Path, write) -> None:
+    """Write via a temp file, fsync, then rename over ``path``."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _latest_positions(ids: List[str]) -> Optional[List[int]]:
+    """Positions of the last row written for each id, or None if no id repeats."""
+    latest = {row_id: pos for pos, row_id in enumerate(ids)}
+    return sorted(latest.values()) if len(latest) < len(ids) else None
+
+
+class SegmentStore:
+    """Append-only vector segments plus an atomically replaced manifest."""
+
+    def __init__(self, directory: Path, merge_min: int = VECTOR_SEGMENT_MERGE_MIN, small_rows: int = VECTOR_SEGMENT_SMALL_ROWS):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.merge_min = merge_min
+        self.small_rows = small_rows
+        self._lock = threading.Lock()
+        self._merging = threading.Lock()
+        self._manifest = self._read_manifest()
+        self._remove_unreferenced()
+        # chunk id -> (segment name, row) of its latest row; built on first use
+        self._locations: Optional[Dict[str, Tuple[str, int]]] = None
+        self._mmaps: Dict[str, np.ndarray] = {}
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.directory / MANIFEST_NAME
+
+    def exists(self) -> bool:
+        return self.manifest_path.exists()
+
+    def _read_manifest(self) -> Dict[str, Any]:
+        if self.manifest_path.exists():
+            return json.loads(self.manifest_path.read_text())
+        return {"format": FORMAT_VERSION, "generation": 0, "next_segment": 1, "dim": None, "segments": [], "tombstones": []}
+
+    def _commit_manifest(self, manifest: Dict[str, Any]) -> None:
+        manifest = {**manifest, "generation": manifest["generation"] + 1}
+        _write_atomic(self.manifest_path, lambda f: f.write(json.dumps(manifest).encode("utf-8")))
+        _fsync_dir(self.directory)
+        self._manifest = manifest
+
+    def _remove_unreferenced(self) -> None:
+        """Delete segment files left behind by an interrupted commit or merge."""
+        referenced = {s["name"] for s in self._manifest["segments"]}
+        for path in self.directory.iterdir():
+            if path.name == MANIFEST_NAME:
+                continue
+            if path.name.endswith(".tmp") or path.name.split(".")[0] not in referenced:
+                logger.info(f"Removing unreferenced segment file {path.name}")
+                path.unlink()
+
+    def _segment_paths(self, name: str) -> Tuple[Path, Path]:
+        return self.directory / f"{name}.npy", self.directory / f"{name}.jsonl"
+
+    def _write_segment(self, name: str, ids: List[str], texts: List[str], metadatas: List[Dict[str, Any]], vectors: np.ndarray) -> None:
+        vectors_path, rows_path = self._segment_paths(name)
+        _write_atomic(vectors_path, lambda f: np.save(f, np.ascontiguousarray(vectors, dtype=np.float32)))
+        lines = "".join(
+            json.dumps({"id": i, "text": t, "metadata": m}, default=str) + "\n"
+            for i, t, m in zip(ids, texts, metadatas)
+        )
+        _write_atomic(rows_path, lambda f: f.write(lines.encode("utf-8")))
+
+    def _read_segment(self, name: str) -> Tuple[List[Dict[str, Any]], np.ndarray]:
+        vectors_path, rows_path = self._segment_paths(name)
+        with open(rows_path, encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+        return rows, np.load(vectors_path, mmap_mode="r")
+
+    def append(
+        self,
+        ids: List[str],
+        texts: List[str],
+        metadatas: List[Dict[str, Any]],
+        vectors: Iterable[Iterable[float]],
+        tombstones: Optional[Iterable[str]] = None,
+    ) -> None:
+        """Write one new segment and commit it, together with the current tombstone set."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            manifest = dict(self._manifest)
+            segments = list(manifest["segments"])
+            if len(ids):
+                name = f"seg_{manifest['next_segment']:06d}"
+                self._write_segment(name, ids, texts, metadatas, vectors)
+                segments.append({"name": name, "count": len(ids)})
+                manifest["next_segment"] += 1
+                manifest["dim"] = int(vectors.shape[1])
+                if self._locations is not None:
+                    self._locations.update((row_id, (name, row)) for row, row_id in enumerate(ids))
+            manifest["segments"] = segments
+            if tombstones is not None:
+                manifest["tombstones"] = sorted(tombstones)
+            self._commit_manifest(manifest)
+        self.maybe_merge()
+
+    def set_tombstones(self, tombstones: Iterable[str]) -> None:
+        """Commit a new tombstone set without writing a segment."""
+        self.append([], [], [], np.zeros((0, 0), dtype=np.float32), tombstones)
+
+    def segment_names(self) -> List[str]:
+        with self._lock:
+            return [s["name"] for s in self._manifest["segments"]]
+
+    def load(self) -> Tuple[List[str], List[str], List[Dict[str, Any]], np.ndarray, set]:
+        """
+        All stored rows (ids, texts, metadatas, vectors) and the tombstone set.
+        If an id was written more than once, the most recent row wins.
+        """
+        with self._lock:
+            manifest = self._manifest
+        ids, texts, metadatas, blocks = [], [], [], []
+        locations = {}
+        for segment in manifest["segments"]:
+            rows, vectors = self._read_segment(segment["name"])
+            locations.update((r["id"], (segment["name"], row)) for row, r in enumerate(rows))
+            ids.extend(r["id"] for r in rows)
+            texts.extend(r["text"] for r in rows)
+            metadatas.extend(r["metadata"] for r in rows)
+            blocks.append(np.asarray(vectors))
+        dim = manifest.get("dim") or 0
+        vectors = np.concatenate(blocks) if blocks else np.zeros((0, dim), dtype=np.float32)
+        keep = _latest_positions(ids)
+        if keep is not None:
+            ids, texts, metadatas = [ids[i] for i in keep], [texts[i] for i in keep], [metadatas[i] for i in keep]
+            vectors = vectors[keep]
+        with self._lock:
+            if self._manifest is manifest:
+                self._locations = locations
+        return ids, texts, metadatas, vectors, set(manifest["tombstones"])
+
+    def _segment_ids(self, name: str) -> List[str]:
+        _, rows_path = self._segment_paths(name)
+        with open(rows_path, encoding="utf-8") as f:
+            return [json.loads(line)["id"] for line in f if line.strip()]
+
+    def _build_locations(self) -> Dict[str, Tuple[str, int]]:
+        locations = {}
+        for segment in self._manifest["segments"]:
+            row_ids = self._segment_ids(segment["name"])
+            locations.update((row_id, (segment["name"], row)) for row, row_id in enumerate(row_ids))
+        return locations
+
+    def vectors(self, ids: List[str]) -> np.ndarray:
+        """
+        Exact stored vectors for ``ids`` (latest row of each), read from the
+        memory-mapped segment files. Raises KeyError for an unknown id.
+        """
+        with self._lock:
+            if self._locations is None:
+                self._locations = self._build_locations()
+            located = [self._locations[row_id] for row_id in ids]
+            # Open maps under the lock: a merge may delete the files right after
+            maps = {}
+            for name, _ in located:
+                if name not in maps:
+                    if name not in self._mmaps:
+                        self._mmaps[name] = np.load(self._segment_paths(name)[0], mmap_mode="r")
+                    maps[name] = self._mmaps[name]
+        dim = self._manifest.get("dim") or 0
+        if not located:
+            return np.zeros((0, dim), dtype=np.float32)
+        return np.stack([maps[name][row] for name, row in located]).astype(np.float32, copy=False)
+
+    def merge(self, names: Optional[List[str]] = None, dead: Optional[set] = None) -> Dict[str, Any]:
+        """
+        Rewrite the given segments (all by default) as one, dropping rows in
+        ``dead`` (default: the committed tombstones). Runs without blocking
+        appends; segments committed meanwhile are kept as they are.
+        """
+        with self._merging:
+            with self._lock:
+                manifest = self._manifest
+                selected = [s for s in manifest["segments"] if names is None or s["name"] in names]
+                dead = set(manifest["tombstones"]) if dead is None else set(dead)
+                name = f"seg_{manifest['next_segment']:06d}"
+                # Reserve the name so concurrent appends do not reuse it
+                self._manifest = {**manifest, "next_segment": manifest["next_segment"] + 1}
+            if not selected:
+                return {"merged_segments": 0, "rows_before": 0, "rows_after": 0}
+
+            ids, texts, metadatas, blocks = [], [], [], []
+            merged_ids = set()
+            for segment in selected:
+                rows, vectors = self._read_segment(segment["name"])
+                merged_ids.update(row["id"] for row in rows)
+                keep = [i for i, row in enumerate(rows) if row["id"] not in dead]
+                ids.extend(rows[i]["id"] for i in keep)
+                texts.extend(rows[i]["text"] for i in keep)
+                metadatas.extend(rows[i]["metadata"] for i in keep)
+                blocks.append(np.asarray(vectors)[keep])
+            merged_vectors = np.concatenate(blocks) if blocks else np.zeros((0, 0), dtype=np.float32)
+            keep = _latest_positions(ids)
+            if keep is not None:
+                ids, texts, metadatas = [ids[i] for i in keep], [texts[i] for i in keep], [metadatas[i] for i in keep]
+                merged_vectors = merged_vectors[keep]
+            if ids:
+                self._write_segment(name, ids, texts, metadatas, merged_vectors)
+
+            # A tombstone can only go once no unmerged segment still holds a row for it
+            merged_names = {s["name"] for s in selected}
+            dropped = dead & merged_ids
+            checked = set(merged_names)
+            with self._lock:
+                others = [s["name"] for s in self._manifest["segments"] if s["name"] not in checked]
+            for other in others if dropped else []:
+                dropped.difference_update(self._segment_ids(other))
+                checked.add(other)
+
+            with self._lock:
+                manifest = dict(self._manifest)
+                remaining = [s for s in manifest["segments"] if s["name"] not in merged_names]
+                # Segments committed while the ones above were read
+                for segment in remaining if dropped else []:
+                    if segment["name"] not in checked:
+                        dropped.difference_update(self._segment_ids(segment["name"]))
+                manifest["segments"] = ([{"name": name, "count": len(ids)}] if ids else []) + remaining
+                # Rows dropped here no longer need tombstones; all others are kept
+                manifest["tombstones"] = sorted(set(manifest["tombstones"]) - dropped)
+                self._commit_manifest(manifest)
+                if self._locations is not None:
+                    # Rows re-written by later segments keep pointing there
+                    for row_id in merged_ids:
+                        if self._locations.get(row_id, ("",))[0] in merged_names:
+                            del self._locations[row_id]
+                    self._locations.update((row_id, (name, row)) for row, row_id in enumerate(ids) if row_id not in self._locations)
+                for old in merged_names:
+                    self._mmaps.pop(old, None)
+
+            for old in merged_names:
+                for path in self._segment_paths(old):
+                    path.unlink(missing_ok=True)
+
+            rows_before = sum(s["count"] for s in selected)
+            logger.info(f"Merged {len(selected)} segments into {name}: {rows_before} -> {len(ids)} rows")
+            return {"merged_segments": len(selected), "rows_before": rows_before, "rows_after": len(ids)}
+
+    def maybe_merge(self) -> None:
+        """Merge small segments in a background thread once there are enough of them."""
+        with self._lock:
+            small = [s["name"] for s in self._manifest["segments"] if s["count"] < self.small_rows]
+        if len(small) < self.merge_min or self._merging.locked():
+            return
+        threading.Thread(target=self.merge, args=(small,), name="segment-merge", daemon=True).start()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            manifest = self._manifest
+        return {
+            "generation": manifest["generation"],
+            "segments": len(manifest["segments"]),
+            "rows": sum(s["count"] for s in manifest["segments"]),
+            "tombstones": len(manifest["tombstones"]),
+            "bytes": sum(
+                path.stat().st_size
+                for s in manifest["segments"]
+                for path in self._segment_paths(s["name"])
+                if path.exists()
+            ),
+        }
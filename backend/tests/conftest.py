@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import the backend packages the way main.py does (run from backend/)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
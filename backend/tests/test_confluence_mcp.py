@@ -0,0 +1,75 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from services import confluence_mcp
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(0.05)
+        body = json.dumps({"results": [{"title": "Password Policy", "content": "...", "url": "u"}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def client(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(confluence_mcp, "CONFLUENCE_ENABLED", True)
+    monkeypatch.setattr(confluence_mcp, "CONFLUENCE_MCP_URL", f"http://127.0.0.1:{server.server_address[1]}")
+    client = confluence_mcp.ConfluenceMCPClient(pool_size=4)
+    yield client
+    client.close()
+    server.shutdown()
+
+
+def test_pool_stats_count_kept_alive_connections(client):
+    async def run():
+        await asyncio.gather(*(client.asearch("password") for _ in range(3)))
+        stats = client.pool_stats()
+        await client.aclose()
+        return stats
+
+    stats = asyncio.run(run())
+
+    assert stats["open"] == 3 and stats["idle"] == 3 and stats["in_use"] == 0
+    assert client.pool_stats()["open"] == 0
+
+
+def test_client_left_on_a_running_loop_is_closed(client):
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    asyncio.run_coroutine_threadsafe(client.asearch("password"), loop).result(5)
+    first = client._async_http
+
+    assert asyncio.run(client.asearch("password"))
+    time.sleep(0.1)
+
+    assert first.is_closed
+    assert client._async_http is not first
+    loop.call_soon_threadsafe(loop.stop)
+
+
+def test_loop_ended_without_aclose_is_reported(client, caplog):
+    asyncio.run(client.asearch("password"))
+
+    with caplog.at_level(logging.WARNING, logger="backend.services.confluence_mcp"):
+        asyncio.run(client.asearch("password"))
+
+    assert "without aclose()" in caplog.text
@@ -0,0 +1,56 @@
+import json
+
+import numpy as np
+import pytest
+
+pytest.importorskip("onnxruntime")
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+pytest.importorskip("sentence_transformers")
+
+from services import embedding_backends
+
+TEXTS = [
+    "How do I reset my Okta password?",
+    "VPN access fails after the certificate rotation",
+    "Expense reports for travel must be filed within thirty days of the trip",
+    "The database replica latency alert fired in grafana",
+    "password",
+]
+
+
+@pytest.fixture(scope="module")
+def model_dir(tmp_path_factory):
+    """A small random BERT with the same pipeline as all-MiniLM-L6-v2 (mean pooling, normalize)."""
+    path = tmp_path_factory.mktemp("model")
+    words = sorted({word.strip("?").lower() for text in TEXTS for word in text.split()})
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + words
+    (path / "vocab.txt").write_text("\n".join(vocab) + "\n")
+    transformers.BertTokenizerFast(str(path / "vocab.txt"), do_lower_case=True).save_pretrained(str(path))
+    torch.manual_seed(0)
+    config = transformers.BertConfig(
+        vocab_size=len(vocab), hidden_size=64, num_hidden_layers=2, num_attention_heads=4, intermediate_size=128
+    )
+    transformers.BertModel(config).eval().save_pretrained(str(path))
+    (path / "1_Pooling").mkdir()
+    (path / "1_Pooling" / "config.json").write_text(json.dumps({"word_embedding_dimension": 64, "pooling_mode_mean_tokens": True}))
+    (path / "modules.json").write_text(json.dumps([
+        {"idx": 0, "name": "0", "path": "", "type": "sentence_transformers.models.Transformer"},
+        {"idx": 1, "name": "1", "path": "1_Pooling", "type": "sentence_transformers.models.Pooling"},
+        {"idx": 2, "name": "2", "path": "2_Normalize", "type": "sentence_transformers.models.Normalize"},
+    ]))
+    return str(path)
+
+
+@pytest.mark.parametrize("quantize, min_cosine", [(False, 0.9999), (True, 0.99)])
+def test_onnx_matches_hf(model_dir, tmp_path, quantize, min_cosine):
+    reference = np.asarray(embedding_backends.load_embedding_model("hf", model_name=model_dir).embed_documents(TEXTS))
+    onnx = embedding_backends.OnnxEmbeddings(model_dir, quantize=quantize, threads=1, cache_dir=tmp_path)
+
+    vectors = np.asarray(onnx.embed_documents(TEXTS))
+
+    assert vectors.shape == reference.shape
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1, atol=1e-5)
+    assert (vectors * reference).sum(axis=1).min() > min_cosine
+    # Dynamic quantization scales activations per batch, so a lone query differs slightly
+    assert np.dot(onnx.embed_query(TEXTS[1]), vectors[1]) > min_cosine
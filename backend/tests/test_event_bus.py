@@ -0,0 +1,35 @@
+import asyncio
+
+from services.event_bus import RESYNC, TICKET_CREATED, EventBus
+
+
+async def _collect(bus, last_event_id, publish, count):
+    stream = bus.subscribe(last_event_id)
+    events = [await stream.__anext__()]  # replay
+    for i in range(publish):
+        bus.publish(TICKET_CREATED, {"n": i})
+    while len(events) < count:
+        events.append(await asyncio.wait_for(stream.__anext__(), 1))
+    await stream.aclose()
+    return events
+
+
+def test_last_event_id_from_before_restart_resyncs():
+    bus = EventBus()
+    bus.publish(TICKET_CREATED, {"n": "before"})
+
+    events = asyncio.run(_collect(bus, 500, publish=3, count=4))
+
+    assert events[0]["type"] == RESYNC
+    assert events[0]["id"] == 1
+    assert [e["data"]["n"] for e in events[1:]] == [0, 1, 2]
+
+
+def test_replay_after_last_event_id():
+    bus = EventBus()
+    for i in range(3):
+        bus.publish(TICKET_CREATED, {"n": i})
+
+    events = asyncio.run(_collect(bus, 1, publish=1, count=3))
+
+    assert [e["id"] for e in events] == [2, 3, 4]
@@ -0,0 +1,10 @@
+from services import grafana_mock
+
+
+def test_delta_reports_alerts_changed_out_of_the_filter():
+    since = grafana_mock.list_alerts(status="ok")["version"]
+
+    grafana_mock.silence_alert("2")
+    delta = grafana_mock.list_alerts(status="ok", since=since)
+
+    assert [(a["id"], a["matches"]) for a in delta["items"]] == [("2", False)]
@@ -0,0 +1,63 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from services.ticket_store import InMemoryTicketRepository, SQLiteTicketRepository
+
+
+@pytest.fixture
+def repository(tmp_path):
+    repository = SQLiteTicketRepository(str(tmp_path / "tickets.sqlite3"), batch_wait_ms=50)
+    yield repository
+    repository.close()
+
+
+def test_failed_operation_fails_only_its_caller(repository):
+    insert, _ = repository._insert({"description": "kept"})
+
+    def broken(conn):
+        conn.execute("INSERT INTO tickets (description, created_at, updated_at) VALUES ('lost', 'x', 'y')")
+        raise sqlite3.IntegrityError("boom")
+
+    futures = [repository._enqueue(op) for op in (insert, broken, insert)]
+
+    assert futures[0].result(timeout=5)
+    with pytest.raises(sqlite3.IntegrityError):
+        futures[1].result(timeout=5)
+    assert futures[2].result(timeout=5)
+    assert [t["description"] for t in repository.list()] == ["kept", "kept"]
+
+
+def test_async_writes_share_a_batch(repository):
+    batches = []
+    commit_batch = repository._commit_batch
+    repository._commit_batch = lambda batch: (batches.append(len(batch)), commit_batch(batch))
+
+    async def create_many():
+        created = await asyncio.gather(*(repository.acreate({"description": f"t{i}"}) for i in range(20)))
+        updated = await repository.aupdate(created[0]["id"], status="closed")
+        return created, updated
+
+    created, updated = asyncio.run(create_many())
+
+    assert len({t["id"] for t in created}) == 20
+    assert updated["status"] == "closed"
+    assert max(batches) > 1
+
+
+@pytest.mark.parametrize("store", ["memory", "sqlite"])
+def test_delta_reports_tickets_changed_out_of_the_filter(store, tmp_path):
+    repository = InMemoryTicketRepository() if store == "memory" else SQLiteTicketRepository(str(tmp_path / "t.sqlite3"))
+    kept = repository.create({"description": "kept", "status": "open"})
+    closed = repository.create({"description": "closed", "status": "open"})
+    repository.create({"description": "never open", "status": "closed"})
+    since = repository.query({"status": "open"})["version"]
+
+    repository.update(closed["id"], status="closed")
+    repository.update(kept["id"], assigned_to="L1 Team")
+    delta = repository.query({"status": "open"}, since=since)
+
+    assert [(t["id"], t["matches"]) for t in delta["items"]] == [(closed["id"], False), (kept["id"], True)]
+    assert repository.query({"status": "open"}, since=delta["version"])["items"] == []
+    repository.close()
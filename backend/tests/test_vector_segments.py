@@ -0,0 +1,37 @@
+import numpy as np
+
+from services.vector_segments import SegmentStore
+
+
+def _append(store, ids, tombstones=None):
+    vectors = np.eye(len(ids), 4, dtype=np.float32)
+    store.append(ids, [f"text {i}" for i in ids], [{"doc_id": i} for i in ids], vectors, tombstones)
+
+
+def test_partial_merge_keeps_tombstones_of_unmerged_segments(tmp_path):
+    store = SegmentStore(tmp_path, merge_min=100, small_rows=5)
+    _append(store, [f"big{i}" for i in range(10)])
+    _append(store, ["a1", "a2"])
+    _append(store, ["b1"], tombstones=["big3", "a2"])
+    small = store.segment_names()[1:]
+
+    store.merge(small)
+
+    reopened = SegmentStore(tmp_path)
+    ids, _, _, _, tombstones = reopened.load()
+    assert tombstones == {"big3"}
+    assert "a2" not in ids
+    assert "big3" in ids  # still stored, so the tombstone must hide it
+
+
+def test_merge_drops_tombstones_of_rewritten_rows(tmp_path):
+    store = SegmentStore(tmp_path, merge_min=100)
+    _append(store, ["x1", "x2"])
+    _append(store, ["y1"], tombstones=["x2"])
+
+    result = store.merge()
+
+    ids, _, _, _, tombstones = SegmentStore(tmp_path).load()
+    assert result["rows_after"] == 2
+    assert sorted(ids) == ["x1", "y1"]
+    assert tombstones == set()
@@ -19,6 +19,8 @@ interface Document {
 
 export default function AdminRAGPage() {
     const [documents, setDocuments] = useState<Document[]>([]);
+    const [totalDocuments, setTotalDocuments] = useState(0);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
     const [loading, setLoading] = useState(false);
     const [uploading, setUploading] = useState(false);
     const [selectedFile, setSelectedFile] = useState<File | null>(null);
@@ -30,13 +32,17 @@ export default function AdminRAGPage() {
         fetchDocuments();
     }, []);
 
-    const fetchDocuments = async () => {
+    const fetchDocuments = async (cursor?: string) => {
         try {
             setLoading(true);
-            const res = await fetch(`${API_BASE}/documents`);
+            const params = new URLSearchParams({ limit: "100" });
+            if (cursor) params.set("cursor", cursor);
+            const res = await fetch(`${API_BASE}/documents?${params}`);
             const data = await res.json();
             if (data.success) {
-                setDocuments(data.documents);
+                setDocuments((prev) => (cursor ? [...prev, ...data.documents] : data.documents));
+                setTotalDocuments(data.total);
+                setNextCursor(data.next_cursor);
             }
         } catch (error) {
             console.error("Failed to fetch documents:", error);
@@ -93,7 +99,7 @@ export default function AdminRAGPage() {
 
             const data = await res.json();
             if (data.success) {
-                alert("Document trained successfully!");
+                alert("Training started. The document status updates when the job finishes.");
                 fetchDocuments();
             } else {
                 alert("Training failed: " + (data.detail || "Unknown error"));
@@ -254,16 +260,16 @@ export default function AdminRAGPage() {
             {/* Documents List */}
             <div className="rounded-lg bg-slate-900 border border-slate-800 p-6 space-y-4">
                 <div className="flex items-center justify-between">
-                    <h2 className="text-xl font-semibold text-emerald-300">📚 Documents</h2>
+                    <h2 className="text-xl font-semibold text-emerald-300">📚 Documents ({totalDocuments})</h2>
                     <button
-                        onClick={fetchDocuments}
+                        onClick={() => fetchDocuments()}
                         className="text-sm text-blue-400 hover:text-blue-300"
                     >
                         🔄 Refresh
                     </button>
                 </div>
 
-                {loading ? (
+                {loading && documents.length === 0 ? (
                     <p className="text-sm text-slate-400">Loading documents...</p>
                 ) : documents.length === 0 ? (
                     <p className="text-sm text-slate-400">No documents uploaded yet.</p>
@@ -325,6 +331,15 @@ export default function AdminRAGPage() {
                                 ))}
                             </tbody>
                         </table>
+                        {nextCursor && (
+                            <button
+                                onClick={() => fetchDocuments(nextCursor)}
+                                disabled={loading}
+                                className="mt-4 text-sm text-blue-400 hover:text-blue-300 disabled:opacity-50"
+                            >
+                                Load more ({totalDocuments - documents.length} remaining)
+                            </button>
+                        )}
                     </div>
                 )}
             </div>